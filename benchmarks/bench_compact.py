@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the memory use of large in-memory collections of FleurInput
+and CompactFleurInput objects.
+
+``--count`` inputs are created from the binary records of the test files
+(``test-files/inp_test``, ``inp_test_film``, ``inp.xml`` and ``inp_film.xml``),
+optionally as ``--supercell`` supercells, and kept in a list as
+
+- ``FleurInput``: full objects with a ``Structure`` and their own parameter dicts
+- ``CompactFleurInput``: arrays with parameters shared through the ``ParameterPool``
+
+The memory allocated by Python (``tracemalloc``) for the list and the time for
+rendering all inpgen files are reported. Run with::
+
+    python benchmarks/bench_compact.py --count 10000 100000 --supercell 1 3
+
+"""
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+
+from pymatgen.io.fleur import FleurInput
+from pymatgen.io.fleur.compact import CompactFleurInput
+
+TEST_FILES_DIR = Path(__file__).absolute().parent.parent / "test-files"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, nargs="+", default=[10000])
+    parser.add_argument("--supercell", type=int, nargs="+", default=[1])
+    parser.add_argument("--render", type=int, default=1000, help="number of inputs rendered for the timing")
+    args = parser.parse_args()
+
+    print(f"{'case':<34} {'memory [MiB]':>13} {'per input [kB]':>15} {'render [ms/input]':>18}")
+    for supercell in args.supercell:
+        records = []
+        for name in ("inp_test", "inp_test_film", "inp.xml", "inp_film.xml"):
+            fleur_inp = FleurInput.from_file(TEST_FILES_DIR / name)
+            fleur_inp.structure.make_supercell([supercell, supercell, 1])
+            records.append(fleur_inp.to_bytes())
+
+        for count in args.count:
+            for name, load in (
+                ("FleurInput", FleurInput.from_bytes),
+                ("CompactFleurInput", CompactFleurInput.from_bytes),
+            ):
+                tracemalloc.start()
+                inputs = [load(records[index % len(records)]) for index in range(count)]
+                memory = tracemalloc.get_traced_memory()[0]
+                tracemalloc.stop()
+
+                start = time.perf_counter()
+                for fleur_inp in inputs[: args.render]:
+                    fleur_inp.get_inpgen_file_content()
+                render = 1000 * (time.perf_counter() - start) / min(args.render, count)
+
+                case = f"{name} ({count}, {supercell}x{supercell}x1)"
+                print(f"{case:<34} {memory / 2**20:>13.1f} {memory / count / 1000:>15.2f} {render:>18.3f}")
+                del inputs
+
+
+if __name__ == "__main__":
+    main()
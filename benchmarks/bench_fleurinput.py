@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite for reading, writing and serializing
+:py:class:`~pymatgen.io.fleur.FleurInput` objects.
+
+Synthetic bulk and film inputs are generated from ``test-files/inp.xml`` and
+``test-files/inp_film.xml`` with increasing numbers of atoms and k-points.
+For every input the wall time (best of ``--repeat`` runs) and the peak memory
+allocated through Python (measured with :py:mod:`tracemalloc`, which does not
+include allocations made inside libxml2) are measured for
+
+- ``from_file`` of the inp.xml (full and streaming parse)
+- ``from_file`` of the corresponding inpgen file
+- ``get_inpgen_file_content`` (per-site and vectorized)
+- ``as_dict`` and ``from_dict``
+- ``write_file``
+
+The rendering operations are timed with an empty render cache of the input
+(see :py:mod:`pymatgen.io.fleur.rendering`), so they measure the formatting of the file.
+
+Results can be stored as a baseline and later runs compared against it::
+
+    python benchmarks/bench_fleurinput.py --save benchmarks/baseline.json
+    python benchmarks/bench_fleurinput.py --compare benchmarks/baseline.json
+
+When comparing, the script exits with a non-zero status if any operation
+got slower than ``--threshold`` times its baseline (operations taking less
+than ``--min-time`` seconds in the baseline are too noisy and not checked).
+"""
+import argparse
+import json
+import platform
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+from pymatgen.io.fleur import FleurInput
+
+TEST_FILES_DIR = Path(__file__).absolute().parent.parent / "test-files"
+
+
+def synthetic_inpxml(film: bool, natoms: int, nkpts: int, seed: int = 0) -> str:
+    """
+    Return the content of test-files/inp.xml (or inp_film.xml) with natoms random
+    atom positions in one atom group and a k-point list with nkpts entries
+    """
+    rng = np.random.default_rng(seed)
+    name = "inp_film.xml" if film else "inp.xml"
+    content = (TEST_FILES_DIR / name).read_text(encoding="utf-8")
+
+    if film:
+        pos_tag = "filmPos"
+        positions = np.column_stack((rng.random((natoms, 2)), rng.uniform(-4.0, 4.0, natoms)))
+    else:
+        pos_tag = "relPos"
+        positions = rng.random((natoms, 3))
+    atoms = "".join(
+        f'<{pos_tag} label="{i + 1:20d}">{x:.10f} {y:.10f} {z:.10f}</{pos_tag}>\n'
+        for i, (x, y, z) in enumerate(positions)
+    )
+    group_start = content.index("<atomGroup ")
+    group_start = content.index(">", group_start) + 1
+    group_end = content.index("</atomGroup>", group_start)
+    force_start = content.index("<force", group_start)
+    content = content[:group_start] + "\n" + atoms + content[force_start:]
+    # Only the first atom group is kept
+    groups_end = content.index("</atomGroups>")
+    first_group_end = content.index("</atomGroup>") + len("</atomGroup>")
+    content = content[:first_group_end] + "\n" + content[groups_end:]
+
+    kpoints = "".join(
+        f'<kPoint weight="{1.0 / nkpts:.10f}">{x:.8f} {y:.8f} {z:.8f}</kPoint>\n'
+        for x, y, z in rng.random((nkpts, 3)) - 0.5
+    )
+    list_start = content.index("<kPointList ")
+    list_start_end = content.index(">", list_start) + 1
+    list_end = content.index("</kPointList>", list_start)
+    list_tag = content[list_start:list_start_end]
+    count_start = list_tag.index('count="') + len('count="')
+    count_end = list_tag.index('"', count_start)
+    list_tag = list_tag[:count_start] + str(nkpts) + list_tag[count_end:]
+    return content[:list_start] + list_tag + "\n" + kpoints + content[list_end:]
+
+
+def measure(func, repeat: int):
+    """
+    Return the best wall time of repeat calls of func and the peak
+    memory allocated through Python during one call in bytes
+    """
+    time = min(timeit.repeat(func, number=1, repeat=repeat))
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return time, peak
+
+
+def uncached(fleur_inp: FleurInput, func):
+    """
+    Return a function calling func after dropping the rendered files cached by the input
+    """
+
+    def wrapper():
+        fleur_inp._render_cache.invalidate()
+        return func()
+
+    return wrapper
+
+
+def run_case(film: bool, natoms: int, nkpts: int, repeat: int, workdir: Path) -> dict:
+    """
+    Run all benchmarks for a single synthetic input
+    """
+    inpxml = workdir / "inp.xml"
+    inpxml.write_text(synthetic_inpxml(film, natoms, nkpts), encoding="utf-8")
+    inpgen = workdir / "inp_gen"
+    fleur_inp = FleurInput.from_file(inpxml, streaming=True)
+    fleur_inp.write_file(str(inpgen))
+    dict_repr = fleur_inp.as_dict()
+
+    operations = {
+        "from_file[xml]": lambda: FleurInput.from_file(inpxml),
+        "from_file[xml,streaming]": lambda: FleurInput.from_file(inpxml, streaming=True),
+        "from_file[inpgen]": lambda: FleurInput.from_file(inpgen),
+        "get_inpgen_file_content": uncached(fleur_inp, fleur_inp.get_inpgen_file_content),
+        "get_inpgen_file_content[vectorized]": uncached(
+            fleur_inp, lambda: fleur_inp.get_inpgen_file_content(vectorized=True)
+        ),
+        "as_dict": fleur_inp.as_dict,
+        "from_dict": lambda: FleurInput.from_dict(dict_repr),
+        "write_file": uncached(fleur_inp, lambda: fleur_inp.write_file(str(workdir / "inp_out"))),
+    }
+
+    results = {}
+    for name, func in operations.items():
+        time, peak = measure(func, repeat)
+        results[name] = {"time": time, "peak_memory": peak}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--atoms", type=int, nargs="+", default=[2, 100, 1000, 5000])
+    parser.add_argument("--kpoints", type=int, nargs="+", default=[2, 1000, 20000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", type=Path, help="file to store the results in")
+    parser.add_argument("--compare", type=Path, help="baseline results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.5, help="allowed slowdown relative to the baseline")
+    parser.add_argument(
+        "--min-time", type=float, default=1e-3, help="operations faster than this in the baseline are not checked"
+    )
+    args = parser.parse_args()
+
+    # The atom and k-point counts are varied separately
+    cases = [(natoms, min(args.kpoints)) for natoms in args.atoms]
+    cases += [(min(args.atoms), nkpts) for nkpts in args.kpoints if nkpts != min(args.kpoints)]
+
+    baseline = {}
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))["results"]
+
+    results = {}
+    regressions = []
+    print(f"{'case':<28} {'operation':<38} {'time [s]':>10} {'peak [MB]':>10} {'vs. baseline':>13}")
+    with TemporaryDirectory() as td:
+        for film in (False, True):
+            for natoms, nkpts in cases:
+                case = f"{'film' if film else 'bulk'}-{natoms}atoms-{nkpts}kpts"
+                results[case] = run_case(film, natoms, nkpts, args.repeat, Path(td))
+                for operation, res in results[case].items():
+                    ratio = ""
+                    if operation in baseline.get(case, {}):
+                        factor = res["time"] / baseline[case][operation]["time"]
+                        ratio = f"{factor:12.2f}x"
+                        if factor > args.threshold and baseline[case][operation]["time"] >= args.min_time:
+                            regressions.append((case, operation, factor))
+                    print(
+                        f"{case:<28} {operation:<38} {res['time']:>10.4f} {res['peak_memory'] / 1e6:>10.2f} {ratio:>13}"
+                    )
+
+    if args.save is not None:
+        metadata = {"python": sys.version.split()[0], "platform": platform.platform()}
+        args.save.write_text(json.dumps({"metadata": metadata, "results": results}, indent=2), encoding="utf-8")
+
+    if regressions:
+        print(f"\n{len(regressions)} operations are slower than {args.threshold}x the baseline:")
+        for case, operation, factor in regressions:
+            print(f"  {case} {operation}: {factor:.2f}x")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
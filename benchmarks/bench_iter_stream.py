@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of reading fleur inputs directly from archives and concatenated streams.
+
+A ``.tar.gz`` archive and a gzipped concatenated stream with ``--count`` inpgen inputs
+(generated from ``test-files/inp_test`` and ``test-files/inp_test_film``) are read with
+
+- ``unpack``: extracting the archive to a temporary directory and reading the files
+  with ``FleurInput.from_file``
+- ``iter_from_stream[tar.gz]``: reading the members of the archive without unpacking them
+- ``iter_from_stream[stream.gz]``: splitting the concatenated stream into the inputs
+
+The time and the peak of the memory allocated by Python (``tracemalloc``) are reported,
+the latter stays constant with the number of inputs for ``iter_from_stream``. Run with::
+
+    python benchmarks/bench_iter_stream.py --count 1000 10000 --workers 1 4
+
+"""
+import argparse
+import gzip
+import tarfile
+import time
+import tracemalloc
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from pymatgen.io.fleur import FleurInput
+
+TEST_FILES_DIR = Path(__file__).absolute().parent.parent / "test-files"
+
+
+def measure(func) -> tuple:
+    """
+    Return the time and the peak of the traced memory of the function
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1])
+    args = parser.parse_args()
+
+    inputs = [FleurInput.from_file(TEST_FILES_DIR / name) for name in ("inp_test", "inp_test_film")]
+
+    print(f"{'case':<38} {'time [s]':>10} {'peak [MiB]':>11}")
+    for count in args.count:
+        with TemporaryDirectory() as td:
+            archive = Path(td) / "inputs.tar.gz"
+            FleurInput.write_files((inputs[index % 2] for index in range(count)), td, archive=archive, workers=1)
+            stream = Path(td) / "inputs.gz"
+            with gzip.open(stream, "wb") as f:
+                for index in range(count):
+                    f.write(inputs[index % 2].get_inpgen_file_content().encode("utf-8"))
+
+            def unpack():
+                with TemporaryDirectory() as unpacked:
+                    with tarfile.open(archive) as tf:
+                        tf.extractall(unpacked)
+                    for path in sorted(Path(unpacked).rglob("inp")):
+                        FleurInput.from_file(path)
+
+            cases = {"unpack": unpack}
+            for workers in args.workers:
+                cases[f"iter_from_stream[tar.gz,{workers}]"] = lambda workers=workers: sum(
+                    res.ok for res in FleurInput.iter_from_stream(archive, workers=workers)
+                )
+                cases[f"iter_from_stream[stream.gz,{workers}]"] = lambda workers=workers: sum(
+                    res.ok for res in FleurInput.iter_from_stream(stream, workers=workers)
+                )
+
+            for name, func in cases.items():
+                elapsed, peak = measure(func)
+                print(f"{f'{name} ({count})':<38} {elapsed:>10.3f} {peak / 2**20:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of reading the k-point lists and symmetry operations of inp.xml files into arrays.
+
+Synthetic inputs are generated from ``test-files/inp.xml`` and ``test-files/inp_film.xml``
+(see ``bench_fleurinput.py``) and the arrays are read with
+
+- ``masci_tools``: ``get_kpointsdata`` and ``get_symmetry_information`` on the parsed tree
+- ``read_arrays``: ``read_kpoints`` and ``read_symmetry_operations`` on the parsed tree
+- ``from_string``: parsing the complete input including the arrays (``read_kpoints=True``)
+- ``from_string[streaming]``: the same with the streaming parser collecting the k-points
+
+Run with::
+
+    python benchmarks/bench_kpoints.py --kpoints 1000 100000
+
+"""
+import argparse
+import timeit
+
+from bench_fleurinput import synthetic_inpxml
+from masci_tools.util.xml.xml_getters import get_kpointsdata, get_symmetry_information
+
+from pymatgen.io.fleur import FleurInput
+from pymatgen.io.fleur.inpxml import load_inpxml, read_kpoints, read_symmetry_operations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kpoints", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    operations = ("masci_tools", "read_arrays", "from_string", "from_string[streaming]")
+    print(f"{'case':<18} " + " ".join(f"{name + ' [s]':>26}" for name in operations))
+    for film in (False, True):
+        for nkpts in args.kpoints:
+            content = synthetic_inpxml(film, 16, nkpts).encode("utf-8")
+            xmltree, schema_dict = load_inpxml(content)
+
+            def masci():
+                get_kpointsdata(xmltree, schema_dict, only_used=False)
+                get_symmetry_information(xmltree, schema_dict)
+
+            def arrays():
+                read_kpoints(xmltree)
+                read_symmetry_operations(xmltree)
+
+            def parse():
+                FleurInput.from_string(content, inpgen_input=False, read_kpoints=True)
+
+            def parse_streaming():
+                FleurInput.from_string(content, inpgen_input=False, streaming=True, read_kpoints=True)
+
+            times = [
+                min(timeit.repeat(func, number=1, repeat=args.repeat))
+                for func in (masci, arrays, parse, parse_streaming)
+            ]
+            case = f"{'film' if film else 'bulk'}-{nkpts}kpts"
+            print(f"{case:<18} " + " ".join(f"{time:>26.4f}" for time in times))
+
+
+if __name__ == "__main__":
+    main()
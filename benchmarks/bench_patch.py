@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of updating an existing inp.xml with a modified structure and parameters.
+
+Synthetic inputs are generated from ``test-files/inp.xml`` and ``test-files/inp_film.xml``
+(see ``bench_fleurinput.py``). The atoms are displaced and ``kmax`` is changed, then the
+file is updated with
+
+- ``patch_inpxml``: minimal text edits of the existing file
+- ``parse+write``: parsing the file into a XML tree and serializing it again
+  (lower bound for any approach going through a XML tree)
+- ``write_file[template]``: filling the file as template (symmetry analysis, atom groups, validation)
+
+Run with::
+
+    python benchmarks/bench_patch.py --atoms 16 1000 --kpoints 1000 20000
+
+"""
+import argparse
+import timeit
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from bench_fleurinput import synthetic_inpxml
+from lxml import etree
+
+from pymatgen.io.fleur import FleurInput
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--atoms", type=int, nargs="+", default=[16, 1000])
+    parser.add_argument("--kpoints", type=int, nargs="+", default=[1000, 20000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    operations = ("patch_inpxml", "parse+write", "write_file[template]")
+    print(f"{'case':<26} " + " ".join(f"{name + ' [s]':>24}" for name in operations))
+    with TemporaryDirectory() as td:
+        workdir = Path(td)
+        template = workdir / "template.xml"
+        target = workdir / "inp.xml"
+        for film in (False, True):
+            for natoms in args.atoms:
+                for nkpts in args.kpoints:
+                    template.write_text(synthetic_inpxml(film, natoms, nkpts), encoding="utf-8")
+                    fleur_inp = FleurInput.from_file(template)
+                    fleur_inp.structure.perturb(0.01)
+                    fleur_inp.lapw_parameters["comp"]["kmax"] += 0.5
+
+                    def patch():
+                        fleur_inp.patch_inpxml(template, output=target)
+
+                    def parse_write():
+                        etree.parse(str(template)).write(str(target), encoding="UTF-8", xml_declaration=True)
+
+                    def write_template():
+                        fleur_inp.write_file(target, template=template)
+
+                    times = [
+                        min(timeit.repeat(func, number=1, repeat=args.repeat))
+                        for func in (patch, parse_write, write_template)
+                    ]
+                    case = f"{'film' if film else 'bulk'}-{natoms}atoms-{nkpts}kpts"
+                    print(f"{case:<26} " + " ".join(f"{time:>24.4f}" for time in times))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the cost of the timing instrumentation (see ``pymatgen.io.fleur.profiling``).
+
+The inputs in ``test-files`` are read with ``from_string`` and rendered with
+``get_inpgen_file_content`` (without the render cache, i.e. on fresh objects)
+
+- ``disabled``: no active profiler (the default)
+- ``enabled``: inside ``profile()``
+
+and the time per call is reported together with the cost of a single disabled stage. Run with::
+
+    python benchmarks/bench_profiling.py --number 500
+
+"""
+import argparse
+import timeit
+from pathlib import Path
+
+from pymatgen.io.fleur import FleurInput
+from pymatgen.io.fleur.profiling import profile, stage
+
+TEST_FILES_DIR = Path(__file__).absolute().parent.parent / "test-files"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    contents = {
+        name: (TEST_FILES_DIR / name).read_bytes() if name.endswith(".xml") else (TEST_FILES_DIR / name).read_text()
+        for name in ("inp_test", "inp.xml")
+    }
+    inputs = {name: FleurInput.from_string(data, inpgen_input=isinstance(data, str)) for name, data in contents.items()}
+
+    def disabled_stage():
+        with stage("parse"):
+            pass
+
+    per_stage = min(timeit.repeat(disabled_stage, number=100000, repeat=args.repeat)) / 100000
+    print(f"disabled stage: {1e9 * per_stage:.0f} ns")
+
+    print(f"{'case':<36} {'disabled [ms]':>14} {'enabled [ms]':>13}")
+    for name, data in contents.items():
+        fleur_inp = inputs[name]
+        cases = {
+            f"from_string[{name}]": lambda: FleurInput.from_string(data, inpgen_input=isinstance(data, str)),
+            f"get_inpgen_file_content[{name}]": lambda: FleurInput(
+                fleur_inp.structure, fleur_inp.title, fleur_inp.lapw_parameters
+            ).get_inpgen_file_content(),
+        }
+        for case, func in cases.items():
+            disabled = min(timeit.repeat(func, number=args.number, repeat=args.repeat)) / args.number
+            with profile():
+                enabled = min(timeit.repeat(func, number=args.number, repeat=args.repeat)) / args.number
+            print(f"{case:<36} {1000 * disabled:>14.4f} {1000 * enabled:>13.4f}")
+
+
+if __name__ == "__main__":
+    main()
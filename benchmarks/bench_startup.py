@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the import time and the latency of the first FleurInput.from_file call
+in a fresh interpreter, as seen by short-lived CLI jobs and serverless workers.
+
+Every measurement runs in a new process. The following files are read
+
+- ``inpgen``: ``test-files/inp_test``
+- ``inp.xml``: ``test-files/inp.xml``
+- ``inp.xml[misnamed.gz]``: ``test-files/inp.xml`` gzip-compressed and stored as ``inp``
+- ``inp.xml[schema cache]``: ``test-files/inp.xml`` with a warm on-disk schema cache
+  (``PYMATGEN_IO_FLEUR_SCHEMA_CACHE``)
+
+The median of ``--repeat`` processes is reported together with the backend modules
+imported by the process. Run with::
+
+    python benchmarks/bench_startup.py --repeat 10
+
+"""
+import argparse
+import gzip
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+TEST_FILES_DIR = Path(__file__).absolute().parent.parent / "test-files"
+
+#: Modules reported if they were imported by the process
+BACKENDS = (
+    "lxml.etree",
+    "masci_tools.io.fleur_inpgen",
+    "masci_tools.io.fleur_xml",
+    "masci_tools.util.xml.xml_getters",
+)
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from pymatgen.io.fleur import FleurInput
+imported = time.perf_counter()
+FleurInput.from_file(sys.argv[1]).structure
+done = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "first_call": done - imported,
+    "backends": [name for name in sys.argv[2:] if name in sys.modules],
+}))
+"""
+
+
+def measure(path: Path, env: dict) -> dict:
+    """
+    Run the script in a new interpreter and return its measurements
+    """
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", SCRIPT, str(path), *BACKENDS],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as td:
+        misnamed = Path(td) / "inp"
+        misnamed.write_bytes(gzip.compress((TEST_FILES_DIR / "inp.xml").read_bytes()))
+
+        env = {key: val for key, val in os.environ.items() if key != "PYMATGEN_IO_FLEUR_SCHEMA_CACHE"}
+        env_cache = {**env, "PYMATGEN_IO_FLEUR_SCHEMA_CACHE": str(Path(td) / "schemas")}
+        measure(TEST_FILES_DIR / "inp.xml", env_cache)
+
+        cases = {
+            "inpgen": (TEST_FILES_DIR / "inp_test", env),
+            "inp.xml": (TEST_FILES_DIR / "inp.xml", env),
+            "inp.xml[misnamed.gz]": (misnamed, env),
+            "inp.xml[schema cache]": (TEST_FILES_DIR / "inp.xml", env_cache),
+        }
+
+        print(f"{'case':<24} {'import [s]':>11} {'first call [s]':>15}  backends")
+        for name, (path, case_env) in cases.items():
+            results = [measure(path, case_env) for _ in range(args.repeat)]
+            import_time = statistics.median(result["import"] for result in results)
+            first_call = statistics.median(result["first_call"] for result in results)
+            backends = ", ".join(results[0]["backends"])
+            print(f"{name:<24} {import_time:>11.3f} {first_call:>15.3f}  {backends}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the construction of the Structure in FleurInput from the
+atom sites returned by the masci_tools parsers.
+
+Compares the previous construction (per-site ``zip`` and cartesian coordinates
+passed to ``Structure``) with the array based construction used by
+:py:class:`~pymatgen.io.fleur.FleurInput`. Run with::
+
+    python benchmarks/bench_structure.py --sizes 1000 10000 50000
+
+"""
+import argparse
+import timeit
+
+import numpy as np
+from masci_tools.io.common_functions import AtomSiteProperties
+
+from pymatgen.core import Lattice, Structure
+from pymatgen.io.fleur.fleurinput import FleurInput
+
+
+def synthetic_atoms(natoms: int, seed: int = 0):
+    """
+    Return cell, atom sites and pbc of a random cubic supercell with natoms sites
+    """
+    rng = np.random.default_rng(seed)
+    length = 2.5 * natoms ** (1 / 3)
+    cell = np.eye(3) * length
+    symbols = rng.choice(["Si", "Ge", "O", "Fe"], size=natoms)
+    positions = rng.random((natoms, 3)) * length
+    atoms = [
+        AtomSiteProperties(position=list(pos), symbol=str(symbol), kind=str(symbol))
+        for pos, symbol in zip(positions, symbols)
+    ]
+    return cell, atoms, (True, True, True)
+
+
+def build_per_site(cell, atoms, pbc):
+    """
+    Structure construction as previously done in FleurInput.from_string
+    """
+    positions, elements = zip(*[(site.position, site.symbol) for site in atoms])
+    structure = Structure(Lattice(cell, pbc=pbc), elements, positions, coords_are_cartesian=True)
+    return FleurInput(structure, "", lapw_parameters={}).structure
+
+
+def build_arrays(cell, atoms, pbc):
+    """
+    Structure construction as done in FleurInput
+    """
+    return FleurInput._from_parsed_data(atoms, cell, pbc, {}).structure  # pylint: disable=protected-access
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'atoms':>8} {'per-site [s]':>14} {'arrays [s]':>12} {'speedup':>8}")
+    for natoms in args.sizes:
+        data = synthetic_atoms(natoms)
+        old_structure, new_structure = build_per_site(*data), build_arrays(*data)
+        # Structure.__eq__ scales quadratically with the number of sites
+        assert old_structure.species == new_structure.species
+        assert np.allclose(old_structure.frac_coords, new_structure.frac_coords)
+
+        old = min(timeit.repeat(lambda: build_per_site(*data), number=1, repeat=args.repeat))
+        new = min(timeit.repeat(lambda: build_arrays(*data), number=1, repeat=args.repeat))
+        print(f"{natoms:>8} {old:>14.4f} {new:>12.4f} {old / new:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
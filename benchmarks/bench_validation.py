@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the schema validation modes when parsing inp.xml files.
+
+Synthetic inputs are generated from ``test-files/inp.xml`` and ``test-files/inp_film.xml``
+(see ``bench_fleurinput.py``) with increasing numbers of k-points. Each input is
+parsed ``--files`` times with ``FleurInput.from_string`` for every validation mode,
+simulating a pipeline re-reading the inputs it generated. Run with::
+
+    python benchmarks/bench_validation.py --kpoints 1000 20000 100000
+
+"""
+import argparse
+import timeit
+
+from bench_fleurinput import synthetic_inpxml
+
+from pymatgen.io.fleur import FleurInput
+from pymatgen.io.fleur.schema import VALIDATION_MODES, get_schema_registry
+
+
+def parse_all(contents, validate: str) -> None:
+    """
+    Parse all given inp.xml contents with the given validation mode
+    """
+    for content in contents:
+        FleurInput.from_string(content, inpgen_input=False, validate=validate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kpoints", type=int, nargs="+", default=[1000, 20000, 100000])
+    parser.add_argument("--atoms", type=int, default=16)
+    parser.add_argument("--files", type=int, default=10, help="number of times each input is parsed")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    registry = get_schema_registry()
+
+    def reset_registry():
+        # Start every run without seen inputs, so that the sample mode validates the first file
+        registry.clear()
+        registry.preload(["0.34"])
+
+    print(f"{'case':<22} " + " ".join(f"{mode + ' [s]':>12}" for mode in VALIDATION_MODES) + f" {'full/off':>9}")
+    for film in (False, True):
+        for nkpts in args.kpoints:
+            contents = [synthetic_inpxml(film, args.atoms, nkpts)] * args.files
+            times = {}
+            for mode in VALIDATION_MODES:
+                times[mode] = min(
+                    timeit.repeat(
+                        lambda mode=mode: parse_all(contents, mode),
+                        setup=reset_registry,
+                        number=1,
+                        repeat=args.repeat,
+                    )
+                )
+            case = f"{'film' if film else 'bulk'}-{nkpts}kpts"
+            print(
+                f"{case:<22} "
+                + " ".join(f"{times[mode]:>12.4f}" for mode in VALIDATION_MODES)
+                + f" {times['full'] / times['off']:>8.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
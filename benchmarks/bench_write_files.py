@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of writing large batches of inpgen files.
+
+``--inputs`` copies of the inputs in ``test-files`` (with perturbed structures, so that
+every file has to be rendered) are written with
+
+- ``loop``: calling ``write_file`` for every input into its own directory (the previous approach)
+- ``write_files[threads]`` and ``write_files[processes]`` into a sharded directory tree
+- ``write_files[tar.gz]`` and ``write_files[zip]`` into a single archive
+
+and the throughput in files per second is reported. Run with::
+
+    python benchmarks/bench_write_files.py --inputs 20000 --workers 8
+
+The directory is created in ``--tmpdir``, which should be on the filesystem of interest
+"""
+import argparse
+import os
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from pymatgen.io.fleur import FleurInput
+
+TEST_FILES_DIR = Path(__file__).absolute().parent.parent / "test-files"
+
+
+def make_inputs(count: int):
+    """
+    Return count inputs with randomly perturbed structures
+    """
+    templates = [FleurInput.from_file(TEST_FILES_DIR / name) for name in ("inp.xml", "inp_film.xml", "inp_test")]
+    inputs = []
+    for index in range(count):
+        template = templates[index % len(templates)]
+        structure = template.structure.copy()
+        structure.perturb(0.01)
+        inputs.append(FleurInput(structure, title=template.title, lapw_parameters=template.lapw_parameters))
+    return inputs
+
+
+def write_loop(inputs, root: Path) -> None:
+    """
+    Write the inputs one at a time with write_file
+    """
+    for index, fleur_inp in enumerate(inputs):
+        directory = root / str(index)
+        directory.mkdir(parents=True)
+        fleur_inp.write_file(str(directory / "inp"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--inputs", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--tmpdir", type=Path, default=None)
+    args = parser.parse_args()
+
+    cases = {
+        "loop": lambda inputs, root: write_loop(inputs, root),
+        "write_files[threads]": lambda inputs, root: FleurInput.write_files(inputs, root, workers=args.workers),
+        "write_files[processes]": lambda inputs, root: FleurInput.write_files(
+            inputs, root, workers=args.workers, processes=True
+        ),
+        "write_files[tar.gz]": lambda inputs, root: FleurInput.write_files(
+            inputs, root, workers=args.workers, archive=root.parent / f"{root.name}.tar.gz"
+        ),
+        "write_files[zip]": lambda inputs, root: FleurInput.write_files(
+            inputs, root, workers=args.workers, archive=root.parent / f"{root.name}.zip"
+        ),
+    }
+
+    print(f"{args.inputs} inputs, {args.workers} workers")
+    print(f"{'case':<24} {'time [s]':>10} {'files/s':>10} {'speedup':>8}")
+    baseline = None
+    for name, func in cases.items():
+        # The inputs are created for every case, so that no case profits from cached renderings
+        inputs = make_inputs(args.inputs)
+        with TemporaryDirectory(dir=args.tmpdir) as td:
+            start = time.perf_counter()
+            func(inputs, Path(td) / "out")
+            elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline = elapsed
+        print(f"{name:<24} {elapsed:>10.3f} {args.inputs / elapsed:>10.1f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
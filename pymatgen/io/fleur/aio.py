@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+# Copyright (c)
+# Distributed under the terms of the MIT License
+"""
+This module provides coroutines for reading and writing fleur input files
+from asyncio code without blocking the event loop.
+
+File access is done in the default executor of the event loop, while the
+parsing and rendering of the files can be moved to a separate executor,
+e.g. a :py:class:`~concurrent.futures.ProcessPoolExecutor`
+
+.. code-block:: python
+
+    import asyncio
+    from pymatgen.io.fleur import FleurInput
+
+    async def main():
+        fleur_inp = await FleurInput.afrom_file('inp.xml')
+        await fleur_inp.awrite_file('inp_new')
+
+        async for result in FleurInput.afrom_files(paths, max_concurrency=16):
+            print(result.path, result.ok)
+
+    asyncio.run(main())
+
+"""
+import asyncio
+import io
+from concurrent.futures import Executor
+from functools import partial
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+from monty.io import zopen
+
+from pymatgen.util.typing import PathLike
+
+from pymatgen.io.fleur.batch import ParseResult
+from pymatgen.io.fleur.fleurinput import FleurInput
+from pymatgen.io.fleur.profiling import count, get_profiler, profiled, stage
+from pymatgen.io.fleur.sniff import open_input
+
+__all__ = ("afrom_file", "afrom_files", "awrite_file")
+
+
+def _read_file(filename: PathLike) -> Tuple[Union[str, bytes], bool]:
+    """
+    Read the complete content of a (possibly compressed) file and detect
+    whether it is inpgen input (see :py:func:`~pymatgen.io.fleur.sniff.open_input()`)
+    """
+    f, file_format = open_input(filename)
+    with f:
+        if file_format == "inpgen":
+            return io.TextIOWrapper(f).read(), True
+        return f.read(), False
+
+
+@profiled("write_file")
+def _write_file(filename: PathLike, content: str) -> None:
+    """
+    Write the content to a (possibly compressed) file
+    """
+    with stage("write"):
+        with zopen(filename, "wt") as f:
+            f.write(content)
+    if get_profiler() is not None:
+        count(bytes_written=len(content.encode("utf-8")))
+
+
+async def afrom_file(filename: PathLike, executor: Optional[Executor] = None, **kwargs: Any) -> FleurInput:
+    """
+    Read the fleur input from a file without blocking the event loop
+
+    Args:
+        filename (PathLike): file to read in. Whether it is interpreted as inp.xml or
+                             inpgen input is detected in the same way as in :py:meth:`FleurInput.from_file()`
+        executor (Executor): executor to run the parsing in. Defaults to the default executor of the event loop
+
+    Kwargs are passed on to :py:meth:`FleurInput.from_string()`
+
+    returns: :py:class:`FleurInput` generated from the information read in from the file
+    """
+    loop = asyncio.get_running_loop()
+
+    data, inpgen_input = await loop.run_in_executor(None, _read_file, filename)
+
+    kwargs.setdefault("base_url", filename)
+    parse = partial(FleurInput.from_string, data, inpgen_input=inpgen_input, **kwargs)
+    return await loop.run_in_executor(executor, parse)
+
+
+async def awrite_file(
+    fleur_input: FleurInput,
+    filename: PathLike,
+    executor: Optional[Executor] = None,
+    template: Optional[Any] = None,
+    **kwargs: Any,
+) -> None:
+    """
+    Write the inpgen input of a :py:class:`FleurInput` to a file without blocking the event loop
+
+    Args:
+        fleur_input (FleurInput): input to write out
+        filename (PathLike): file to write the inpgen input or inp.xml to
+        executor (Executor): executor to render the file content in. Defaults to the
+                             default executor of the event loop
+        template: template inp.xml. Required for writing inp.xml files (see :py:meth:`FleurInput.write_file()`)
+
+    Kwargs are passed on to :py:meth:`FleurInput.get_inpgen_file_content()` or for
+    inp.xml files to :py:func:`~pymatgen.io.fleur.xmlwriter.write_inpxml()`
+    """
+    loop = asyncio.get_running_loop()
+    if not FleurInput._is_inpgen_file(filename):
+        if template is None:
+            raise ValueError("Writing out of fleur XML files requires a template inp.xml")
+        # The XML tree is filled and written in one go
+        await loop.run_in_executor(executor, partial(fleur_input.write_file, filename, template=template, **kwargs))
+        return
+
+    content = await loop.run_in_executor(executor, partial(fleur_input.get_inpgen_file_content, **kwargs))
+    await loop.run_in_executor(None, _write_file, filename, content)
+
+
+async def _parse_file(path: PathLike, executor: Optional[Executor], kwargs: dict) -> ParseResult:
+    """
+    Parse a single file, capturing any exception in the result
+    """
+    try:
+        return ParseResult(path, fleur_input=await afrom_file(path, executor=executor, **kwargs))
+    except Exception as exc:  # pylint: disable=broad-except
+        return ParseResult(path, error=exc)
+
+
+async def afrom_files(
+    paths: Iterable[PathLike],
+    max_concurrency: int = 8,
+    executor: Optional[Executor] = None,
+    ordered: bool = True,
+    **kwargs: Any,
+) -> AsyncIterator[ParseResult]:
+    """
+    Read fleur input files concurrently without blocking the event loop
+
+    At most ``max_concurrency`` files are read and parsed at the same time. Errors for
+    individual files do not abort the batch but are returned as the ``error`` attribute
+    of the corresponding :py:class:`~pymatgen.io.fleur.batch.ParseResult`
+
+    Args:
+        paths: iterable of files to read in (see :py:func:`afrom_file`)
+        max_concurrency (int): maximum number of files read at the same time
+        executor (Executor): executor to run the parsing in. Defaults to the default executor of the event loop
+        ordered (bool): if True the results are returned in the order of ``paths``,
+                        otherwise in the order in which they are completed
+
+    Kwargs are passed on to :py:meth:`FleurInput.from_string()`
+
+    returns: asynchronous generator of :py:class:`~pymatgen.io.fleur.batch.ParseResult`
+    """
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency has to be at least 1, got {max_concurrency}")
+
+    pending: Dict["asyncio.Task[ParseResult]", PathLike] = {}
+
+    async def collect() -> List[ParseResult]:
+        if ordered:
+            done = [next(iter(pending))]
+            await done[0]
+        else:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)  # type: ignore[assignment]
+        for task in done:
+            pending.pop(task)
+        return [task.result() for task in done]
+
+    try:
+        for path in paths:
+            pending[asyncio.ensure_future(_parse_file(path, executor, kwargs))] = path
+            if len(pending) >= max_concurrency:
+                for result in await collect():
+                    yield result
+
+        while pending:
+            for result in await collect():
+                yield result
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,542 @@
+# -*- coding: utf-8 -*-
+# Copyright (c)
+# Distributed under the terms of the MIT License
+"""
+This module provides functionality for reading many fleur input files
+in parallel using a process pool, for reading inputs directly from archives
+and concatenated streams and for writing large batches of inputs
+into sharded directory trees or archives.
+"""
+import fnmatch
+import io
+import os
+import tarfile
+import time
+import zipfile
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from pathlib import Path, PurePosixPath
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sized, Tuple, Union
+
+from pymatgen.util.typing import PathLike
+
+from pymatgen.io.fleur.fleurinput import FleurInput
+
+__all__ = ("ParseResult", "iter_from_files", "iter_from_directory", "iter_from_stream", "write_files")
+
+#: Extensions of the supported compression formats for :py:func:`write_files`
+COMPRESSION_SUFFIXES = {"gz": ".gz", "bz2": ".bz2", "xz": ".xz"}
+
+Layout = Union[str, Callable[[int, FleurInput], str]]
+
+
+class ParseResult(NamedTuple):
+    """
+    Result of parsing a single file in a batch
+
+    .. attribute:: path
+
+        Path of the parsed file.
+
+    .. attribute:: fleur_input
+
+        :py:class:`~pymatgen.io.fleur.FleurInput` read from the file or None if parsing failed.
+
+    .. attribute:: error
+
+        Exception raised while parsing the file or None if parsing succeeded.
+
+    """
+
+    path: PathLike
+    fleur_input: Optional[FleurInput] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        """
+        True if the file was parsed successfully
+        """
+        return self.error is None
+
+
+def _parse_file(path: PathLike, kwargs: dict) -> ParseResult:
+    """
+    Parse a single file, capturing any exception in the result
+    """
+    try:
+        return ParseResult(path, fleur_input=FleurInput.from_file(path, **kwargs))
+    except Exception as exc:  # pylint: disable=broad-except
+        return ParseResult(path, error=exc)
+
+
+def _run_batch(
+    func: Callable[..., Any],
+    items: Iterable[Tuple[Any, ...]],
+    executor: Executor,
+    max_pending: int,
+    ordered: bool,
+    on_error: Callable[[Tuple[Any, ...], BaseException], Any],
+) -> Iterator[Any]:
+    """
+    Submit ``func(*item)`` for all items to the executor, keeping at most ``max_pending``
+    tasks in flight, and yield the results either in submission or completion order
+
+    Exceptions raised by the executor itself (e.g. a broken pool) are turned into
+    results with ``on_error``
+    """
+    pending: Dict["Future[Any]", Tuple[Any, ...]] = {}
+
+    def collect() -> Iterator[Any]:
+        if ordered:
+            done = [next(iter(pending))]
+        else:
+            done = list(wait(pending, return_when=FIRST_COMPLETED).done)
+        for future in done:
+            item = pending.pop(future)
+            try:
+                yield future.result()
+            except Exception as exc:  # pylint: disable=broad-except
+                yield on_error(item, exc)
+
+    for item in items:
+        pending[executor.submit(func, *item)] = item
+        if len(pending) >= max_pending:
+            yield from collect()
+
+    while pending:
+        yield from collect()
+
+
+def iter_from_files(
+    paths: Iterable[PathLike], workers: Optional[int] = None, ordered: bool = True, **kwargs: Any
+) -> Iterator[ParseResult]:
+    """
+    Read fleur input files in parallel in a process pool
+
+    Errors for individual files do not abort the batch but are returned
+    as the ``error`` attribute of the corresponding :py:class:`ParseResult`
+
+    Args:
+        paths: iterable of files to read in. Whether a file is interpreted as inp.xml or
+               inpgen input is decided in the same way as in :py:meth:`FleurInput.from_file()`
+        workers (int): number of worker processes. Defaults to the number of CPUs.
+                       If 1 or less the files are read in the current process
+        ordered (bool): if True the results are returned in the order of ``paths``,
+                        otherwise in the order in which they are completed
+
+    Kwargs are passed on to :py:meth:`FleurInput.from_file()`
+
+    returns: generator of :py:class:`ParseResult`
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1:
+        for path in paths:
+            yield _parse_file(path, kwargs)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from _run_batch(
+            _parse_file,
+            ((path, kwargs) for path in paths),
+            executor,
+            max_pending=4 * workers,
+            ordered=ordered,
+            on_error=lambda item, exc: ParseResult(item[0], error=exc),
+        )
+
+
+def iter_from_directory(
+    root: PathLike,
+    pattern: str = "inp.xml",
+    recursive: bool = True,
+    workers: Optional[int] = None,
+    ordered: bool = True,
+    **kwargs: Any,
+) -> Iterator[ParseResult]:
+    """
+    Read all fleur input files matching a pattern in a directory tree in parallel
+
+    Args:
+        root (PathLike): directory to search for files
+        pattern (str): glob pattern the file names have to match, e.g. ``inp.xml`` or ``inp_*``
+        recursive (bool): if True all subdirectories of ``root`` are searched as well
+        workers (int): number of worker processes. Defaults to the number of CPUs
+        ordered (bool): if True the results are returned in sorted order of the paths,
+                        otherwise in the order in which they are completed
+
+    Kwargs are passed on to :py:meth:`FleurInput.from_file()`
+
+    returns: generator of :py:class:`ParseResult`
+    """
+    root = Path(root)
+    paths = root.rglob(pattern) if recursive else root.glob(pattern)
+    if ordered:
+        paths = sorted(paths)  # type: ignore[assignment]
+    yield from iter_from_files((path for path in paths if path.is_file()), workers=workers, ordered=ordered, **kwargs)
+
+
+def _parse_member(name: str, data: bytes, kwargs: dict) -> ParseResult:
+    """
+    Parse the content of a single archive member or document of a stream,
+    capturing any exception in the result
+    """
+    from pymatgen.io.fleur.sniff import SNIFF_SIZE, decompress, detect_format
+
+    try:
+        data = decompress(data)
+        file_format = detect_format(data[:SNIFF_SIZE])
+        if file_format is None:
+            file_format = "xml" if ".xml" in PurePosixPath(name).suffixes else "inpgen"
+        inpgen_input = file_format == "inpgen"
+        content: Union[str, bytes] = io.TextIOWrapper(io.BytesIO(data)).read() if inpgen_input else data
+        return ParseResult(name, fleur_input=FleurInput.from_string(content, inpgen_input=inpgen_input, **kwargs))
+    except Exception as exc:  # pylint: disable=broad-except
+        return ParseResult(name, error=exc)
+
+
+def _iter_tar_members(stream: IO[bytes], pattern: Optional[str]) -> Iterator[Tuple[str, bytes]]:
+    """
+    Read the regular files of a tar archive sequentially (the stream does not have to be seekable)
+    """
+    with tarfile.open(fileobj=stream, mode="r|") as tar:
+        for member in tar:
+            if member.isfile() and (pattern is None or fnmatch.fnmatchcase(PurePosixPath(member.name).name, pattern)):
+                extracted = tar.extractfile(member)
+                if extracted is not None:
+                    yield member.name, extracted.read()
+            # The TarFile keeps every member read so far, which would grow with the size of the archive
+            tar.members = []
+
+
+def _iter_zip_members(fileobj: Union[PathLike, IO[bytes]], pattern: Optional[str]) -> Iterator[Tuple[str, bytes]]:
+    """
+    Read the regular files of a zip archive one at a time
+    """
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            if not info.is_dir() and (
+                pattern is None or fnmatch.fnmatchcase(PurePosixPath(info.filename).name, pattern)
+            ):
+                yield info.filename, archive.read(info)
+
+
+def _iter_documents(stream: IO[bytes], label: str) -> Iterator[Tuple[str, bytes]]:
+    """
+    Split a stream of concatenated inp.xml files and inpgen inputs into the individual documents
+
+    XML documents end with the closing ``fleurInput`` tag. A inpgen input ends before the
+    next document, i.e. a line starting with ``<`` or the title line before a second ``&input`` namelist
+    """
+    lines: List[bytes] = []
+    in_xml = False
+    seen_input = False
+    index = 0
+
+    def flush(keep: int = 0) -> Iterator[Tuple[str, bytes]]:
+        nonlocal lines, index, seen_input
+        document = lines[: len(lines) - keep]
+        lines = lines[len(lines) - keep :]
+        seen_input = False
+        if any(line.strip() for line in document):
+            yield f"{label}#{index}", b"".join(document)
+            index += 1
+
+    for line in stream:
+        stripped = line.lstrip().lstrip(b"\xef\xbb\xbf")
+        if not lines and not stripped:
+            continue
+        if not in_xml and stripped.startswith(b"<"):
+            yield from flush()
+            in_xml = True
+        elif not in_xml and stripped[:6].lower() == b"&input":
+            if seen_input:
+                yield from flush(keep=1)
+            seen_input = True
+
+        lines.append(line)
+        if in_xml and b"</fleurInput>" in line:
+            yield from flush()
+            in_xml = False
+
+    yield from flush()
+
+
+def _iter_stream_members(
+    source: Union[PathLike, IO[bytes]], pattern: Optional[str], close: List[IO[bytes]]
+) -> Iterator[Tuple[str, bytes]]:
+    """
+    Detect the kind of the source (zip or tar archive or concatenated inputs) and
+    read its members. Opened file handles are added to ``close``
+    """
+    from pymatgen.io.fleur.sniff import open_stream
+
+    if isinstance(source, (str, os.PathLike)):
+        fileobj: IO[bytes] = open(source, "rb")  # pylint: disable=consider-using-with
+        close.append(fileobj)
+        label = str(source)
+    else:
+        fileobj = source
+        label = str(getattr(source, "name", "<stream>"))
+
+    stream, head = open_stream(fileobj)
+    if head.startswith((b"PK\x03\x04", b"PK\x05\x06")):
+        if not fileobj.seekable():
+            raise ValueError("Zip archives can only be read from files or seekable streams")
+        fileobj.seek(0)
+        return _iter_zip_members(fileobj, pattern)
+    if head[257:262] == b"ustar":
+        return _iter_tar_members(stream, pattern)
+    return _iter_documents(stream, label)
+
+
+def iter_from_stream(
+    source: Union[PathLike, IO[bytes]],
+    pattern: Optional[str] = None,
+    workers: Optional[int] = None,
+    ordered: bool = True,
+    **kwargs: Any,
+) -> Iterator[ParseResult]:
+    """
+    Read fleur inputs directly from an archive or a stream of concatenated inputs
+    without unpacking them to disk
+
+    The kind of the source is detected from its content
+
+    - tar archives, also compressed with gzip, bzip2 or xz. The archive is read
+      sequentially, so it can also be a pipe
+    - zip archives (the source has to be a file or a seekable stream)
+    - concatenated inp.xml files and inpgen inputs, optionally compressed as a whole.
+      Inpgen inputs have to start with the title line followed by the ``&input`` namelist
+      (as written by :py:meth:`FleurInput.write_file()`)
+
+    Members are read one at a time and may be compressed themselves. Their format
+    is detected from the content. At most ``4 * workers`` members are held in memory,
+    independent of the size of the source
+
+    Args:
+        source: path or binary file handle of the archive or stream
+        pattern (str): glob pattern the file names of archive members have to match, e.g. ``inp_*``.
+                       By default all regular files are read
+        workers (int): number of worker processes. Defaults to the number of CPUs.
+                       If 1 or less the members are parsed in the current process
+        ordered (bool): if True the results are returned in the order of the members,
+                        otherwise in the order in which they are completed
+
+    Kwargs are passed on to :py:meth:`FleurInput.from_string()`
+
+    returns: generator of :py:class:`ParseResult` with the member name (or ``<source>#<index>``
+             for concatenated inputs) as ``path``
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    opened: List[IO[bytes]] = []
+    try:
+        members = _iter_stream_members(source, pattern, opened)
+        if workers <= 1:
+            for name, data in members:
+                yield _parse_member(name, data, kwargs)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from _run_batch(
+                _parse_member,
+                ((name, data, kwargs) for name, data in members),
+                executor,
+                max_pending=4 * workers,
+                ordered=ordered,
+                on_error=lambda item, exc: ParseResult(item[0], error=exc),
+            )
+    finally:
+        for fileobj in opened:
+            fileobj.close()
+
+
+def _layout_function(layout: Layout, filename: str, shard_size: int, width: int) -> Callable[[int, FleurInput], str]:
+    """
+    Return the function giving the relative path of the i-th input for the given layout
+    """
+    if callable(layout):
+        return layout
+    if layout == "flat":
+        return lambda index, _: f"{index:0{width}d}/{filename}"
+    if layout == "sharded":
+        if shard_size < 1:
+            raise ValueError(f"shard_size has to be positive: Got {shard_size}")
+        shard_width = len(str(max((10**width - 1) // shard_size, 0)))
+        return lambda index, _: f"{index // shard_size:0{shard_width}d}/{index:0{width}d}/{filename}"
+    raise ValueError(f"Unknown layout {layout!r}. Expected 'sharded', 'flat' or a callable")
+
+
+def _write_input(fleur_input: FleurInput, path: Path, kwargs: dict) -> Path:
+    """
+    Write a single input, creating its directory
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fleur_input.write_file(path, **kwargs)
+    return path
+
+
+def _render_input(fleur_input: FleurInput, path: str, kwargs: dict) -> Tuple[str, bytes]:
+    """
+    Render the inpgen file of a single input for adding it to an archive
+    """
+    return path, fleur_input.get_inpgen_file_content(**kwargs).encode("utf-8")
+
+
+def _reraise(item: Tuple[Any, ...], exc: BaseException) -> Any:
+    """
+    Raise the error of a failed task
+    """
+    raise exc
+
+
+class _ArchiveWriter:
+    """
+    Sequential writer of members to a tar or zip archive (the format is chosen by the extension)
+    """
+
+    def __init__(self, path: Path):
+        name = path.name.lower()
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._tar: Optional[tarfile.TarFile] = None
+        if name.endswith(".zip"):
+            self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        elif name.endswith((".tar.gz", ".tgz")):
+            self._tar = tarfile.open(path, "w:gz")
+        elif name.endswith((".tar.bz2", ".tbz2")):
+            self._tar = tarfile.open(path, "w:bz2")
+        elif name.endswith((".tar.xz", ".txz")):
+            self._tar = tarfile.open(path, "w:xz")
+        elif name.endswith(".tar"):
+            self._tar = tarfile.open(path, "w")
+        else:
+            raise ValueError(f"Unsupported archive format: {path}. Expected .zip, .tar, .tar.gz, .tar.bz2 or .tar.xz")
+        self._mtime = time.time()
+
+    def add(self, name: str, data: bytes) -> None:
+        if self._zip is not None:
+            self._zip.writestr(name, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = self._mtime
+            self._tar.addfile(info, io.BytesIO(data))
+
+    def close(self) -> None:
+        if self._zip is not None:
+            self._zip.close()
+        else:
+            self._tar.close()
+
+
+def write_files(
+    fleur_inputs: Iterable[FleurInput],
+    root: PathLike,
+    layout: Layout = "sharded",
+    filename: str = "inp",
+    workers: Optional[int] = None,
+    processes: bool = False,
+    compress: Optional[str] = None,
+    shard_size: int = 1000,
+    archive: Optional[PathLike] = None,
+    **kwargs: Any,
+) -> List[Path]:
+    """
+    Write many :py:class:`FleurInput` objects in parallel into a directory tree or an archive
+
+    The path of each input relative to ``root`` is given by the ``layout``
+
+    ============= =============================================================
+    Layout        Path of the i-th input
+    ============= =============================================================
+    ``'sharded'`` ``<i // shard_size>/<i>/filename``, so that no directory
+                  has more than ``shard_size`` entries
+    ``'flat'``    ``<i>/filename``
+    callable      ``layout(i, fleur_input)``
+    ============= =============================================================
+
+    The indices are zero-padded to the number of digits of the number of inputs
+    (8 digits if ``fleur_inputs`` has no length). The inputs are rendered and written
+    while they are taken from ``fleur_inputs``, so only a limited number of them is held in memory
+
+    Args:
+        fleur_inputs: iterable of the inputs to write
+        root (PathLike): root directory of the written files
+        layout: layout of the directory tree (see above)
+        filename (str): name of the written files. If it contains ``.xml`` inp.xml files are
+                        written, which requires a ``template`` (see :py:meth:`FleurInput.write_file()`)
+        workers (int): number of workers. Defaults to the number of CPUs. If 1 or less the
+                       files are written sequentially
+        processes (bool): if True the files are rendered in a process pool, otherwise in a thread pool.
+                          Threads avoid transferring the inputs but render in parallel only
+                          while the GIL is released (e.g. during file I/O)
+        compress (str): compress the written files (``'gz'``, ``'bz2'`` or ``'xz'``),
+                        which adds the corresponding extension to the file names
+        shard_size (int): maximum number of inputs per shard for the ``'sharded'`` layout
+        archive (PathLike): if given the files are added to this tar or zip archive (chosen by the
+                            extension, e.g. ``.tar.gz`` or ``.zip``) instead of being written to ``root``.
+                            The paths in the archive are the paths relative to ``root``
+
+    Kwargs are passed on to :py:meth:`FleurInput.write_file()`
+
+    returns: list of the paths of the written files (relative to ``root`` for archives)
+    """
+    if compress is not None:
+        if compress not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression {compress!r}. Expected one of {tuple(COMPRESSION_SUFFIXES)}")
+        if archive is not None:
+            raise ValueError("Files in archives cannot be compressed individually. Use a compressed archive format")
+        filename += COMPRESSION_SUFFIXES[compress]
+    if archive is not None and not FleurInput._is_inpgen_file(filename):
+        raise ValueError("Only inpgen files can be written to archives")
+
+    width = len(str(max(len(fleur_inputs) - 1, 0))) if isinstance(fleur_inputs, Sized) else 8
+    path_of = _layout_function(layout, filename, shard_size, width)
+    root = Path(root)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if archive is not None:
+        func: Callable[..., Any] = _render_input
+        items = ((fleur_inp, path_of(index, fleur_inp), kwargs) for index, fleur_inp in enumerate(fleur_inputs))
+    else:
+        func = _write_input
+        items = ((fleur_inp, root / path_of(index, fleur_inp), kwargs) for index, fleur_inp in enumerate(fleur_inputs))
+
+    if workers <= 1:
+        results: Iterator[Any] = (func(*item) for item in items)
+        return _collect(results, archive)
+
+    pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with pool(max_workers=workers) as executor:
+        results = _run_batch(func, items, executor, max_pending=4 * workers, ordered=True, on_error=_reraise)
+        return _collect(results, archive)
+
+
+def _collect(results: Iterator[Any], archive: Optional[PathLike]) -> List[Path]:
+    """
+    Collect the written paths or add the rendered files to the archive
+    """
+    if archive is None:
+        return list(results)
+
+    writer = _ArchiveWriter(Path(archive))
+    paths = []
+    try:
+        for path, data in results:
+            writer.add(path, data)
+            paths.append(Path(path))
+    finally:
+        writer.close()
+    return paths
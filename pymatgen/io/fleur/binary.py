@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+# Copyright (c)
+# Distributed under the terms of the MIT License
+"""
+This module provides a compact binary representation of :py:class:`~pymatgen.io.fleur.FleurInput`.
+
+The record consists of a fixed size header followed by one contiguous buffer
+(all values are little-endian)
+
+============== ===================================================================
+Field          Content
+============== ===================================================================
+header         magic ``b"FLEURINP"``, format version, encoding of the parameters,
+               number of sites and the lengths of the title and parameter blobs
+lattice        3x3 float64 lattice matrix
+pbc            3 uint8 flags (padded to 8 bytes)
+coords         Nx3 float64 fractional coordinates
+numbers        N uint8 atomic numbers (padded to 8 bytes)
+title          utf-8 encoded title
+parameters     ``lapw_parameters`` encoded with msgpack (if installed) or JSON
+============== ===================================================================
+
+:py:func:`unpack_arrays` returns read-only NumPy views into the buffer, so that
+records can be inspected without copying the coordinates.
+"""
+import json
+import struct
+from typing import Any, Dict, NamedTuple, Tuple, Union
+
+import numpy as np
+
+from pymatgen.core.lattice import Lattice
+from pymatgen.core.periodic_table import Element
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+__all__ = ("FleurInputArrays", "to_bytes", "from_bytes", "unpack_arrays")
+
+MAGIC = b"FLEURINP"
+#: Version of the binary format written by :py:func:`to_bytes`
+FORMAT_VERSION = 1
+
+#: magic, format version, parameter encoding, number of sites, title length, parameter length
+_HEADER = struct.Struct("<8sHHIII")
+
+_ENCODING_JSON = 0
+_ENCODING_MSGPACK = 1
+
+
+class FleurInputArrays(NamedTuple):
+    """
+    Arrays and metadata of a binary :py:class:`~pymatgen.io.fleur.FleurInput` record
+
+    .. attribute:: lattice
+
+        3x3 array of the lattice matrix.
+
+    .. attribute:: pbc
+
+        Array of the three periodic boundary conditions.
+
+    .. attribute:: frac_coords
+
+        Nx3 array of the fractional coordinates.
+
+    .. attribute:: numbers
+
+        Array of the atomic numbers of the sites.
+
+    .. attribute:: title
+
+        Title of the input.
+
+    .. attribute:: lapw_parameters
+
+        Dict with additional LAPW calculation parameters.
+
+    """
+
+    lattice: np.ndarray
+    pbc: np.ndarray
+    frac_coords: np.ndarray
+    numbers: np.ndarray
+    title: str
+    lapw_parameters: Dict[str, Any]
+
+
+def _padding(size: int) -> int:
+    """
+    Number of bytes needed to align a buffer of the given size to 8 bytes
+    """
+    return -size % 8
+
+
+def _atomic_numbers(structure: Any) -> np.ndarray:
+    """
+    Return the atomic numbers of the sites, checking that the structure
+    can be represented by the arrays of the binary format
+    """
+    if structure.site_properties:
+        raise ValueError("Structures with site properties cannot be stored in the binary format. Use as_dict()")
+    if not all(isinstance(specie, Element) for specie in structure.species):
+        raise ValueError("Only structures of elements can be stored in the binary format. Use as_dict()")
+    if structure.charge != 0:
+        raise ValueError("Charged structures cannot be stored in the binary format. Use as_dict()")
+    return np.array([specie.Z for specie in structure.species], dtype=np.uint8)
+
+
+def _encode_parameters(parameters: Any) -> Tuple[int, bytes]:
+    """
+    Encode the parameters with msgpack if it is installed and JSON otherwise
+
+    returns: the used encoding and the encoded bytes
+    """
+    if msgpack is not None:
+        return _ENCODING_MSGPACK, msgpack.packb(parameters, use_bin_type=True)
+    return _ENCODING_JSON, json.dumps(parameters).encode("utf-8")
+
+
+def _decode_parameters(encoding: int, data: bytes) -> Any:
+    """
+    Decode parameters encoded with :py:func:`_encode_parameters`
+    """
+    if encoding == _ENCODING_MSGPACK:
+        if msgpack is None:
+            raise ImportError("The msgpack package is required for reading this binary FleurInput")
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    if encoding == _ENCODING_JSON:
+        return json.loads(data)
+    raise ValueError(f"Failed to read binary FleurInput: Unknown parameter encoding {encoding}")
+
+
+def to_bytes(fleur_input: Any) -> bytes:
+    """
+    Serialize a :py:class:`~pymatgen.io.fleur.FleurInput` into the compact binary format
+
+    Only structures of elements without site properties can be represented.
+
+    Args:
+        fleur_input (FleurInput): input to serialize
+
+    returns: bytes of the binary record
+    """
+    structure = fleur_input.structure
+    numbers = _atomic_numbers(structure)
+    encoding, parameters = _encode_parameters(fleur_input.lapw_parameters)
+    title = fleur_input.title.encode("utf-8")
+    nsites = len(structure)
+    pbc = np.array(structure.lattice.pbc, dtype=np.uint8)
+
+    return b"".join(
+        (
+            _HEADER.pack(MAGIC, FORMAT_VERSION, encoding, nsites, len(title), len(parameters)),
+            np.ascontiguousarray(structure.lattice.matrix, dtype="<f8").tobytes(),
+            pbc.tobytes(),
+            bytes(_padding(pbc.nbytes)),
+            np.ascontiguousarray(structure.frac_coords, dtype="<f8").tobytes(),
+            numbers.tobytes(),
+            bytes(_padding(numbers.nbytes)),
+            title,
+            parameters,
+        )
+    )
+
+
+def unpack_arrays(data: Union[bytes, bytearray, memoryview]) -> FleurInputArrays:
+    """
+    Read a binary record without constructing the :py:class:`~pymatgen.core.structure.Structure`
+
+    The arrays are read-only views into ``data`` (no copies are made)
+
+    Args:
+        data: binary record produced by :py:func:`to_bytes`
+
+    returns: :py:class:`FleurInputArrays` of the record
+    """
+    if len(data) < _HEADER.size:
+        raise ValueError("Failed to read binary FleurInput: The record is too short")
+    magic, version, encoding, nsites, title_len, parameters_len = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Failed to read binary FleurInput: Not a binary FleurInput record")
+    if version > FORMAT_VERSION:
+        raise ValueError(
+            f"Failed to read binary FleurInput: Unsupported format version {version}. "
+            f"Only versions up to {FORMAT_VERSION} are supported"
+        )
+
+    offset = _HEADER.size
+    lattice = np.frombuffer(data, dtype="<f8", count=9, offset=offset).reshape(3, 3)
+    offset += lattice.nbytes
+    pbc = np.frombuffer(data, dtype=np.uint8, count=3, offset=offset).astype(bool)
+    offset += 3 + _padding(3)
+    frac_coords = np.frombuffer(data, dtype="<f8", count=3 * nsites, offset=offset).reshape(nsites, 3)
+    offset += frac_coords.nbytes
+    numbers = np.frombuffer(data, dtype=np.uint8, count=nsites, offset=offset)
+    offset += nsites + _padding(nsites)
+
+    title = bytes(data[offset : offset + title_len]).decode("utf-8")
+    offset += title_len
+    parameters = bytes(data[offset : offset + parameters_len])
+    if len(parameters) != parameters_len:
+        raise ValueError("Failed to read binary FleurInput: The record is truncated")
+
+    lapw_parameters = _decode_parameters(encoding, parameters)
+
+    return FleurInputArrays(lattice, pbc, frac_coords, numbers, title, lapw_parameters)
+
+
+def from_bytes(data: Union[bytes, bytearray, memoryview]) -> Any:
+    """
+    Deserialize a :py:class:`~pymatgen.io.fleur.FleurInput` from the compact binary format
+
+    Args:
+        data: binary record produced by :py:func:`to_bytes`
+
+    returns: :py:class:`~pymatgen.io.fleur.FleurInput` of the record
+    """
+    return _from_arrays(unpack_arrays(data))
+
+
+def _from_arrays(arrays: FleurInputArrays) -> Any:
+    """
+    Construct the :py:class:`~pymatgen.io.fleur.FleurInput` from the arrays of a record
+    """
+    from pymatgen.io.fleur.fleurinput import FleurInput, _structure_from_arrays
+
+    lattice = Lattice(arrays.lattice, pbc=tuple(bool(flag) for flag in arrays.pbc))
+    structure = _structure_from_arrays(lattice, arrays.numbers.tolist(), arrays.frac_coords)
+    fleur_input = FleurInput(structure, lapw_parameters=arrays.lapw_parameters)
+    # Set explicitly, since an empty title would be replaced by the formula
+    fleur_input.title = arrays.title
+    return fleur_input
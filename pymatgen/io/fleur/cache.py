@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+# Copyright (c)
+# Distributed under the terms of the MIT License
+"""
+This module provides a persistent cache for parsed fleur input files.
+
+The cache stores the ``as_dict()`` representation of a :py:class:`~pymatgen.io.fleur.FleurInput`
+keyed by a hash of the raw file content and the options used for parsing. It is disabled by default
+and can be enabled for the whole process with :py:func:`set_parse_cache`
+
+.. code-block:: python
+
+    from pymatgen.io.fleur import FleurInput
+    from pymatgen.io.fleur.cache import ParseCache, set_parse_cache
+
+    cache = set_parse_cache(ParseCache(max_entries=100000))
+    fleur_inp = FleurInput.from_file('inp.xml')  # parsed and stored
+    fleur_inp = FleurInput.from_file('inp.xml')  # loaded from the cache
+    print(cache.stats())
+
+"""
+import hashlib
+import json
+import os
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional, Union
+
+from pymatgen.util.typing import PathLike
+
+if TYPE_CHECKING:
+    import sqlite3
+
+__all__ = ("ParseCache", "get_parse_cache", "set_parse_cache")
+
+_PARSE_CACHE: Optional["ParseCache"] = None
+
+
+def _default_cache_path() -> Path:
+    """
+    Default location of the cache database
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")
+    return Path(cache_home) / "pymatgen-io-fleur" / "parse_cache.sqlite"
+
+
+class ParseCache:
+    """
+    Size-bounded on-disk cache of parsed fleur inputs stored in a sqlite database
+
+    Entries are evicted in least-recently-used order once either ``max_entries``
+    or ``max_size`` (total size of the stored payloads in bytes) is exceeded.
+
+    .. attribute:: hits
+
+        Number of lookups in this process that were found in the cache.
+
+    .. attribute:: misses
+
+        Number of lookups in this process that were not found in the cache.
+
+    """
+
+    def __init__(
+        self,
+        path: Optional[PathLike] = None,
+        max_entries: Optional[int] = 10000,
+        max_size: Optional[int] = None,
+    ):
+        """
+        Args:
+            path (PathLike): file of the sqlite database. Defaults to ``parse_cache.sqlite``
+                             in the user cache directory
+            max_entries (int): maximum number of stored entries (None for no limit)
+            max_size (int): maximum total size of the stored entries in bytes (None for no limit)
+        """
+        self.path = Path(path) if path is not None else _default_cache_path()
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(key TEXT PRIMARY KEY, payload BLOB NOT NULL, size INTEGER NOT NULL, last_access INTEGER NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator["sqlite3.Connection"]:
+        """
+        Open a connection to the database. A new connection is used for each
+        operation, so that the cache can be shared between threads and processes
+        """
+        # Imported here, so that parsing without a cache does not load sqlite3
+        import sqlite3
+
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def key(data: Union[str, bytes], **options: Any) -> str:
+        """
+        Compute the cache key for the given raw content and parsing options
+
+        Args:
+            data (str or bytes): raw content of the file
+
+        Kwargs are the options used for parsing the data
+
+        returns: str of the hex digest identifying the entry
+        """
+        from masci_tools import __version__ as masci_tools_version
+        from pymatgen.io.fleur import __version__
+
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        digest = hashlib.sha256(data)
+        digest.update(b"\0")
+        digest.update(json.dumps(options, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(f"\0{__version__}\0{masci_tools_version}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the entry for the given key
+
+        Args:
+            key (str): key of the entry
+
+        returns: the stored payload or None if the key is not in the cache. MSONable objects
+                 (e.g. a stored :py:class:`~pymatgen.io.fleur.FleurInput`) and NumPy arrays
+                 are decoded with :py:class:`~monty.json.MontyDecoder`
+        """
+        from monty.json import MontyDecoder
+
+        with self._connect() as connection:
+            row = connection.execute("SELECT payload FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            connection.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time_ns(), key))
+
+        self.hits += 1
+        return json.loads(zlib.decompress(row[0]), cls=MontyDecoder)
+
+    def put(self, key: str, payload: Dict[str, Any]) -> None:
+        """
+        Store an entry in the cache and evict the least recently used
+        entries if the limits of the cache are exceeded
+
+        Args:
+            key (str): key of the entry
+            payload (dict): dict to store, which is serialized with :py:class:`~monty.json.MontyEncoder`
+        """
+        from monty.json import MontyEncoder
+
+        data = zlib.compress(json.dumps(payload, cls=MontyEncoder).encode("utf-8"))
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO entries (key, payload, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, data, len(data), time.time_ns()),
+            )
+            if self.max_entries is not None:
+                connection.execute(
+                    "DELETE FROM entries WHERE key IN "
+                    "(SELECT key FROM entries ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            if self.max_size is not None:
+                connection.execute(
+                    "DELETE FROM entries WHERE key IN "
+                    "(SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY last_access DESC) AS total FROM entries) "
+                    "WHERE total > ?)",
+                    (self.max_size,),
+                )
+
+    def clear(self) -> None:
+        """
+        Remove all entries from the cache and reset the counters
+        """
+        with self._connect() as connection:
+            connection.execute("DELETE FROM entries")
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        with self._connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the hit/miss counters of this process together with the
+        number and total size of the stored entries
+        """
+        with self._connect() as connection:
+            entries, size = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "size": size}
+
+
+def get_parse_cache() -> Optional[ParseCache]:
+    """
+    Return the parse cache used by :py:meth:`~pymatgen.io.fleur.FleurInput.from_string()`
+    and :py:meth:`~pymatgen.io.fleur.FleurInput.from_file()` or None if caching is disabled
+    """
+    return _PARSE_CACHE
+
+
+def set_parse_cache(cache: Optional[ParseCache]) -> Optional[ParseCache]:
+    """
+    Set the parse cache used by :py:meth:`~pymatgen.io.fleur.FleurInput.from_string()`
+    and :py:meth:`~pymatgen.io.fleur.FleurInput.from_file()`
+
+    Args:
+        cache (ParseCache): cache to use or None to disable caching
+
+    returns: the cache passed in
+    """
+    global _PARSE_CACHE  # pylint: disable=global-statement
+    _PARSE_CACHE = cache
+    return cache
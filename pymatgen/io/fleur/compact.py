@@ -0,0 +1,417 @@
+# -*- coding: utf-8 -*-
+# Copyright (c)
+# Distributed under the terms of the MIT License
+"""
+This module provides :py:class:`CompactFleurInput`, a memory efficient representation of
+:py:class:`~pymatgen.io.fleur.FleurInput` for holding large collections in memory.
+
+Instead of a :py:class:`~pymatgen.core.structure.Structure` with one site object per atom,
+the lattice, periodic boundary conditions, atomic numbers and fractional coordinates are
+stored as (read-only) NumPy arrays in an object with ``__slots__``. Identical sets of
+``lapw_parameters`` are stored only once in a :py:class:`ParameterPool` and shared
+between all inputs using them. The pool only keeps the parameter sets still used by inputs
+
+.. code-block:: python
+
+    from pymatgen.io.fleur.compact import CompactFleurInput
+
+    compact = [CompactFleurInput.from_fleur_input(fleur_inp) for fleur_inp in fleur_inputs]
+    compact[0].write_file('inp')              # rendered from the arrays
+    structure = compact[0].structure          # constructed on demand
+    fleur_inp = compact[0].to_fleur_input()   # full FleurInput
+
+Accessing :py:attr:`CompactFleurInput.lapw_parameters` returns a copy of the shared dict,
+so that modifying it does not affect other inputs.
+"""
+import copy
+import json
+import sys
+import threading
+import weakref
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+from monty.io import zopen
+
+from pymatgen.core.composition import Composition
+from pymatgen.core.lattice import Lattice
+from pymatgen.core.periodic_table import Element
+from pymatgen.core.structure import Structure
+from pymatgen.util.typing import PathLike
+
+__all__ = ("CompactFleurInput", "ParameterPool", "get_parameter_pool")
+
+
+class _SharedParameters(dict):
+    """
+    Parameter dict of a :py:class:`ParameterPool`, which can be referenced weakly
+    """
+
+    __slots__ = ("__weakref__",)
+
+
+class ParameterPool:
+    """
+    Thread-safe pool of ``lapw_parameters`` dicts, in which equal dicts are stored only once
+
+    The pool only holds weak references, so parameter sets are removed
+    as soon as no input uses them anymore
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._parameters: "weakref.WeakValueDictionary[str, _SharedParameters]" = weakref.WeakValueDictionary()
+
+    def intern(self, parameters: dict) -> dict:
+        """
+        Return the dict of the pool equal to the given parameters, adding a copy if there is none
+
+        Args:
+            parameters (dict): LAPW parameters
+
+        returns: the shared dict of the pool (must not be modified)
+        """
+        key = json.dumps(parameters, sort_keys=True, default=repr)
+        with self._lock:
+            shared = self._parameters.get(key)
+            if shared is None:
+                shared = self._parameters[key] = _SharedParameters(copy.deepcopy(parameters))
+            return shared
+
+    def clear(self) -> None:
+        """
+        Remove all parameter sets from the pool (inputs keep their references)
+        """
+        with self._lock:
+            self._parameters.clear()
+
+    def __len__(self) -> int:
+        return len(self._parameters)
+
+
+_PARAMETER_POOL = ParameterPool()
+
+
+def get_parameter_pool() -> ParameterPool:
+    """
+    Return the default parameter pool of the process
+    """
+    return _PARAMETER_POOL
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    """
+    Mark the array as read-only, so that it can be shared safely
+    """
+    array.setflags(write=False)
+    return array
+
+
+class CompactFleurInput:
+    """
+    Array-backed representation of a :py:class:`~pymatgen.io.fleur.FleurInput`
+    with structures of elements without site properties
+
+    .. attribute:: lattice
+
+        3x3 float64 array of the lattice matrix.
+
+    .. attribute:: pbc
+
+        Array of the three periodic boundary conditions.
+
+    .. attribute:: numbers
+
+        uint8 array of the atomic numbers of the sites.
+
+    .. attribute:: frac_coords
+
+        Nx3 float64 array of the fractional coordinates.
+
+    .. attribute:: title
+
+        Title of the input.
+
+    .. attribute:: lapw_parameters
+
+        Dict with additional LAPW calculation parameters. The dict is shared with other inputs
+        and every access returns a copy of it.
+
+    """
+
+    __slots__ = ("lattice", "pbc", "numbers", "frac_coords", "title", "_lapw_parameters")
+
+    def __init__(
+        self,
+        lattice: Any,
+        numbers: Any,
+        frac_coords: Any,
+        pbc: Any = (True, True, True),
+        title: Optional[str] = None,
+        lapw_parameters: Optional[dict] = None,
+        pool: Optional[ParameterPool] = None,
+    ):
+        """
+        Args:
+            lattice: 3x3 lattice matrix
+            numbers: atomic numbers of the sites
+            frac_coords: Nx3 fractional coordinates of the sites
+            pbc: periodic boundary conditions
+            title (str): Optional title. Defaults to the formula of the structure
+            lapw_parameters (dict): additional LAPW calculation parameters
+            pool (ParameterPool): pool the parameters are interned in.
+                                  Defaults to the pool of the process (see :py:func:`get_parameter_pool`)
+        """
+        self.lattice = _readonly(np.array(lattice, dtype=float).reshape(3, 3))
+        self.pbc = _readonly(np.array(pbc, dtype=bool).reshape(3))
+        self.numbers = _readonly(np.array(numbers, dtype=np.uint8).reshape(-1))
+        self.frac_coords = _readonly(np.array(frac_coords, dtype=float).reshape(-1, 3))
+        if len(self.numbers) != len(self.frac_coords):
+            raise ValueError(
+                f"Got {len(self.numbers)} atomic numbers for {len(self.frac_coords)} sites. The numbers have to match"
+            )
+        if title is None:
+            title = self.formula
+        self.title = sys.intern(title)
+        if pool is None:
+            pool = _PARAMETER_POOL
+        self._lapw_parameters = pool.intern(lapw_parameters if lapw_parameters is not None else {})
+
+    @classmethod
+    def from_fleur_input(cls, fleur_input: Any, pool: Optional[ParameterPool] = None) -> "CompactFleurInput":
+        """
+        Create the compact representation of a :py:class:`~pymatgen.io.fleur.FleurInput`
+
+        Args:
+            fleur_input (FleurInput): input to convert. Only structures of elements
+                                      without site properties can be represented
+            pool (ParameterPool): pool the parameters are interned in
+
+        returns: :py:class:`CompactFleurInput`
+        """
+        from pymatgen.io.fleur.binary import _atomic_numbers
+
+        structure = fleur_input.structure
+        return cls(
+            structure.lattice.matrix,
+            _atomic_numbers(structure),
+            structure.frac_coords,
+            pbc=structure.lattice.pbc,
+            title=fleur_input.title,
+            lapw_parameters=fleur_input.lapw_parameters,
+            pool=pool,
+        )
+
+    @classmethod
+    def from_file(cls, filename: PathLike, pool: Optional[ParameterPool] = None, **kwargs: Any) -> "CompactFleurInput":
+        """
+        Read a inpgen or inp.xml file into the compact representation
+
+        Args:
+            filename (PathLike): file to read in
+            pool (ParameterPool): pool the parameters are interned in
+
+        Kwargs are passed on to :py:meth:`~pymatgen.io.fleur.FleurInput.from_file()`
+
+        returns: :py:class:`CompactFleurInput`
+        """
+        from pymatgen.io.fleur.fleurinput import FleurInput
+
+        return cls.from_fleur_input(FleurInput.from_file(filename, **kwargs), pool=pool)
+
+    @classmethod
+    def from_bytes(
+        cls, data: Union[bytes, bytearray, memoryview], pool: Optional[ParameterPool] = None
+    ) -> "CompactFleurInput":
+        """
+        Read a record of the binary format (see :py:mod:`pymatgen.io.fleur.binary`)
+        without constructing the structure
+
+        Args:
+            data: binary record produced by :py:meth:`~pymatgen.io.fleur.FleurInput.to_bytes()`
+            pool (ParameterPool): pool the parameters are interned in
+
+        returns: :py:class:`CompactFleurInput`
+        """
+        from pymatgen.io.fleur.binary import unpack_arrays
+
+        arrays = unpack_arrays(data)
+        return cls(
+            arrays.lattice,
+            arrays.numbers,
+            arrays.frac_coords,
+            pbc=arrays.pbc,
+            title=arrays.title,
+            lapw_parameters=arrays.lapw_parameters,
+            pool=pool,
+        )
+
+    @property
+    def lapw_parameters(self) -> dict:
+        """
+        Copy of the dict with additional LAPW calculation parameters
+        """
+        return copy.deepcopy(dict(self._lapw_parameters))
+
+    @property
+    def formula(self) -> str:
+        """
+        Formula of the structure (same as :py:attr:`~pymatgen.core.structure.Structure.formula`)
+        """
+        elements, counts = np.unique(self.numbers, return_counts=True)
+        return Composition({Element.from_Z(int(z)): int(n) for z, n in zip(elements, counts)}).formula
+
+    @property
+    def cart_coords(self) -> np.ndarray:
+        """
+        Nx3 array of the cartesian coordinates
+        """
+        return self.frac_coords @ self.lattice
+
+    @property
+    def structure(self) -> Structure:
+        """
+        :py:class:`~pymatgen.core.structure.Structure` constructed from the arrays.
+        A new object is created on every access
+        """
+        from pymatgen.io.fleur.fleurinput import _structure_from_arrays
+
+        lattice = Lattice(self.lattice, pbc=tuple(bool(flag) for flag in self.pbc))
+        return _structure_from_arrays(lattice, self.numbers.tolist(), self.frac_coords)
+
+    def to_fleur_input(self) -> Any:
+        """
+        Construct the full :py:class:`~pymatgen.io.fleur.FleurInput`
+
+        returns: :py:class:`~pymatgen.io.fleur.FleurInput` with a copy of the LAPW parameters
+        """
+        from pymatgen.io.fleur.fleurinput import FleurInput
+
+        fleur_input = FleurInput(self.structure, lapw_parameters=self.lapw_parameters)
+        # Set explicitly, since an empty title would be replaced by the formula
+        fleur_input.title = self.title
+        return fleur_input
+
+    def get_inpgen_file_content(
+        self, parameters: Optional[dict] = None, ignore_set_parameters: bool = False, **kwargs: Union[int, bool]
+    ) -> str:
+        """
+        Produce the inpgen input file from the arrays. The output is the same as for
+        :py:meth:`~pymatgen.io.fleur.FleurInput.get_inpgen_file_content()`
+
+        Args:
+            parameters (dict): Additional LAPW parameters to use
+            ignore_set_parameters (bool): if True only the passed parameters are used and the
+                                          ``lapw_parameters`` stored on the instance are ignored
+
+        Kwargs are passed on to :py:func:`~masci_tools.io.fleur_inpgen.write_inpgen_file()`.
+        Keyword arguments not supported by :py:func:`~pymatgen.io.fleur.inpgen.write_inpgen_file_vectorized()`
+        are handled by converting to a full :py:class:`~pymatgen.io.fleur.FleurInput`
+
+        returns: str of the inpgen input file
+        """
+        from pymatgen.io.fleur.inpgen import SUPPORTED_KWARGS, _format_atom_block, render_without_atoms
+
+        if parameters is None:
+            parameters = {}
+
+        if not ignore_set_parameters:
+            parameters = {**self._lapw_parameters, **parameters}
+
+        if not SUPPORTED_KWARGS.issuperset(kwargs):
+            return self.to_fleur_input().get_inpgen_file_content(parameters, ignore_set_parameters=True, **kwargs)
+
+        if "title" not in parameters:
+            parameters["title"] = self.title
+        if "input" in parameters:
+            # write_inpgen_file modifies this namelist in place
+            parameters["input"] = dict(parameters["input"])
+
+        pbc = tuple(bool(flag) for flag in self.pbc)
+        significant_figures_positions = kwargs.pop("significant_figures_positions", 10)
+        convert_from_angstroem = kwargs.get("convert_from_angstroem", True)
+        head, tail = render_without_atoms(self.lattice, pbc=pbc, input_params=parameters, **kwargs)
+        atom_block = _format_atom_block(
+            self.lattice,
+            self.numbers,
+            self.cart_coords,
+            pbc=pbc,
+            significant_figures_positions=int(significant_figures_positions),
+            convert_from_angstroem=bool(convert_from_angstroem),
+        )
+        return "".join((head, atom_block, tail))
+
+    def write_file(self, filename: PathLike, template: Optional[Any] = None, **kwargs: Any) -> None:
+        """
+        Writes the input to a file
+
+        Inpgen files are rendered from the arrays. inp.xml files are written by
+        converting to a full :py:class:`~pymatgen.io.fleur.FleurInput`
+
+        Args:
+            filename (PathLike): file to write the inpgen input or inp.xml to
+            template: template inp.xml (path, file handle or parsed XML tree).
+                      Required for writing inp.xml files
+
+        Kwargs are passed on to :py:meth:`get_inpgen_file_content()` or
+        :py:meth:`~pymatgen.io.fleur.FleurInput.write_file()`
+        """
+        from pymatgen.io.fleur.fleurinput import FleurInput
+
+        if not FleurInput._is_inpgen_file(filename):
+            self.to_fleur_input().write_file(filename, template=template, **kwargs)
+            return
+
+        content = self.get_inpgen_file_content(**kwargs)
+        with zopen(filename, "wt") as f:
+            f.write(content)
+
+    def as_dict(self) -> dict:
+        """
+        :return: MSONable dict.
+        """
+        return {
+            "@module": self.__class__.__module__,
+            "@class": self.__class__.__name__,
+            "lattice": self.lattice.tolist(),
+            "pbc": self.pbc.tolist(),
+            "numbers": self.numbers.tolist(),
+            "frac_coords": self.frac_coords.tolist(),
+            "title": self.title,
+            "lapw_parameters": self.lapw_parameters,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "CompactFleurInput":
+        """
+        :param d: Dict representation.
+        :return: CompactFleurInput
+        """
+        return cls(
+            d["lattice"],
+            d["numbers"],
+            d["frac_coords"],
+            pbc=d["pbc"],
+            title=d["title"],
+            lapw_parameters=d["lapw_parameters"],
+        )
+
+    def __reduce__(self) -> tuple:
+        # The parameters are interned again in the pool of the unpickling process
+        return (
+            self.__class__,
+            (self.lattice, self.numbers, self.frac_coords, self.pbc, self.title, dict(self._lapw_parameters)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def __repr__(self) -> str:
+        pbc = tuple(bool(flag) for flag in self.pbc)
+        return (
+            f"{self.__class__.__name__}(formula={self.formula!r}, nsites={len(self)}, "
+            f"pbc={pbc}, lapw_parameters={sorted(self._lapw_parameters)})"
+        )
+
+    def __str__(self) -> str:
+        return self.get_inpgen_file_content()
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+# Copyright (c)
+# Distributed under the terms of the MIT License
+"""
+This module provides canonical fingerprints of :py:class:`~pymatgen.io.fleur.FleurInput`
+objects and an index for finding duplicate inputs in large collections.
+
+The fingerprint combines a structure key (lattice, pbc, species and fractional
+coordinates rounded to a given number of decimals, independent of the order of the
+sites) with the normalized ``lapw_parameters``. The title is not part of the fingerprint.
+Unlike :py:class:`~pymatgen.analysis.structure_matcher.StructureMatcher` the fingerprint
+does not identify structures given in different cells, and coordinates close to a rounding
+boundary can end up in different keys
+
+.. code-block:: python
+
+    from pymatgen.io.fleur.fingerprint import FleurInputIndex
+
+    index = FleurInputIndex()
+    unique = [fleur_inp for fleur_inp in fleur_inputs if index.add(fleur_inp)]
+
+"""
+import hashlib
+import json
+from numbers import Real
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+__all__ = ("FleurInputIndex", "canonical_form", "fingerprint")
+
+
+def _normalize_parameters(value: Any, decimals: int) -> Any:
+    """
+    Normalize the LAPW parameters for hashing: numpy scalars are converted,
+    numbers are rounded floats (so that ``4`` and ``4.0`` agree) and sequences are lists
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, dict):
+        return {str(key): _normalize_parameters(val, decimals) for key, val in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_normalize_parameters(val, decimals) for val in value]
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, Real):
+        # Adding 0.0 turns -0.0 into 0.0
+        return round(float(value), decimals) + 0.0
+    return value
+
+
+def _structure_key(structure: Any, decimals: int, lattice_decimals: int) -> bytes:
+    """
+    Canonical bytes of the structure with the sites sorted by species and rounded coordinates
+    """
+    pbc = np.array(structure.lattice.pbc, dtype=bool)
+    lattice = np.rint(structure.lattice.matrix * 10**lattice_decimals).astype(np.int64)
+
+    coords = np.rint(structure.frac_coords * 10**decimals).astype(np.int64).reshape(-1, 3)
+    # Coordinates are wrapped into the unit cell along periodic directions (after rounding,
+    # so that positions close to 0 and 1 agree)
+    coords[:, pbc] %= 10**decimals
+
+    species, codes = np.unique([str(specie) for specie in structure.species], return_inverse=True)
+    codes = codes.astype(np.int64)
+    order = np.lexsort((coords[:, 2], coords[:, 1], coords[:, 0], codes))
+
+    header = json.dumps({"species": species.tolist(), "pbc": pbc.tolist()}).encode("utf-8")
+    return b"\0".join(
+        (
+            header,
+            lattice.tobytes(),
+            np.ascontiguousarray(codes[order]).tobytes(),
+            np.ascontiguousarray(coords[order]).tobytes(),
+        )
+    )
+
+
+def canonical_form(
+    fleur_input: Any, decimals: int = 4, lattice_decimals: int = 4, parameter_decimals: int = 8
+) -> bytes:
+    """
+    Return the canonical representation of a :py:class:`~pymatgen.io.fleur.FleurInput`,
+    which is hashed by :py:func:`fingerprint`
+
+    Args:
+        fleur_input (FleurInput): input to represent
+        decimals (int): number of decimals of the fractional coordinates to take into account
+        lattice_decimals (int): number of decimals of the lattice vectors (in Angstrom) to take into account
+        parameter_decimals (int): number of decimals of numbers in the ``lapw_parameters`` to take into account
+
+    returns: bytes identifying the input
+    """
+    parameters = _normalize_parameters(fleur_input.lapw_parameters, parameter_decimals)
+    return b"\0".join(
+        (
+            _structure_key(fleur_input.structure, decimals, lattice_decimals),
+            json.dumps(parameters, sort_keys=True, default=str).encode("utf-8"),
+        )
+    )
+
+
+def fingerprint(fleur_input: Any, digest_size: int = 32, **kwargs: Any) -> str:
+    """
+    Compute a fingerprint of a :py:class:`~pymatgen.io.fleur.FleurInput`, which agrees for inputs with
+    the same structure (within the rounding of the coordinates) and LAPW parameters
+
+    Args:
+        fleur_input (FleurInput): input to compute the fingerprint for
+        digest_size (int): size of the digest in bytes
+
+    Kwargs are passed on to :py:func:`canonical_form`
+
+    returns: str of the hex digest
+    """
+    return hashlib.blake2b(canonical_form(fleur_input, **kwargs), digest_size=digest_size).hexdigest()
+
+
+class FleurInputIndex:
+    """
+    Index of :py:class:`~pymatgen.io.fleur.FleurInput` objects for finding duplicates
+    by their fingerprint with constant time lookups
+
+    Only a short digest of the fingerprint and the key of each entry are stored, so that
+    the index stays small for millions of entries. If ``exact`` is True the canonical form
+    (see :py:func:`canonical_form`) of each entry is kept in addition and compared for inputs
+    with the same digest, which rules out false duplicates caused by hash collisions
+
+    .. code-block:: python
+
+        index = FleurInputIndex()
+        for job_id, fleur_inp in jobs:
+            duplicate = index.find(fleur_inp)
+            if duplicate is not None:
+                print(f'{job_id} is a duplicate of {duplicate}')
+            else:
+                index.add(fleur_inp, key=job_id)
+
+    """
+
+    def __init__(self, exact: bool = False, digest_size: int = 8, **kwargs: Any):
+        """
+        Args:
+            exact (bool): if True entries with the same digest are compared by their canonical form
+            digest_size (int): size of the stored digests in bytes
+
+        Kwargs are passed on to :py:func:`canonical_form`
+        """
+        self.exact = exact
+        self.digest_size = digest_size
+        self._options = kwargs
+        self._entries: Dict[bytes, Any] = {}
+        self._exact_entries: Dict[bytes, List[Tuple[bytes, Hashable]]] = {}
+        self._size = 0
+
+    def _digest(self, fleur_input: Any) -> Tuple[bytes, bytes]:
+        """
+        Return the canonical form and its digest
+        """
+        canonical = canonical_form(fleur_input, **self._options)
+        return canonical, hashlib.blake2b(canonical, digest_size=self.digest_size).digest()
+
+    def find(self, fleur_input: Any) -> Optional[Hashable]:
+        """
+        Find the key of an entry equivalent to the given input
+
+        Args:
+            fleur_input (FleurInput): input to look up
+
+        returns: key of the equivalent entry or None if there is none
+        """
+        canonical, digest = self._digest(fleur_input)
+        return self._find(canonical, digest)
+
+    def _find(self, canonical: bytes, digest: bytes) -> Optional[Hashable]:
+        if not self.exact:
+            return self._entries.get(digest)
+        for other, key in self._exact_entries.get(digest, ()):
+            if other == canonical:
+                return key
+        return None
+
+    def add(self, fleur_input: Any, key: Optional[Hashable] = None) -> bool:
+        """
+        Add an input to the index, unless an equivalent input is already contained
+
+        Args:
+            fleur_input (FleurInput): input to add
+            key: key identifying the input (e.g. a job id), which is returned by :py:meth:`find`.
+                 Defaults to the number of entries added before
+
+        returns: bool, True if the input was added and False if it is a duplicate
+        """
+        canonical, digest = self._digest(fleur_input)
+        if self._find(canonical, digest) is not None:
+            return False
+
+        if key is None:
+            key = self._size
+        if self.exact:
+            self._exact_entries.setdefault(digest, []).append((canonical, key))
+        else:
+            self._entries[digest] = key
+        self._size += 1
+        return True
+
+    def __contains__(self, fleur_input: Any) -> bool:
+        return self.find(fleur_input) is not None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def keys(self) -> Iterator[Hashable]:
+        """
+        Iterate over the keys of all entries
+        """
+        if self.exact:
+            for entries in self._exact_entries.values():
+                for _, key in entries:
+                    yield key
+        else:
+            yield from self._entries.values()
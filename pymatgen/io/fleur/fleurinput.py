@@ -7,16 +7,46 @@
 This module provides functionality and classes for creating pymatgen structures
 from fleur input files (http://flapw.de).
 """
+import io
 import warnings
-from typing import Optional, Union, Any
+from itertools import chain
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 from pathlib import Path
+import numpy as np
 from monty.io import zopen
 from monty.json import MSONable
 
+from pymatgen.core.composition import Composition
 from pymatgen.core.lattice import Lattice
+from pymatgen.core.periodic_table import get_el_sp
 from pymatgen.core.structure import Structure
 from pymatgen.util.typing import PathLike
 
+from pymatgen.io.fleur.profiling import count, get_profiler, profiled, stage
+from pymatgen.io.fleur.rendering import RenderCache, render_key, structure_signature
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from pymatgen.io.fleur.batch import ParseResult
+    from pymatgen.io.fleur.compact import CompactFleurInput, ParameterPool
+    from pymatgen.io.fleur.inpxml import KPoints, SymmetryOperations
+    from pymatgen.io.fleur.sweep import ParamGrid
+
 __all__ = ("FleurInput",)
 
 
@@ -37,6 +67,22 @@ class FleurInput(MSONable):
 
         Dict with additional LAPW calculation parameters
 
+    .. attribute:: kpoints
+
+        Dict mapping the names of the k-point lists to
+        :py:class:`~pymatgen.io.fleur.inpxml.KPoints` arrays.
+        Only set for inputs read from inp.xml files with ``read_kpoints=True``, otherwise None
+
+    .. attribute:: symops
+
+        :py:class:`~pymatgen.io.fleur.inpxml.SymmetryOperations` arrays of the rotations and translations.
+        Only set for inputs read from inp.xml files, otherwise None
+
+    The k-point and symmetry arrays are not part of :py:meth:`FleurInput.as_dict()`
+
+    Instances created with ``lazy=True`` (see :py:meth:`FleurInput.from_file()`)
+    only construct these attributes on first access
+
     """
 
     def __init__(
@@ -61,6 +107,13 @@ class FleurInput(MSONable):
                 DeprecationWarning,
             )
 
+        self._pending_structure: Optional[Callable[[], Structure]] = None
+        self._pending_parameters: Optional[Callable[[], dict]] = None
+        self._section_fingerprints: Optional[Dict[str, str]] = None
+        self._render_cache = RenderCache()
+        self.kpoints: Optional[Dict[str, "KPoints"]] = None
+        self.symops: Optional["SymmetryOperations"] = None
+
         if structure.is_ordered:
             self.structure = structure
             self.title = title or structure.formula
@@ -70,8 +123,95 @@ class FleurInput(MSONable):
         else:
             raise ValueError("Structure with partial occupancies cannot be " "converted into fleur input!")
 
+    @classmethod
+    def _lazy(cls, structure_loader: Callable[[], Structure], parameter_loader: Callable[[], dict]) -> "FleurInput":
+        """
+        Create a :py:class:`FleurInput`, which calls the given functions to
+        construct the structure and the LAPW parameters (including the title)
+        only when they are first accessed
+        """
+        fleur_inp = cls.__new__(cls)
+        fleur_inp._structure = None
+        fleur_inp._title = None
+        fleur_inp._lapw_parameters = None
+        fleur_inp._pending_structure = structure_loader
+        fleur_inp._pending_parameters = parameter_loader
+        fleur_inp._section_fingerprints = None
+        fleur_inp._render_cache = RenderCache()
+        fleur_inp.kpoints = None
+        fleur_inp.symops = None
+        return fleur_inp
+
+    @property
+    def structure(self) -> Structure:
+        """
+        Associated Structure
+        """
+        if self._pending_structure is not None:
+            self._structure = self._pending_structure()
+            self._pending_structure = None
+        return self._structure
+
+    @structure.setter
+    def structure(self, structure: Structure) -> None:
+        self._pending_structure = None
+        self._structure = structure
+        self._render_cache.invalidate()
+
+    @property
+    def lapw_parameters(self) -> dict:
+        """
+        Dict with additional LAPW calculation parameters
+        """
+        if self._pending_parameters is not None:
+            parameters = self._pending_parameters()
+            self._pending_parameters = None
+            title = parameters.pop("title", "")
+            if self._title is None:
+                self._title = title or None
+            self._lapw_parameters = parameters
+        return self._lapw_parameters
+
+    @lapw_parameters.setter
+    def lapw_parameters(self, lapw_parameters: dict) -> None:
+        self._pending_parameters = None
+        self._lapw_parameters = lapw_parameters
+        self._render_cache.invalidate()
+
+    @property
+    def title(self) -> str:
+        """
+        Title of the input. Defaults to the formula of the structure
+        """
+        if self._title is None and self._pending_parameters is not None:
+            getattr(self, "lapw_parameters")
+        if self._title is None:
+            self._title = self.structure.formula
+        return self._title
+
+    @title.setter
+    def title(self, title: str) -> None:
+        self._title = title
+        self._render_cache.invalidate()
+
+    def __getstate__(self) -> dict:
+        # The loaders of lazy instances can reference unpicklable objects (e.g. XML trees)
+        for name in ("structure", "lapw_parameters", "title"):
+            getattr(self, name)
+        # Rendered files are not stored with the object
+        return {**self.__dict__, "_render_cache": RenderCache()}
+
     @staticmethod
-    def from_string(data: Union[str, bytes], inpgen_input: bool = True, **kwargs) -> "FleurInput":
+    @profiled("from_string")
+    def from_string(
+        data: Union[str, bytes],
+        inpgen_input: bool = True,
+        streaming: bool = False,
+        lazy: bool = False,
+        validate: str = "off",
+        read_kpoints: bool = False,
+        **kwargs,
+    ) -> "FleurInput":
         """
         Reads the fleur input from a string
 
@@ -79,56 +219,444 @@ class FleurInput(MSONable):
             data (str or bytes): data to read in
             inpgen_input (bool): if True the input will be presumed to be a inpgen file
                                  otherwise it is parsed into an xml tree and interpreted as a inp.xml file
+            streaming (bool): if True and the input is a inp.xml file only the sections
+                              needed for the structure and LAPW parameters are read
+                              (see :py:func:`~pymatgen.io.fleur.inpxml.load_inpxml_sections()`)
+            lazy (bool): if True the structure and LAPW parameters are only extracted from the
+                         parsed data, when they are first accessed
+            validate (str): validation of inp.xml files against their schema. Either ``'full'``
+                            (every input), ``'sample'`` (new inputs and a fraction of all others)
+                            or ``'off'`` (see :py:meth:`~pymatgen.io.fleur.schema.SchemaRegistry.validate()`).
+                            Not possible for ``streaming=True``, since only parts of the file are kept
+            read_kpoints (bool): if True the k-point lists of inp.xml files are read into
+                                 :py:attr:`kpoints`. Otherwise they are skipped during the parse
 
-        Kwargs are passed on to :py:func:`~masci_tools.io.fleur_xml.load_inpxml()` if the input
-        is interpreted as a XML file
+        Kwargs are passed on to :py:func:`~pymatgen.io.fleur.inpxml.load_inpxml()` if the input
+        is interpreted as a XML file. The schema dictionaries are taken from the
+        :py:class:`~pymatgen.io.fleur.schema.SchemaRegistry` of the process
+
+        If a parse cache is set with :py:func:`~pymatgen.io.fleur.cache.set_parse_cache()`
+        the result is looked up in and stored to the cache. In this case ``lazy`` has no effect
 
         returns: :py:class:`FleurInput` generated from the information read in from the data
         """
-        from masci_tools.io.fleur_inpgen import read_inpgen_file
-        from masci_tools.io.fleur_xml import load_inpxml
-        from masci_tools.util.xml.xml_getters import get_structuredata, get_parameterdata
+        from pymatgen.io.fleur.cache import get_parse_cache
+
+        if get_profiler() is not None:
+            count(bytes_read=len(data.encode("utf-8")) if isinstance(data, str) else len(data))
+        cache = get_parse_cache()
+        if cache is None:
+            return FleurInput._parse_string(
+                data,
+                inpgen_input=inpgen_input,
+                streaming=streaming,
+                lazy=lazy,
+                validate=validate,
+                read_kpoints=read_kpoints,
+                **kwargs,
+            )
+
+        # The base_url and logger do not change the result (xinclude tags are not resolved)
+        # and are excluded so that identical files in different directories share an entry
+        options = {key: val for key, val in kwargs.items() if key not in ("base_url", "logger")}
+        if validate != "off" and not inpgen_input:
+            # Entries stored without validation must not be returned for validated parsing
+            options["validate"] = validate
+        if read_kpoints and not inpgen_input:
+            # Entries stored without k-points must not be returned if they are requested
+            options["read_kpoints"] = read_kpoints
+        with stage("cache"):
+            cache_key = cache.key(data, inpgen_input=inpgen_input, **options)
+            # The stored dict is decoded into a FleurInput
+            cached = cache.get(cache_key)
+        if cached is not None:
+            count(atoms=len(cached.structure))
+            return cached
+
+        fleur_inp = FleurInput._parse_string(
+            data, inpgen_input=inpgen_input, streaming=streaming, validate=validate, read_kpoints=read_kpoints, **kwargs
+        )
+        with stage("cache"):
+            cache.put(cache_key, {**fleur_inp.as_dict(), **fleur_inp._arrays_as_dict()})
+        return fleur_inp
 
+    @staticmethod
+    def _parse_string(
+        data: Union[str, bytes],
+        inpgen_input: bool,
+        streaming: bool,
+        lazy: bool = False,
+        validate: str = "off",
+        read_kpoints: bool = False,
+        **kwargs: Any,
+    ) -> "FleurInput":
+        """
+        Parse the fleur input from a string without going through the parse cache
+        """
         if inpgen_input:
-            cell, atoms, pbc, parameters = read_inpgen_file(data)
-            title_in = parameters.pop("title", "")
+            from masci_tools.io.fleur_inpgen import read_inpgen_file
+
+            with stage("parse"):
+                cell, atoms, pbc, parameters = read_inpgen_file(data)
+            return FleurInput._from_parsed_data(atoms, cell, pbc, parameters, lazy=lazy)
+
+        from pymatgen.io.fleur.inpxml import load_inpxml, load_inpxml_sections
+        from pymatgen.io.fleur.schema import get_schema_registry
+
+        FleurInput._check_validate(validate, streaming)
+        kpoints = None
+        if streaming:
+            kpoints = {} if read_kpoints else None
+            with stage("parse"):
+                xmltree, schema_dict = load_inpxml_sections(data, kpoints=kpoints, **kwargs)
         else:
-            xmltree, schema_dict = load_inpxml(data, **kwargs)
-            atoms, cell, pbc = get_structuredata(xmltree, schema_dict)
-            parameters = get_parameterdata(xmltree, schema_dict)
-            title_in = parameters.pop("title", "")
+            with stage("parse"):
+                xmltree, schema_dict = load_inpxml(data, **kwargs)
+            with stage("validate"):
+                get_schema_registry().validate(xmltree, schema_dict, mode=validate, data=data)
+        return FleurInput._from_xmltree(xmltree, schema_dict, lazy=lazy, read_kpoints=read_kpoints, kpoints=kpoints)
 
-        positions, elements = zip(*[(site.position, site.symbol) for site in atoms])
-        # create lattice and structure object
-        lattice_in = Lattice(cell, pbc=pbc)
-        structure_in = Structure(lattice_in, elements, positions, coords_are_cartesian=True)
+    @staticmethod
+    def _check_validate(validate: str, streaming: bool) -> None:
+        """
+        Check the validation mode given for parsing a inp.xml file
+        """
+        from pymatgen.io.fleur.schema import VALIDATION_MODES
 
-        return FleurInput(structure_in, title_in, lapw_parameters=parameters)
+        if validate not in VALIDATION_MODES:
+            raise ValueError(f"Unknown validation mode {validate!r}. Expected one of {VALIDATION_MODES}")
+        if streaming and validate != "off":
+            raise ValueError("Validation of inp.xml files is not possible with streaming=True")
 
     @staticmethod
-    def from_file(filename: PathLike) -> "FleurInput":
+    @profiled("from_file")
+    def from_file(
+        filename: PathLike,
+        streaming: bool = False,
+        lazy: bool = False,
+        validate: str = "off",
+        read_kpoints: bool = False,
+    ) -> "FleurInput":
         """
         Reads the fleur input from a file
 
         Args:
-            filename (PathLike): file to read in. If the extension is .xml the the file
-                                 will be interpreted as the inp.xml file otherwise it is
-                                 assumed to be inpgen input
+            filename (PathLike): file to read in. Whether it is a inp.xml file or inpgen input
+                                 and whether it is compressed is detected from the content
+                                 (see :py:func:`~pymatgen.io.fleur.sniff.open_input()`)
+            streaming (bool): if True inp.xml files are read incrementally from the file and only
+                              the sections needed for the structure and LAPW parameters are kept
+            lazy (bool): if True the structure and LAPW parameters are only extracted from the
+                         parsed file, when they are first accessed
+            validate (str): validation of inp.xml files against their schema. Either ``'full'``,
+                            ``'sample'`` or ``'off'`` (see :py:meth:`FleurInput.from_string()`)
+            read_kpoints (bool): if True the k-point lists of inp.xml files are read into :py:attr:`kpoints`
 
         returns: :py:class:`FleurInput` generated from the information read in from the file
         """
 
-        inpgen_input = ".xml" not in Path(filename).suffixes
+        from pymatgen.io.fleur.cache import get_parse_cache
+        from pymatgen.io.fleur.sniff import open_input
+
+        with stage("read"):
+            f, file_format = open_input(filename)
+        with f:
+            inpgen_input = file_format == "inpgen"
+
+            # With a parse cache the raw content is needed for computing the key
+            if streaming and not inpgen_input and get_parse_cache() is None:
+                from pymatgen.io.fleur.inpxml import load_inpxml_sections
+
+                FleurInput._check_validate(validate, streaming)
+                kpoints: Optional[Dict[str, "KPoints"]] = {} if read_kpoints else None
+                # Reading and parsing are interleaved
+                with stage("parse"):
+                    xmltree, schema_dict = load_inpxml_sections(f, base_url=filename, kpoints=kpoints)
+                count(bytes_read=f.tell())
+                return FleurInput._from_xmltree(
+                    xmltree, schema_dict, lazy=lazy, read_kpoints=read_kpoints, kpoints=kpoints
+                )
+
+            with stage("read"):
+                data = io.TextIOWrapper(f).read() if inpgen_input else f.read()
+
+        return FleurInput.from_string(
+            data,
+            inpgen_input=inpgen_input,
+            streaming=streaming,
+            lazy=lazy,
+            validate=validate,
+            read_kpoints=read_kpoints,
+            base_url=filename,
+        )
+
+    def refresh(self, filename: PathLike, read_kpoints: bool = False) -> List[str]:
+        """
+        Update the structure and LAPW parameters from a modified version of the inp.xml
+        file, e.g. after the atom positions or ``kmax`` were changed in a workflow
+
+        The file is read like in ``from_file(filename, streaming=True)`` and the fingerprints of
+        its sections (see :py:func:`~pymatgen.io.fleur.inpxml.section_fingerprints()`) are compared
+        with the ones of the previous call. Only the parts depending on changed sections are
+        constructed again, the others (including the :py:class:`Structure` object) are kept.
+        The first call on an instance, which was not updated with this method before,
+        constructs everything from the file
+
+        Args:
+            filename (PathLike): inp.xml file to read in
+            read_kpoints (bool): if True the k-point lists are read into :py:attr:`kpoints`
+
+        returns: sorted list of the sections that changed since the previous call
+        """
+        from masci_tools.util.xml.xml_getters import get_parameterdata, get_structuredata
+        from pymatgen.io.fleur.inpxml import (
+            RETAINED_SECTIONS,
+            STRUCTURE_SECTIONS,
+            load_inpxml_sections,
+            read_symmetry_operations,
+            section_fingerprints,
+        )
+        from pymatgen.io.fleur.sniff import open_input
 
-        mode = "rt" if inpgen_input else "rb"
+        f, file_format = open_input(filename)
+        kpoints: Optional[Dict[str, "KPoints"]] = {} if read_kpoints else None
+        with f:
+            if file_format != "xml":
+                raise ValueError(f"Only inp.xml files can be refreshed: Got {filename}")
+            xmltree, schema_dict = load_inpxml_sections(f, base_url=filename, kpoints=kpoints)
+        fingerprints = section_fingerprints(xmltree)
 
-        with zopen(filename, mode) as f:
-            data = f.read()
+        previous = getattr(self, "_section_fingerprints", None)
+        rebuild = previous is None
+        previous = previous or {}
+        changed = {tag for tag in RETAINED_SECTIONS if previous.get(tag) != fingerprints.get(tag)}
+
+        if rebuild or changed & STRUCTURE_SECTIONS:
+            # The lattice is immutable and can be shared with the previous structure
+            lattice = None if rebuild or "cell" in changed else self.structure.lattice
+            self.structure = _structure_from_parsed_data(*get_structuredata(xmltree, schema_dict), lattice=lattice)
+        if rebuild or changed:
+            parameters = get_parameterdata(xmltree, schema_dict)
+            self.title = parameters.pop("title", "") or self.structure.formula
+            self.lapw_parameters = parameters
+        self.kpoints = kpoints or None
+        self.symops = read_symmetry_operations(xmltree)
+
+        self._section_fingerprints = fingerprints
+        return sorted(changed)
+
+    @staticmethod
+    def _is_inpgen_file(filename: PathLike) -> bool:
+        """
+        Return whether the file is presumed to be a inpgen input (no .xml in the extensions)
+        """
+        return ".xml" not in Path(filename).suffixes
+
+    @staticmethod
+    async def afrom_file(filename: PathLike, executor: Optional["Executor"] = None, **kwargs: Any) -> "FleurInput":
+        """
+        Reads the fleur input from a file without blocking the event loop
+
+        Args:
+            filename (PathLike): file to read in (see :py:meth:`FleurInput.from_file()`)
+            executor (Executor): executor to run the parsing in. Defaults to the
+                                 default executor of the event loop
+
+        Kwargs are passed on to :py:meth:`FleurInput.from_string()`
+
+        returns: :py:class:`FleurInput` generated from the information read in from the file
+        """
+        from pymatgen.io.fleur.aio import afrom_file
+
+        return await afrom_file(filename, executor=executor, **kwargs)
+
+    @staticmethod
+    def afrom_files(
+        paths: Iterable[PathLike],
+        max_concurrency: int = 8,
+        executor: Optional["Executor"] = None,
+        ordered: bool = True,
+        **kwargs: Any,
+    ) -> AsyncIterator["ParseResult"]:
+        """
+        Reads many fleur input files concurrently without blocking the event loop
+
+        Args:
+            paths: iterable of files to read in (see :py:meth:`FleurInput.from_file()`)
+            max_concurrency (int): maximum number of files read at the same time
+            executor (Executor): executor to run the parsing in. Defaults to the
+                                 default executor of the event loop
+            ordered (bool): if True the results are returned in the order of ``paths``,
+                            otherwise in the order in which they are completed
+
+        Kwargs are passed on to :py:meth:`FleurInput.from_string()`
+
+        returns: asynchronous generator of :py:class:`~pymatgen.io.fleur.batch.ParseResult` containing
+                 either the :py:class:`FleurInput` or the error raised for each file
+        """
+        from pymatgen.io.fleur.aio import afrom_files
+
+        return afrom_files(paths, max_concurrency=max_concurrency, executor=executor, ordered=ordered, **kwargs)
+
+    @staticmethod
+    def from_files(
+        paths: Iterable[PathLike], workers: Optional[int] = None, ordered: bool = True, **kwargs: Any
+    ) -> Iterator["ParseResult"]:
+        """
+        Reads many fleur input files in parallel using a process pool
+
+        Args:
+            paths: iterable of files to read in (see :py:meth:`FleurInput.from_file()`)
+            workers (int): number of worker processes. Defaults to the number of CPUs
+            ordered (bool): if True the results are returned in the order of ``paths``,
+                            otherwise in the order in which they are completed
+
+        Kwargs are passed on to :py:meth:`FleurInput.from_file()`
+
+        returns: generator of :py:class:`~pymatgen.io.fleur.batch.ParseResult` containing
+                 either the :py:class:`FleurInput` or the error raised for each file
+        """
+        from pymatgen.io.fleur.batch import iter_from_files
+
+        return iter_from_files(paths, workers=workers, ordered=ordered, **kwargs)
+
+    @staticmethod
+    def iter_from_directory(
+        root: PathLike, pattern: str = "inp.xml", workers: Optional[int] = None, **kwargs: Any
+    ) -> Iterator["ParseResult"]:
+        """
+        Reads all fleur input files matching a pattern in a directory tree in parallel
+
+        Args:
+            root (PathLike): directory to search for files
+            pattern (str): glob pattern the file names have to match, e.g. ``inp.xml`` or ``inp_*``
+            workers (int): number of worker processes. Defaults to the number of CPUs
+
+        Kwargs are passed on to :py:func:`~pymatgen.io.fleur.batch.iter_from_directory()`
+
+        returns: generator of :py:class:`~pymatgen.io.fleur.batch.ParseResult` containing
+                 either the :py:class:`FleurInput` or the error raised for each file
+        """
+        from pymatgen.io.fleur.batch import iter_from_directory
+
+        return iter_from_directory(root, pattern=pattern, workers=workers, **kwargs)
+
+    @staticmethod
+    def iter_from_stream(
+        source: Union[PathLike, IO[bytes]],
+        pattern: Optional[str] = None,
+        workers: Optional[int] = None,
+        **kwargs: Any,
+    ) -> Iterator["ParseResult"]:
+        """
+        Reads fleur inputs directly from a (compressed) tar or zip archive or from a stream
+        of concatenated inputs without unpacking them to disk
+
+        Args:
+            source: path or binary file handle of the archive or stream
+            pattern (str): glob pattern the file names of archive members have to match, e.g. ``inp_*``
+            workers (int): number of worker processes. Defaults to the number of CPUs
+
+        Kwargs are passed on to :py:func:`~pymatgen.io.fleur.batch.iter_from_stream()`
+
+        returns: generator of :py:class:`~pymatgen.io.fleur.batch.ParseResult` containing
+                 either the :py:class:`FleurInput` or the error raised for each member
+        """
+        from pymatgen.io.fleur.batch import iter_from_stream
+
+        return iter_from_stream(source, pattern=pattern, workers=workers, **kwargs)
+
+    @staticmethod
+    def write_files(
+        fleur_inputs: Iterable["FleurInput"],
+        root: PathLike,
+        layout: Union[str, Callable[[int, "FleurInput"], str]] = "sharded",
+        workers: Optional[int] = None,
+        compress: Optional[str] = None,
+        **kwargs: Any,
+    ) -> List[Path]:
+        """
+        Writes many fleur inputs in parallel into a sharded directory tree or an archive
+
+        Args:
+            fleur_inputs: iterable of the inputs to write
+            root (PathLike): root directory of the written files
+            layout: ``'sharded'`` (``<i // shard_size>/<i>/inp``), ``'flat'`` (``<i>/inp``) or a
+                    callable returning the relative path for the index and the input
+            workers (int): number of workers. Defaults to the number of CPUs
+            compress (str): compress the written files (``'gz'``, ``'bz2'`` or ``'xz'``)
 
-        return FleurInput.from_string(data, inpgen_input=inpgen_input, base_url=filename)
+        Kwargs are passed on to :py:func:`~pymatgen.io.fleur.batch.write_files()`,
+        e.g. ``archive='inputs.tar.gz'`` to pack the files into a single archive
 
+        returns: list of the paths of the written files
+        """
+        from pymatgen.io.fleur.batch import write_files
+
+        return write_files(fleur_inputs, root, layout=layout, workers=workers, compress=compress, **kwargs)
+
+    @staticmethod
+    def _from_xmltree(
+        xmltree: Any,
+        schema_dict: Any,
+        lazy: bool = False,
+        read_kpoints: bool = False,
+        kpoints: Optional[Dict[str, "KPoints"]] = None,
+    ) -> "FleurInput":
+        """
+        Construct the :py:class:`FleurInput` from a parsed inp.xml tree
+
+        ``kpoints`` are the k-point lists collected while reading the file. If not given
+        and ``read_kpoints`` is True they are read from the tree
+        """
+        from masci_tools.util.xml.xml_getters import get_structuredata, get_parameterdata
+        from pymatgen.io.fleur.inpxml import read_kpoints as read_kpoint_lists, read_symmetry_operations
+
+        if lazy:
+
+            def load_structure() -> Structure:
+                with stage("extract"):
+                    atoms, cell, pbc = get_structuredata(xmltree, schema_dict)
+                return _structure_from_parsed_data(atoms, cell, pbc)
+
+            def load_parameters() -> dict:
+                with stage("extract"):
+                    return get_parameterdata(xmltree, schema_dict)
+
+            fleur_inp = FleurInput._lazy(load_structure, load_parameters)
+        else:
+            with stage("extract"):
+                atoms, cell, pbc = get_structuredata(xmltree, schema_dict)
+                parameters = get_parameterdata(xmltree, schema_dict)
+            fleur_inp = FleurInput._from_parsed_data(atoms, cell, pbc, parameters)
+
+        with stage("extract"):
+            if read_kpoints:
+                fleur_inp.kpoints = (kpoints if kpoints is not None else read_kpoint_lists(xmltree)) or None
+            fleur_inp.symops = read_symmetry_operations(xmltree)
+        return fleur_inp
+
+    @staticmethod
+    def _from_parsed_data(atoms: list, cell: Any, pbc: Any, parameters: dict, lazy: bool = False) -> "FleurInput":
+        """
+        Construct the :py:class:`FleurInput` from the atoms, cell and parameters
+        returned by the masci_tools parsing functions
+        """
+        if lazy:
+            return FleurInput._lazy(lambda: _structure_from_parsed_data(atoms, cell, pbc), lambda: parameters)
+
+        title_in = parameters.pop("title", "")
+        structure_in = _structure_from_parsed_data(atoms, cell, pbc)
+
+        return FleurInput(structure_in, title_in, lapw_parameters=parameters)
+
+    @profiled("get_inpgen_file_content")
     def get_inpgen_file_content(
-        self, parameters: Optional[dict] = None, ignore_set_parameters: bool = False, **kwargs: Union[int, bool]
+        self,
+        parameters: Optional[dict] = None,
+        ignore_set_parameters: bool = False,
+        vectorized: bool = False,
+        **kwargs: Union[int, bool],
     ):
         """
         Produce the inpgen input file corresponding to the given information
@@ -137,14 +665,18 @@ class FleurInput(MSONable):
             parameters (dict): Additional LAPW parameters to use
             ignore_set_parameters (bool): if True only the passed parameters are used and the
                                           ``lapw_parameters`` stored on the instance are ignored
+            vectorized (bool): if True the atom positions are formatted from the coordinate arrays
+                               of the structure in one pass, which is much faster for large structures
+                               (see :py:func:`~pymatgen.io.fleur.inpgen.write_inpgen_file_vectorized()`).
+                               The output is the same
 
         Kwargs are passed on to :py:func:`~masci_tools.io.fleur_inpgen.write_inpgen_file()`
 
+        The rendered files are cached for the effective parameters and keyword arguments until
+        the structure, title or LAPW parameters change (see :py:mod:`pymatgen.io.fleur.rendering`)
+
         returns: str of the inpgen input file
         """
-        from masci_tools.io.fleur_inpgen import write_inpgen_file
-        from masci_tools.io.common_functions import AtomSiteProperties
-
         if parameters is None:
             parameters = {}
 
@@ -153,6 +685,39 @@ class FleurInput(MSONable):
 
         if "title" not in parameters:
             parameters["title"] = self.title
+        if "input" in parameters:
+            # write_inpgen_file modifies this namelist in place
+            parameters["input"] = dict(parameters["input"])
+
+        # The vectorized writer produces the same output, so it does not enter the key
+        key = render_key(parameters, **kwargs)
+        content = self._render_cache.get(structure_signature(self.structure), key)
+        if content is None:
+            with stage("render"):
+                content = self._render_inpgen_file_content(parameters, vectorized=vectorized, **kwargs)
+            self._render_cache.put(key, content)
+        count(atoms=len(self.structure))
+        return content
+
+    def _render_inpgen_file_content(
+        self, parameters: dict, vectorized: bool = False, **kwargs: Union[int, bool]
+    ) -> str:
+        """
+        Produce the inpgen input file for the effective parameters without going through the cache
+        """
+        from masci_tools.io.fleur_inpgen import write_inpgen_file
+        from masci_tools.io.common_functions import AtomSiteProperties
+        from pymatgen.io.fleur.inpgen import SUPPORTED_KWARGS, write_inpgen_file_vectorized
+
+        if vectorized and SUPPORTED_KWARGS.issuperset(kwargs):
+            return write_inpgen_file_vectorized(
+                self.structure.lattice.matrix,
+                [specie.symbol for specie in self.structure.species],
+                self.structure.cart_coords,
+                pbc=self.structure.lattice.pbc,
+                input_params=parameters,
+                **kwargs,
+            )
 
         atom_sites = [
             AtomSiteProperties(position=site.coords, symbol=site.specie.symbol, kind=site.specie.symbol)
@@ -168,6 +733,92 @@ class FleurInput(MSONable):
             **kwargs,
         )
 
+    def generate_inpgen_variants(
+        self, param_grid: "ParamGrid", ignore_set_parameters: bool = False, **kwargs: Any
+    ) -> Iterator[Tuple[Dict[str, Any], str]]:
+        """
+        Generate the inpgen input files for all points of a grid of LAPW parameters
+
+        The atom block is only formatted once for all files. See
+        :py:func:`~pymatgen.io.fleur.sweep.generate_inpgen_variants()`
+
+        Args:
+            param_grid: dict mapping parameter names (e.g. ``'kpt.div1'`` or ``'comp.kmax'``)
+                        to the sequence of values to use (see :py:func:`~pymatgen.io.fleur.sweep.expand_param_grid()`)
+            ignore_set_parameters (bool): if True only the values of the grid points are used and the
+                                          ``lapw_parameters`` stored on the instance are ignored
+
+        Kwargs are passed on to :py:func:`~pymatgen.io.fleur.inpgen.write_inpgen_file_vectorized()`
+
+        returns: generator of tuples of the values of the grid point and the content of the inpgen file
+        """
+        from pymatgen.io.fleur.sweep import generate_inpgen_variants
+
+        return generate_inpgen_variants(self, param_grid, ignore_set_parameters=ignore_set_parameters, **kwargs)
+
+    def write_inpgen_variants(
+        self,
+        param_grid: "ParamGrid",
+        directory: PathLike,
+        filename: str = "inp",
+        workers: Optional[int] = None,
+        **kwargs: Any,
+    ) -> List[Path]:
+        """
+        Write the inpgen input files for all points of a grid of LAPW parameters into a directory tree
+
+        See :py:func:`~pymatgen.io.fleur.sweep.write_inpgen_variants()`
+
+        Args:
+            param_grid: parameter grid to generate the files for
+            directory (PathLike): root directory of the written files
+            filename (str): name of the written inpgen files
+            workers (int): number of threads writing the files. By default the files are written sequentially
+
+        Kwargs are passed on to :py:meth:`FleurInput.generate_inpgen_variants()`
+
+        returns: list of the paths of the written files
+        """
+        from pymatgen.io.fleur.sweep import write_inpgen_variants
+
+        return write_inpgen_variants(self, param_grid, directory, filename=filename, workers=workers, **kwargs)
+
+    def patch_inpxml(self, filename: PathLike, output: Optional[PathLike] = None, **kwargs: Any) -> List[str]:
+        """
+        Update an existing inp.xml with the structure, title and LAPW parameters by minimal
+        edits of its text, keeping all other content of the file unchanged
+
+        The sites of the structure have to correspond to the atom positions in the file.
+        See :py:func:`~pymatgen.io.fleur.xmlpatch.patch_inpxml()`
+
+        Args:
+            filename (PathLike): inp.xml file to update (can be compressed)
+            output (PathLike): file to write the result to. Defaults to ``filename``
+
+        Kwargs are passed on to :py:func:`~pymatgen.io.fleur.xmlpatch.patch_inpxml()`
+
+        returns: list of the descriptions of the changed values
+        """
+        from pymatgen.io.fleur.xmlpatch import patch_inpxml
+
+        return patch_inpxml(self, filename, output=output, **kwargs)
+
+    def fingerprint(self, **kwargs: Any) -> str:
+        """
+        Compute a fingerprint identifying inputs with the same structure (within the rounding
+        of the coordinates) and LAPW parameters, e.g. for removing duplicates
+
+        See :py:func:`~pymatgen.io.fleur.fingerprint.fingerprint()` and
+        :py:class:`~pymatgen.io.fleur.fingerprint.FleurInputIndex`
+
+        Kwargs are passed on to :py:func:`~pymatgen.io.fleur.fingerprint.fingerprint()`
+
+        returns: str of the hex digest
+        """
+        from pymatgen.io.fleur.fingerprint import fingerprint
+
+        return fingerprint(self, **kwargs)
+
     def as_dict(self) -> dict:
         """
         :return: MSONable dict.
@@ -180,20 +831,109 @@ class FleurInput(MSONable):
             "lapw_parameters": self.lapw_parameters,
         }
 
+    def _arrays_as_dict(self) -> dict:
+        """
+        Dict representation of the k-point and symmetry arrays (empty if not set).
+        These are not part of :py:meth:`as_dict()` and only stored in the parse cache
+        """
+        d = {}
+        if self.kpoints is not None:
+            d["kpoints"] = {
+                name: {"coords": kpts.coords.tolist(), "weights": kpts.weights.tolist()}
+                for name, kpts in self.kpoints.items()
+            }
+        if self.symops is not None:
+            d["symops"] = {
+                "rotations": self.symops.rotations.tolist(),
+                "translations": self.symops.translations.tolist(),
+            }
+        return d
+
     @classmethod
     def from_dict(cls, d: dict) -> "FleurInput":
         """
         :param d: Dict representation.
         :return: FleurInput
         """
-        return FleurInput(
+        from monty.json import MontyDecoder
+
+        fleur_inp = FleurInput(
             Structure.from_dict(d["structure"]),
             title=d["title"],
-            lapw_parameters=d["lapw_parameters"],
+            lapw_parameters=MontyDecoder().process_decoded(d["lapw_parameters"]),
         )
+        if "kpoints" in d or "symops" in d:
+            from pymatgen.io.fleur.inpxml import KPoints, SymmetryOperations
+
+            if "kpoints" in d:
+                fleur_inp.kpoints = {
+                    name: KPoints(
+                        np.array(kpts["coords"], dtype=float).reshape(-1, 3), np.array(kpts["weights"], dtype=float)
+                    )
+                    for name, kpts in d["kpoints"].items()
+                }
+            if "symops" in d:
+                fleur_inp.symops = SymmetryOperations(
+                    np.array(d["symops"]["rotations"], dtype=np.int8).reshape(-1, 3, 3),
+                    np.array(d["symops"]["translations"], dtype=float).reshape(-1, 3),
+                )
+        return fleur_inp
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize into a compact binary representation storing the lattice,
+        atomic numbers and coordinates as arrays
+
+        See :py:mod:`pymatgen.io.fleur.binary` for the format
+
+        returns: bytes of the binary representation
+        """
+        from pymatgen.io.fleur.binary import to_bytes
+
+        return to_bytes(self)
+
+    @staticmethod
+    def from_bytes(data: Union[bytes, bytearray, memoryview]) -> "FleurInput":
+        """
+        Deserialize from the binary representation produced by :py:meth:`FleurInput.to_bytes()`
+
+        Args:
+            data: bytes of the binary representation
+
+        returns: :py:class:`FleurInput`
+        """
+        from pymatgen.io.fleur.binary import from_bytes
+
+        return from_bytes(data)
+
+    def to_compact(self, pool: Optional["ParameterPool"] = None) -> "CompactFleurInput":
+        """
+        Convert into the memory efficient, array-backed representation for large collections
+
+        See :py:mod:`pymatgen.io.fleur.compact`
+
+        Args:
+            pool (ParameterPool): pool in which equal LAPW parameters are shared.
+                                  Defaults to the pool of the process
+
+        returns: :py:class:`~pymatgen.io.fleur.compact.CompactFleurInput`
+        """
+        from pymatgen.io.fleur.compact import CompactFleurInput
+
+        return CompactFleurInput.from_fleur_input(self, pool=pool)
 
     def __repr__(self) -> str:
-        return self.get_inpgen_file_content()
+        # Only a summary is shown, since this is called in logging, debuggers and
+        # displays of collections. Parts of lazy instances, which are not loaded yet, are not loaded
+        if self._pending_structure is not None:
+            return f"{self.__class__.__name__}(structure=<not loaded>)"
+        structure = self._structure
+        parameters = "<not loaded>" if self._pending_parameters is not None else sorted(self._lapw_parameters)
+        pbc = tuple(bool(flag) for flag in structure.lattice.pbc)
+        return (
+            f"{self.__class__.__name__}(formula={structure.formula!r}, nsites={len(structure)}, "
+            f"pbc={pbc}, lapw_parameters={parameters})"
+        )
 
     def __str__(self) -> str:
         """
@@ -201,22 +941,90 @@ class FleurInput(MSONable):
         """
         return self.get_inpgen_file_content()
 
-    def write_file(self, filename: PathLike, **kwargs: Any):
+    @profiled("write_file")
+    def write_file(self, filename: PathLike, template: Optional[Any] = None, **kwargs: Any):
         """
         Writes FleurInput to a file.
 
         .. note::
-            Only the inpgen input is supported. Writing out a full
-            inp.xml file is not supported
+            inp.xml files (.xml in the extensions) are written by filling a template inp.xml,
+            which provides the species setups and all settings not contained in the
+            :py:class:`FleurInput` (see :py:mod:`pymatgen.io.fleur.xmlwriter`)
+
+        Args:
+            filename (PathLike): file to write the inpgen input or inp.xml to
+            template: template inp.xml (path, file handle or parsed XML tree).
+                      Required for writing inp.xml files
+
+        Kwargs are passed on to :py:meth:`FleurInput.get_inpgen_file_content()` or for
+        inp.xml files to :py:func:`~pymatgen.io.fleur.xmlwriter.write_inpxml()`
+        """
+
+        if not FleurInput._is_inpgen_file(filename):
+            if template is None:
+                raise ValueError("Writing out of fleur XML files requires a template inp.xml")
+            from pymatgen.io.fleur.xmlwriter import write_inpxml
+
+            write_inpxml(self, filename, template, **kwargs)
+            return
+
+        content = self.get_inpgen_file_content(**kwargs)
+        with stage("write"):
+            with zopen(filename, "wt") as f:
+                f.write(content)
+        if get_profiler() is not None:
+            count(bytes_written=len(content.encode("utf-8")))
+
+    async def awrite_file(self, filename: PathLike, executor: Optional["Executor"] = None, **kwargs: Any):
+        """
+        Writes FleurInput to a file without blocking the event loop
 
         Args:
-            filename (PathLike): file to write the inpgen input to
+            filename (PathLike): file to write the inpgen input or inp.xml to
+            executor (Executor): executor to render the file content in. Defaults to the
+                                 default executor of the event loop
 
-        Kwargs are passed on to :py:meth:`FleurInput.get_inpgen_file_content()`
+        Kwargs are passed on to :py:meth:`FleurInput.write_file()`
         """
+        from pymatgen.io.fleur.aio import awrite_file
+
+        await awrite_file(self, filename, executor=executor, **kwargs)
+
+
+def _structure_from_parsed_data(atoms: list, cell: Any, pbc: Any, lattice: Optional[Lattice] = None) -> Structure:
+    """
+    Construct the Structure from the atoms and cell returned by the masci_tools parsing functions
+
+    An already constructed ``lattice`` for the cell can be given to be reused
+    """
+    with stage("structure"):
+        positions = np.fromiter(
+            chain.from_iterable(site.position for site in atoms), dtype=float, count=3 * len(atoms)
+        ).reshape(-1, 3)
+        elements = [site.symbol for site in atoms]
+        # create lattice and structure object
+        lattice_in = lattice if lattice is not None else Lattice(cell, pbc=pbc)
+        structure = _structure_from_arrays(lattice_in, elements, positions, coords_are_cartesian=True)
+    count(atoms=len(structure))
+    return structure
+
+
+def _structure_from_arrays(
+    lattice: Lattice, species: Sequence[Union[str, int]], coords: np.ndarray, coords_are_cartesian: bool = False
+) -> Structure:
+    """
+    Construct a Structure from a sequence of species and an array of coordinates
+
+    Cartesian coordinates are converted for all sites at once and each distinct
+    species is only converted once, instead of doing this work for every site
+    """
+    coords = np.asarray(coords, dtype=float).reshape(-1, 3)
+    if coords_are_cartesian:
+        coords = lattice.get_fractional_coords(coords)
 
-        if filename.endswith(".xml"):
-            raise ValueError("Writing out of fleur XML files is not supported")
+    if isinstance(species, np.ndarray):
+        species = species.tolist()
+    # The sites share the (immutable) Composition objects of their species
+    compositions = {specie: Composition({get_el_sp(specie): 1}) for specie in set(species)}
 
-        with zopen(filename, "wt") as f:
-            f.write(self.get_inpgen_file_content(**kwargs))
+    return Structure(lattice, [compositions[specie] for specie in species], coords)
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+# Copyright (c)
+# Distributed under the terms of the MIT License
+"""
+This module provides a writer for the input files of the fleur input generator (inpgen)
+that formats the atom positions from coordinate arrays in one pass. The output
+is identical to the one of :py:func:`~masci_tools.io.fleur_inpgen.write_inpgen_file()`
+"""
+import io
+from typing import Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+__all__ = ("format_atom_block", "render_without_atoms", "write_inpgen_file_vectorized")
+
+#: Keyword arguments of :py:func:`~masci_tools.io.fleur_inpgen.write_inpgen_file()`
+#: that are supported by :py:func:`write_inpgen_file_vectorized`
+SUPPORTED_KWARGS = frozenset({"significant_figures_cell", "significant_figures_positions", "convert_from_angstroem"})
+
+
+def write_inpgen_file_vectorized(
+    cell: np.ndarray,
+    symbols: Sequence[str],
+    positions: np.ndarray,
+    pbc: Tuple[bool, bool, bool] = (True, True, True),
+    input_params: Optional[dict] = None,
+    significant_figures_positions: int = 10,
+    convert_from_angstroem: bool = True,
+    **kwargs: Any,
+) -> str:
+    """
+    Produce the content of an inpgen input file, formatting the atom block
+    from arrays of the atom positions instead of site by site
+
+    Only sites without kind names or magnetic moments differing from the element
+    are supported. Everything apart from the atom block is produced by
+    :py:func:`~masci_tools.io.fleur_inpgen.write_inpgen_file()`
+
+    Args:
+        cell: 3x3 array of the bravais matrix in Angstrom
+        symbols: element symbols of the atoms
+        positions: Nx3 array of the absolute positions of the atoms in Angstrom
+        pbc: periodic boundary conditions of the structure
+        input_params (dict): further namelists to write into the file
+        significant_figures_positions (int): number of decimal places written for the atom positions
+        convert_from_angstroem (bool): if True the cell and positions are converted from Angstrom to bohr
+
+    Kwargs are passed on to :py:func:`~masci_tools.io.fleur_inpgen.write_inpgen_file()`
+
+    returns: str of the inpgen input file
+    """
+    head, tail = render_without_atoms(
+        cell, pbc=pbc, input_params=input_params, convert_from_angstroem=convert_from_angstroem, **kwargs
+    )
+    atom_block = format_atom_block(
+        cell,
+        symbols,
+        positions,
+        pbc=pbc,
+        significant_figures_positions=significant_figures_positions,
+        convert_from_angstroem=convert_from_angstroem,
+    )
+    return "".join((head, atom_block, tail))
+
+
+def format_atom_block(
+    cell: np.ndarray,
+    symbols: Sequence[str],
+    positions: np.ndarray,
+    pbc: Tuple[bool, bool, bool] = (True, True, True),
+    significant_figures_positions: int = 10,
+    convert_from_angstroem: bool = True,
+) -> str:
+    """
+    Format the block with the number of atoms and the relative atom positions of an inpgen file
+
+    The block does not depend on the namelists of the file, so it can be
+    reused for files only differing in their parameters
+
+    Args:
+        cell: 3x3 array of the bravais matrix in Angstrom
+        symbols: element symbols of the atoms
+        positions: Nx3 array of the absolute positions of the atoms in Angstrom
+        pbc: periodic boundary conditions of the structure
+        significant_figures_positions (int): number of decimal places written for the atom positions
+        convert_from_angstroem (bool): if True the positions are converted from Angstrom to bohr
+
+    returns: str of the atom block (including the surrounding line breaks)
+    """
+    from masci_tools.util.constants import PERIODIC_TABLE_ELEMENTS
+
+    atomic_numbers = {data["symbol"]: num for num, data in PERIODIC_TABLE_ELEMENTS.items()}
+    numbers = np.array([atomic_numbers[symbol] for symbol in symbols], dtype=int)
+    return _format_atom_block(
+        cell,
+        numbers,
+        positions,
+        pbc=pbc,
+        significant_figures_positions=significant_figures_positions,
+        convert_from_angstroem=convert_from_angstroem,
+    )
+
+
+def _format_atom_block(
+    cell: np.ndarray,
+    numbers: np.ndarray,
+    positions: np.ndarray,
+    pbc: Tuple[bool, bool, bool] = (True, True, True),
+    significant_figures_positions: int = 10,
+    convert_from_angstroem: bool = True,
+) -> str:
+    """
+    Format the atom block from the atomic numbers of the atoms (see :py:func:`format_atom_block`)
+    """
+    from masci_tools.util.constants import BOHR_A
+
+    cell = np.asarray(cell, dtype=float)
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+
+    if False in pbc:
+        if pbc[2]:
+            raise ValueError("FLEUR can not handle this type of film coordinate")
+        rel_positions = np.empty_like(positions)
+        rel_positions[:, :2] = positions[:, :2] @ np.linalg.inv(cell[:2, :2])
+        rel_positions[:, 2] = positions[:, 2]
+        if convert_from_angstroem:
+            rel_positions[:, 2] *= 1.0 / BOHR_A
+    else:
+        rel_positions = positions @ np.linalg.inv(cell)
+
+    numbers = np.asarray(numbers, dtype=int)
+    # Sites with the element X (vacancies) are not written out
+    present = numbers != 0
+
+    position_fmt = f"%18.{significant_figures_positions}f"
+    content = io.StringIO()
+    content.write(f"\n    {int(present.sum()):3}\n")
+    if present.any():
+        np.savetxt(
+            content,
+            np.column_stack((numbers[present], rel_positions[present])),
+            fmt=["    %7d"] + [position_fmt] * 3,
+            delimiter=" ",
+        )
+    return content.getvalue()
+
+
+def render_without_atoms(
+    cell: np.ndarray,
+    pbc: Tuple[bool, bool, bool] = (True, True, True),
+    input_params: Optional[dict] = None,
+    convert_from_angstroem: bool = True,
+    **kwargs: Any,
+) -> Tuple[str, str]:
+    """
+    Produce the parts of an inpgen input file before and after the atom block
+    with :py:func:`~masci_tools.io.fleur_inpgen.write_inpgen_file()`
+
+    Args:
+        cell: 3x3 array of the bravais matrix in Angstrom
+        pbc: periodic boundary conditions of the structure
+        input_params (dict): further namelists to write into the file
+        convert_from_angstroem (bool): if True the cell is converted from Angstrom to bohr
+
+    Kwargs are passed on to :py:func:`~masci_tools.io.fleur_inpgen.write_inpgen_file()`
+
+    returns: tuple of the title, ``&input`` namelist and lattice before the atom block
+             and the namelists after the atom block
+    """
+    from masci_tools.io.fleur_inpgen import write_inpgen_file
+
+    # Empty kinds are passed, since an empty list of sites is treated like a list of dicts
+    content = write_inpgen_file(
+        np.asarray(cell, dtype=float),
+        [],
+        kinds=[],
+        pbc=pbc,
+        return_contents=True,
+        input_params=input_params,
+        convert_from_angstroem=convert_from_angstroem,
+        **kwargs,
+    )
+    empty_block = f"\n    {0:3}\n"
+    head, sep, tail = content.partition(empty_block)
+    if not sep:
+        raise ValueError("Failed to locate the atom block in the inpgen file")
+    return head, tail
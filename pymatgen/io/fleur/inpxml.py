@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+# Copyright (c)
+# Distributed under the terms of the MIT License
+"""
+This module provides functionality for reading the parts of the fleur inp.xml file
+that are needed to construct a :py:class:`~pymatgen.io.fleur.FleurInput`
+without building the complete XML tree in memory.
+
+The k-point lists and symmetry operations are converted into NumPy arrays
+by joining the text of all entries and converting it in one step
+(see :py:func:`read_kpoints` and :py:func:`read_symmetry_operations`).
+"""
+import hashlib
+import io
+import logging
+import os
+from pathlib import Path
+from typing import IO, Any, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+from lxml import etree
+
+__all__ = (
+    "KPoints",
+    "SymmetryOperations",
+    "load_inpxml",
+    "load_inpxml_sections",
+    "read_kpoints",
+    "read_symmetry_operations",
+    "section_fingerprints",
+)
+
+#: Top-level tags of the inp.xml that are retained by :py:func:`load_inpxml_sections`
+#: (``xcFunctional`` is a direct child of ``fleurInput`` for versions before 0.34)
+RETAINED_SECTIONS = frozenset(
+    {"comment", "calculationSetup", "cell", "atomSpecies", "atomGroups", "relaxation", "xcFunctional"}
+)
+
+#: Number of ``kPoint`` entries that are kept per ``kPointList``. The first
+#: two are needed by masci_tools to detect gamma-centered meshes
+RETAINED_KPOINTS = 2
+
+#: Top-level tags of the inp.xml that the structure is constructed from.
+#: The LAPW parameters can depend on all ``RETAINED_SECTIONS``
+STRUCTURE_SECTIONS = frozenset({"cell", "atomSpecies", "atomGroups"})
+
+_KPOINT_COORDS = etree.XPath("kPoint/text()", smart_strings=False)
+_KPOINT_WEIGHTS = etree.XPath("kPoint/@weight", smart_strings=False)
+_SYMOP_ROWS = etree.XPath("//symmetryOperations/symOp/*/text()", smart_strings=False)
+
+
+class KPoints(NamedTuple):
+    """
+    Entries of a ``kPointList`` of the inp.xml
+
+    .. attribute:: coords
+
+        Nx3 float array of the k-point coordinates in units of the reciprocal lattice vectors.
+
+    .. attribute:: weights
+
+        N float array of the weights.
+
+    """
+
+    coords: np.ndarray
+    weights: np.ndarray
+
+
+class SymmetryOperations(NamedTuple):
+    """
+    Symmetry operations of the inp.xml
+
+    .. attribute:: rotations
+
+        Nx3x3 int8 array of the rotation matrices in fractional coordinates.
+
+    .. attribute:: translations
+
+        Nx3 float array of the fractional translations.
+
+    """
+
+    rotations: np.ndarray
+    translations: np.ndarray
+
+
+def _as_source(inpxmlfile: Union[str, bytes, Path, IO[bytes]]) -> Union[str, IO[bytes]]:
+    """
+    Convert the given inp.xml content, path or file handle into something lxml can parse
+    """
+    if isinstance(inpxmlfile, str) and not os.path.isfile(inpxmlfile):
+        inpxmlfile = inpxmlfile.encode("utf-8")
+    if isinstance(inpxmlfile, bytes):
+        return io.BytesIO(inpxmlfile)
+    if isinstance(inpxmlfile, Path):
+        return os.fspath(inpxmlfile)
+    return inpxmlfile
+
+
+def _get_schema_dict(root: etree._Element, logger: Optional[logging.Logger] = None) -> Any:
+    """
+    Get the schema dictionary for the input version of the given inp.xml root
+    from the :py:class:`~pymatgen.io.fleur.schema.SchemaRegistry`
+    """
+    from pymatgen.io.fleur.schema import get_schema_registry
+
+    version = root.attrib.get("fleurInputVersion")
+    if version is None:
+        if logger is not None:
+            logger.error("Failed to parse input file: No fleurInputVersion attribute found")
+        raise ValueError("Failed to parse input file: No fleurInputVersion attribute found")
+    if logger is not None:
+        logger.info("Got Fleur input file with file version %s", version)
+    return get_schema_registry().get(version)
+
+
+def load_inpxml(
+    inpxmlfile: Union[str, bytes, Path, IO[bytes]],
+    logger: Optional[logging.Logger] = None,
+    base_url: Optional[Union[str, Path]] = None,
+    **kwargs: Any,
+) -> Tuple[etree._ElementTree, Any]:
+    """
+    Loads a inp.xml file together with the schema dictionary for its input version
+
+    Equivalent to :py:func:`~masci_tools.io.fleur_xml.load_inpxml()`, but the schema
+    dictionary is taken from the :py:class:`~pymatgen.io.fleur.schema.SchemaRegistry`
+
+    Args:
+        inpxmlfile: path to the inp.xml file, its content or an opened file handle (in bytes mode)
+        logger (logging.Logger): optional logger to which parse errors and the input version are reported
+        base_url (PathLike): optional base url to set on the resulting tree
+
+    Kwargs are passed on to :py:class:`lxml.etree.XMLParser`
+
+    returns: xmltree of the inpxmlfile and the schema dictionary
+             for the corresponding input version
+    """
+    if base_url is not None:
+        base_url = os.fspath(base_url)
+
+    parser = etree.XMLParser(attribute_defaults=True, encoding="utf-8", **kwargs)
+    try:
+        xmltree = etree.parse(_as_source(inpxmlfile), parser, base_url=base_url)
+    except etree.XMLSyntaxError as msg:
+        if logger is not None:
+            logger.exception("Failed to parse input file")
+        raise ValueError(f"Failed to parse input file: {msg}") from msg
+
+    return xmltree, _get_schema_dict(xmltree.getroot(), logger=logger)
+
+
+def load_inpxml_sections(
+    inpxmlfile: Union[str, bytes, Path, IO[bytes]],
+    logger: Optional[logging.Logger] = None,
+    base_url: Optional[Union[str, Path]] = None,
+    kpoints: Optional[Dict[str, KPoints]] = None,
+    **kwargs: Any,
+) -> Tuple[etree._ElementTree, Any]:
+    """
+    Loads a inp.xml file incrementally, keeping only the sections needed
+    to extract the structure and LAPW parameters
+
+    The file is processed with :py:func:`lxml.etree.iterparse`. All entries of
+    the ``kPointList`` elements apart from the first ones and the content of all top-level
+    sections apart from the ones in ``RETAINED_SECTIONS`` are discarded as soon as they are read. The resulting tree can be used
+    with :py:func:`~masci_tools.util.xml.xml_getters.get_structuredata()` and
+    :py:func:`~masci_tools.util.xml.xml_getters.get_parameterdata()`.
+
+    Args:
+        inpxmlfile: path to the inp.xml file, its content or an opened file handle (in bytes mode)
+        logger (logging.Logger): optional logger to which parse errors and the input version are reported
+        base_url (PathLike): optional base url to set on the resulting tree
+        kpoints (dict): if given, it is filled with the complete k-point lists of the file
+                        (see :py:func:`read_kpoints`), which are collected before the entries are discarded
+
+    Kwargs are passed on to :py:class:`lxml.etree.iterparse`
+
+    returns: reduced xmltree of the inpxmlfile and the schema dictionary
+             for the corresponding input version (see :py:class:`~pymatgen.io.fleur.schema.SchemaRegistry`)
+    """
+    kwargs.setdefault("attribute_defaults", True)
+    context = etree.iterparse(_as_source(inpxmlfile), events=("start", "end"), **kwargs)
+    collected: Dict[str, Tuple[Mapping[str, str], List[str], List[str]]] = {}
+    kpoint_list, entries = None, None
+    # Depth of the current element (1 for the root) and whether it is inside a discarded section
+    depth = 0
+    discarded = False
+    try:
+        for event, elem in context:
+            if event == "start":
+                depth += 1
+                if depth == 2:
+                    discarded = elem.tag not in RETAINED_SECTIONS
+                continue
+            depth -= 1
+
+            if elem.tag == "kPoint":
+                if kpoints is not None:
+                    # The reference to the parent keeps its proxy alive, so that the identity check works
+                    if elem.getparent() is not kpoint_list:
+                        kpoint_list = elem.getparent()
+                        entries = collected.setdefault(
+                            kpoint_list.get("name", "default"), (dict(kpoint_list.attrib), [], [])
+                        )
+                    entries[1].append(elem.text or "")
+                    entries[2].append(elem.get("weight", ""))
+                # The element that was just finished cannot be removed safely
+                # during the parse, so the entries are discarded one step behind
+                previous = elem.getprevious()
+                if not discarded and previous is not None and _is_surplus_kpoint(previous):
+                    previous.clear()
+                    elem.getparent().remove(previous)
+
+            if discarded:
+                # The content of discarded sections is released as soon as it is read
+                elem.clear(keep_tail=True)
+                if depth > 1:
+                    while elem.getprevious() is not None:
+                        del elem.getparent()[0]
+                else:
+                    discarded = False
+    except etree.XMLSyntaxError as msg:
+        if logger is not None:
+            logger.exception("Failed to parse input file")
+        raise ValueError(f"Failed to parse input file: {msg}") from msg
+
+    if kpoints is not None:
+        for name, (attrib, coords, weights) in collected.items():
+            kpoints[name] = _kpoints_from_text(coords, weights, attrib)
+
+    root = context.root
+    for kpoint in [kpoint for kpoint in root.iter("kPoint") if _is_surplus_kpoint(kpoint)]:
+        kpoint.getparent().remove(kpoint)
+    for section in list(root):
+        if section.tag not in RETAINED_SECTIONS:
+            root.remove(section)
+
+    xmltree = root.getroottree()
+    if base_url is not None:
+        xmltree.docinfo.URL = os.fspath(base_url)
+
+    return xmltree, _get_schema_dict(root, logger=logger)
+
+
+def _is_surplus_kpoint(elem: etree._Element) -> bool:
+    """
+    Return whether the given kPoint element is not among the first ones of its list
+    """
+    for _ in range(RETAINED_KPOINTS):
+        elem = elem.getprevious()
+        if elem is None:
+            return False
+    return True
+
+
+def read_kpoints(xmltree: etree._ElementTree) -> Dict[str, KPoints]:
+    """
+    Read all ``kPointList`` elements of the inp.xml into arrays
+
+    The coordinates and weights of each list are converted at once
+    instead of entry by entry. Coordinates written as fractions (e.g. ``-7.00/16.00``
+    for meshes) are supported and the ``posScale`` and ``weightScale`` attributes
+    of older input versions are applied
+
+    Args:
+        xmltree: XML tree of the inp.xml file
+
+    returns: dict mapping the names of the lists (``'default'`` for lists without name)
+             to :py:class:`KPoints`
+    """
+    kpoints = {}
+    for kpoint_list in xmltree.getroot().iter("kPointList"):
+        coords = _KPOINT_COORDS(kpoint_list)
+        if coords:
+            kpoints[kpoint_list.get("name", "default")] = _kpoints_from_text(
+                coords, _KPOINT_WEIGHTS(kpoint_list), kpoint_list.attrib
+            )
+    return kpoints
+
+
+def read_symmetry_operations(xmltree: etree._ElementTree) -> Optional[SymmetryOperations]:
+    """
+    Read the ``symOp`` elements of the inp.xml into arrays
+
+    The rows of all operations are converted at once. Each row contains
+    one row of the rotation matrix followed by the translation
+
+    Args:
+        xmltree: XML tree of the inp.xml file
+
+    returns: :py:class:`SymmetryOperations` or None if the file contains no symmetry
+             operations (e.g. if they are included from a separate file)
+    """
+    rows = _SYMOP_ROWS(xmltree)
+    if not rows:
+        return None
+    if len(rows) % 3 != 0:
+        raise ValueError("Failed to parse input file: Symmetry operations with missing rows")
+    values = _parse_numbers(rows, 4).reshape(-1, 3, 4)
+    return SymmetryOperations(np.rint(values[..., :3]).astype(np.int8), values[..., 3].copy())
+
+
+def _kpoints_from_text(coords: List[str], weights: List[str], attrib: Mapping[str, str]) -> KPoints:
+    """
+    Convert the texts and weight attributes of the kPoint entries of one list
+    """
+    if len(weights) != len(coords):
+        raise ValueError("Failed to parse input file: kPoint entries without weight")
+    kpoints = KPoints(_parse_numbers(coords, 3).reshape(-1, 3), _parse_numbers(weights, 1))
+    if "posScale" in attrib:
+        kpoints.coords /= float(attrib["posScale"])
+    if "weightScale" in attrib:
+        kpoints.weights /= float(attrib["weightScale"])
+    return kpoints
+
+
+def _parse_numbers(texts: List[str], per_entry: int) -> np.ndarray:
+    """
+    Convert the given texts containing ``per_entry`` whitespace separated numbers each
+    into one flat float array
+    """
+    text = " ".join(texts)
+    count = len(texts) * per_entry
+    fractions = text.count("/")
+    if fractions == 0:
+        values = np.fromstring(text, sep=" ")
+    elif fractions == count:
+        values = np.fromstring(text.replace("/", " "), sep=" ")
+        if values.size == 2 * count:
+            values = values[::2] / values[1::2]
+    else:
+        values = np.array([_parse_fraction(token) for token in text.split()])
+    if values.size != count:
+        raise ValueError(f"Failed to parse input file: Expected {count} numbers in {texts[:2]}...")
+    return values
+
+
+def _parse_fraction(token: str) -> float:
+    """
+    Convert a number, which may be written as fraction
+    """
+    numerator, _, denominator = token.partition("/")
+    return float(numerator) / float(denominator or 1)
+
+
+def section_fingerprints(xmltree: etree._ElementTree) -> Dict[str, str]:
+    """
+    Compute fingerprints of the top-level sections in ``RETAINED_SECTIONS``
+
+    Comparing the fingerprints of two versions of a inp.xml file shows which
+    sections have changed. The trees should be loaded in the same way (e.g. both with
+    :py:func:`load_inpxml_sections`), since the serialized sections are hashed
+
+    Args:
+        xmltree: XML tree of the inp.xml file
+
+    returns: dict mapping the tags of the sections to the hex digests of their content
+    """
+    return {
+        section.tag: hashlib.blake2b(etree.tostring(section), digest_size=16).hexdigest()
+        for section in xmltree.getroot()
+        if section.tag in RETAINED_SECTIONS
+    }
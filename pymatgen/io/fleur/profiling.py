@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+# Copyright (c)
+# Distributed under the terms of the MIT License
+"""
+This module provides opt-in timing instrumentation of the I/O paths of
+:py:class:`~pymatgen.io.fleur.FleurInput`.
+
+While a :py:class:`Profiler` is active, every call of ``from_file``, ``from_string``,
+``get_inpgen_file_content`` and ``write_file`` is recorded with the wall time spent
+in its stages, the number of bytes read and written and the number of atoms
+
+=============== ====================================================================
+Stage           Work
+=============== ====================================================================
+``read``        opening and reading (decompressing) the file
+``cache``       lookups in and stores to the parse cache
+``parse``       reading the inpgen file or parsing the inp.xml into a XML tree
+``validate``    validation of the XML tree against the schema
+``extract``     extracting the structure, parameters, k-points and symmetry operations
+``structure``   construction of the :py:class:`~pymatgen.core.structure.Structure`
+``render``      formatting the inpgen file
+``fill``        filling a template inp.xml
+``write``       writing (compressing) the file
+``other``       time of the calls not spent in any of the stages above
+=============== ====================================================================
+
+Calls made from within another recorded call (e.g. ``from_string`` inside ``from_file``)
+are attributed to the outermost call. Work of lazily loaded inputs done outside of
+recorded calls is listed under the call ``(outside)``. Bytes are counted for the
+UTF-8 encoded (uncompressed) content and ``bytes_written`` only by the calls writing files.
+Writing the rendered inpgen file in ``awrite_file`` is recorded as ``write_file``
+
+.. code-block:: python
+
+    from pymatgen.io.fleur.profiling import profile
+
+    with profile() as profiler:
+        fleur_inputs = [FleurInput.from_file(path) for path in paths]
+    print(profiler.table())
+    profiler.to_json('profile.json')
+
+Without an active profiler the instrumentation only costs a check of a global variable per stage.
+Calls in worker processes are not recorded by the profiler of the parent process.
+"""
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from pymatgen.util.typing import PathLike
+
+__all__ = ("Profiler", "get_profiler", "profile", "set_profiler")
+
+#: Name of the pseudo call collecting the stages run outside of recorded calls
+OUTSIDE = "(outside)"
+
+_PROFILER: Optional["Profiler"] = None
+_CURRENT_CALL: ContextVar[Optional["_CallRecord"]] = ContextVar("pymatgen_io_fleur_profiled_call", default=None)
+
+
+class _CallRecord:
+    """
+    Measurements of a single recorded call
+    """
+
+    __slots__ = ("name", "time", "failed", "stages", "bytes_read", "bytes_written", "atoms")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.time = 0.0
+        self.failed = False
+        self.stages: Dict[str, float] = {}
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.atoms = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Dict of the measurements passed to the callbacks
+        """
+        return {
+            "call": self.name,
+            "time": self.time,
+            "failed": self.failed,
+            "stages": dict(self.stages),
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "atoms": self.atoms,
+        }
+
+
+class Profiler:
+    """
+    Thread-safe aggregation of the measurements of the recorded calls
+
+    .. attribute:: callbacks
+
+        List of functions called with the dict of measurements (call name, time, failed,
+        stages, bytes_read, bytes_written and atoms) of every recorded call.
+
+    """
+
+    def __init__(self, callbacks: Optional[Iterable[Callable[[Dict[str, Any]], None]]] = None):
+        """
+        Args:
+            callbacks: functions to call with the measurements of every recorded call
+        """
+        self.callbacks: List[Callable[[Dict[str, Any]], None]] = list(callbacks or [])
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Dict[str, Any]] = {}
+
+    def add_callback(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Add a function to call with the measurements of every recorded call
+        """
+        self.callbacks.append(callback)
+
+    def reset(self) -> None:
+        """
+        Remove all aggregated measurements
+        """
+        with self._lock:
+            self._calls.clear()
+
+    def _entry(self, name: str) -> Dict[str, Any]:
+        """
+        Aggregated measurements for the given call name (has to be called with the lock held)
+        """
+        entry = self._calls.get(name)
+        if entry is None:
+            entry = self._calls[name] = {
+                "count": 0,
+                "failed": 0,
+                "time": 0.0,
+                "bytes_read": 0,
+                "bytes_written": 0,
+                "atoms": 0,
+                "stages": {},
+            }
+        return entry
+
+    def record(self, call: _CallRecord) -> None:
+        """
+        Add the measurements of a finished call
+        """
+        with self._lock:
+            entry = self._entry(call.name)
+            entry["count"] += 1
+            entry["failed"] += call.failed
+            entry["time"] += call.time
+            entry["bytes_read"] += call.bytes_read
+            entry["bytes_written"] += call.bytes_written
+            entry["atoms"] += call.atoms
+            for stage, elapsed in call.stages.items():
+                stats = entry["stages"].setdefault(stage, [0, 0.0])
+                stats[0] += 1
+                stats[1] += elapsed
+
+        if self.callbacks:
+            measurements = call.as_dict()
+            for callback in self.callbacks:
+                callback(measurements)
+
+    def record_outside(self, stage: str, elapsed: float) -> None:
+        """
+        Add the time of a stage run outside of recorded calls
+        """
+        with self._lock:
+            entry = self._entry(OUTSIDE)
+            entry["count"] += 1
+            entry["time"] += elapsed
+            stats = entry["stages"].setdefault(stage, [0, 0.0])
+            stats[0] += 1
+            stats[1] += elapsed
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the aggregated measurements
+
+        returns: dict mapping the call names to dicts with the number of calls (``count``),
+                 failed calls (``failed``), total time in seconds (``time``), ``bytes_read``,
+                 ``bytes_written``, ``atoms`` and the ``stages`` (dict mapping the stage names to
+                 dicts with ``count`` and ``time``, including the time not spent in any stage as ``other``)
+        """
+        with self._lock:
+            summary = {}
+            for name, entry in self._calls.items():
+                stages = {
+                    stage: {"count": number, "time": elapsed} for stage, (number, elapsed) in entry["stages"].items()
+                }
+                other = entry["time"] - sum(stats["time"] for stats in stages.values())
+                if name != OUTSIDE and other > 0.0:
+                    stages["other"] = {"count": entry["count"], "time": other}
+                summary[name] = {**entry, "stages": stages}
+            return summary
+
+    def table(self) -> str:
+        """
+        Format the aggregated measurements as a table with one row for each call
+        followed by rows for its stages
+
+        returns: str of the table
+        """
+        lines = [
+            f"{'call':<24} {'stage':<10} {'count':>8} {'time [s]':>10} {'mean [ms]':>10} {'share':>7}"
+            f" {'bytes read':>12} {'bytes written':>14} {'atoms':>10}"
+        ]
+        for name, entry in sorted(self.summary().items()):
+            total = entry["time"]
+            mean = 1000 * total / entry["count"] if entry["count"] else 0.0
+            lines.append(
+                f"{name:<24} {'':<10} {entry['count']:>8} {total:>10.4f} {mean:>10.3f} {'':>7}"
+                f" {entry['bytes_read']:>12} {entry['bytes_written']:>14} {entry['atoms']:>10}"
+            )
+            for stage, stats in sorted(entry["stages"].items(), key=lambda item: -item[1]["time"]):
+                mean = 1000 * stats["time"] / stats["count"] if stats["count"] else 0.0
+                share = f"{100 * stats['time'] / total:.1f}%" if total > 0.0 else ""
+                lines.append(
+                    f"{'':<24} {stage:<10} {stats['count']:>8} {stats['time']:>10.4f} {mean:>10.3f} {share:>7}"
+                )
+        return "\n".join(lines)
+
+    def to_json(self, filename: Optional[PathLike] = None, **kwargs: Any) -> str:
+        """
+        Export the aggregated measurements (see :py:meth:`summary()`) as JSON
+
+        Args:
+            filename (PathLike): optional file to write the JSON to
+
+        Kwargs are passed on to :py:func:`json.dumps()`
+
+        returns: str of the JSON document
+        """
+        content = json.dumps(self.summary(), **kwargs)
+        if filename is not None:
+            with open(filename, "w", encoding="utf-8") as f:
+                f.write(content)
+        return content
+
+
+def get_profiler() -> Optional[Profiler]:
+    """
+    Return the active profiler of the process or None if instrumentation is disabled
+    """
+    return _PROFILER
+
+
+def set_profiler(profiler: Optional[Profiler]) -> Optional[Profiler]:
+    """
+    Set the profiler recording the calls in this process
+
+    Args:
+        profiler (Profiler): profiler to use or None to disable the instrumentation
+
+    returns: the profiler passed in
+    """
+    global _PROFILER  # pylint: disable=global-statement
+    _PROFILER = profiler
+    return profiler
+
+
+@contextmanager
+def profile(profiler: Optional[Profiler] = None) -> Iterator[Profiler]:
+    """
+    Record the calls in the ``with`` block. The previously active profiler is restored afterwards
+
+    Args:
+        profiler (Profiler): profiler to record the calls with. By default a new one is created
+
+    returns: the active profiler
+    """
+    previous = get_profiler()
+    profiler = set_profiler(profiler if profiler is not None else Profiler())
+    try:
+        yield profiler
+    finally:
+        set_profiler(previous)
+
+
+class _NullStage:
+    """
+    Stage used while the instrumentation is disabled
+    """
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """
+    Measures the time of a stage and adds it to the current call
+    """
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: Profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        elapsed = time.perf_counter() - self.start
+        call = _CURRENT_CALL.get()
+        if call is None:
+            self.profiler.record_outside(self.name, elapsed)
+        else:
+            call.stages[self.name] = call.stages.get(self.name, 0.0) + elapsed
+        return False
+
+
+def stage(name: str) -> Any:
+    """
+    Context manager measuring the time of the given stage of the current call
+    """
+    profiler = _PROFILER
+    if profiler is None:
+        return _NULL_STAGE
+    return _Stage(profiler, name)
+
+
+def count(bytes_read: int = 0, bytes_written: int = 0, atoms: int = 0) -> None:
+    """
+    Add to the number of bytes read and written and the number of atoms of the current call
+    """
+    if _PROFILER is None:
+        return
+    call = _CURRENT_CALL.get()
+    if call is not None:
+        call.bytes_read += bytes_read
+        call.bytes_written += bytes_written
+        call.atoms += atoms
+
+
+def profiled(name: str) -> Callable:
+    """
+    Decorator recording the calls of the function under the given name while a profiler is active
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            profiler = _PROFILER
+            if profiler is None or _CURRENT_CALL.get() is not None:
+                return func(*args, **kwargs)
+
+            call = _CallRecord(name)
+            token = _CURRENT_CALL.set(call)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                call.failed = True
+                raise
+            finally:
+                call.time = time.perf_counter() - start
+                _CURRENT_CALL.reset(token)
+                profiler.record(call)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+# Copyright (c)
+# Distributed under the terms of the MIT License
+"""
+This module provides the cache of rendered inpgen files used by
+:py:meth:`~pymatgen.io.fleur.FleurInput.get_inpgen_file_content()`.
+
+Each :py:class:`~pymatgen.io.fleur.FleurInput` keeps the files rendered for the
+last few combinations of parameters and keyword arguments. The entries are dropped
+when the ``structure``, ``title`` or ``lapw_parameters`` are assigned or the structure
+is changed in place. The statistics over all instances of the process show how often
+rendering is avoided
+
+.. code-block:: python
+
+    from pymatgen.io.fleur.rendering import get_render_cache_stats
+
+    print(get_render_cache_stats().stats())
+
+"""
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+__all__ = ("RenderCache", "RenderCacheStats", "get_render_cache_stats")
+
+#: Maximum number of rendered files kept for each instance
+MAX_ENTRIES = 8
+
+
+class RenderCacheStats:
+    """
+    Statistics of the render caches of all :py:class:`~pymatgen.io.fleur.FleurInput` objects
+
+    .. attribute:: hits
+
+        Number of files returned from a cache.
+
+    .. attribute:: misses
+
+        Number of files that had to be rendered.
+
+    .. attribute:: invalidations
+
+        Number of times cached files were dropped because the input changed.
+
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Reset the counters
+        """
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.invalidations = 0
+
+    def record(self, hit: bool) -> None:
+        """
+        Count a lookup in a render cache
+        """
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def record_invalidation(self) -> None:
+        """
+        Count the invalidation of a non-empty render cache
+        """
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the counters and the fraction of lookups that were hits
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_RENDER_CACHE_STATS = RenderCacheStats()
+
+
+def get_render_cache_stats() -> RenderCacheStats:
+    """
+    Return the statistics of the render caches in this process
+    """
+    return _RENDER_CACHE_STATS
+
+
+def structure_signature(structure: Any) -> bytes:
+    """
+    Digest of the parts of the structure that the inpgen file depends on
+    (lattice, pbc, positions and element symbols)
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(structure.lattice.matrix, dtype=float).tobytes())
+    digest.update(np.array(structure.lattice.pbc, dtype=bool).tobytes())
+    digest.update(np.ascontiguousarray(structure.cart_coords, dtype=float).tobytes())
+    digest.update("\0".join(specie.symbol for specie in structure.species).encode("utf-8"))
+    return digest.digest()
+
+
+def render_key(parameters: dict, **kwargs: Any) -> str:
+    """
+    Key of a rendered file from the effective parameters (including the title)
+    and the keyword arguments used for rendering
+    """
+    return json.dumps({"parameters": parameters, "kwargs": kwargs}, sort_keys=True, default=repr)
+
+
+class RenderCache:
+    """
+    Rendered inpgen files of a single :py:class:`~pymatgen.io.fleur.FleurInput`,
+    which are valid for the structure with the stored signature
+    """
+
+    __slots__ = ("signature", "entries")
+
+    def __init__(self):
+        self.signature: Optional[bytes] = None
+        self.entries: Dict[str, str] = {}
+
+    def get(self, signature: bytes, key: str) -> Optional[str]:
+        """
+        Get the rendered file for the key, dropping all entries if the structure has changed
+        """
+        if signature != self.signature:
+            self.invalidate()
+            self.signature = signature
+        content = self.entries.get(key)
+        _RENDER_CACHE_STATS.record(content is not None)
+        return content
+
+    def put(self, key: str, content: str) -> None:
+        """
+        Store a rendered file, evicting the oldest entry if the cache is full
+        """
+        if len(self.entries) >= MAX_ENTRIES:
+            del self.entries[next(iter(self.entries))]
+        self.entries[key] = content
+
+    def invalidate(self) -> None:
+        """
+        Drop all rendered files
+        """
+        if self.entries:
+            _RENDER_CACHE_STATS.record_invalidation()
+            self.entries.clear()
+        self.signature = None
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+# Copyright (c)
+# Distributed under the terms of the MIT License
+"""
+This module provides a process-wide, thread-safe registry of the fleur input
+schema dictionaries used for parsing inp.xml files.
+
+Loading the schema dictionary of an input version (including building the
+compiled XML schema validator) is expensive and only done once per version
+and process. Long-running workers can load all needed versions up front
+
+.. code-block:: python
+
+    from pymatgen.io.fleur.schema import get_schema_registry
+
+    registry = get_schema_registry()
+    registry.preload(['0.34', '0.35'])  # or registry.preload() for all available versions
+    ...
+    print(registry.stats())
+
+Parsing the schema file takes a few hundred milliseconds, which dominates the first parse of
+a inp.xml in short-lived processes. With a ``cache_dir`` (for the registry of the process set by the
+environment variable ``PYMATGEN_IO_FLEUR_SCHEMA_CACHE``) the parsed schema dictionaries are stored
+on disk and loaded from there by later processes.
+
+Validating inp.xml files against their schema is optional (see :py:meth:`SchemaRegistry.validate`).
+Inputs generated by trusted pipelines can skip it (``validate='off'``) or only check a sample
+of the parsed files (``validate='sample'``).
+"""
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from lxml import etree
+
+from pymatgen.util.typing import PathLike
+
+__all__ = ("SchemaRegistry", "VALIDATION_MODES", "get_schema_registry")
+
+#: Supported values of the ``validate`` argument when parsing inp.xml files
+VALIDATION_MODES = ("full", "sample", "off")
+
+#: Environment variable with the ``cache_dir`` of the schema registry of the process
+SCHEMA_CACHE_ENV = "PYMATGEN_IO_FLEUR_SCHEMA_CACHE"
+
+
+class SchemaRegistry:
+    """
+    Thread-safe registry of the :py:class:`~masci_tools.io.parsers.fleur_schema.InputSchemaDict`
+    for each input version, recording how much time is spent on schema handling
+
+    .. attribute:: lookups
+
+        Number of schema dictionaries requested from the registry.
+
+    .. attribute:: loads
+
+        Number of schema dictionaries that had to be loaded.
+
+    .. attribute:: load_time
+
+        Total time in seconds spent loading schema dictionaries.
+
+    .. attribute:: validations
+
+        Number of XML trees validated against their schema.
+
+    .. attribute:: validations_skipped
+
+        Number of XML trees not validated in the ``'sample'`` mode.
+
+    .. attribute:: validation_time
+
+        Total time in seconds spent validating XML trees.
+
+    """
+
+    def __init__(self, sample_interval: int = 100, max_seen: int = 65536, cache_dir: Optional[PathLike] = None):
+        """
+        Args:
+            sample_interval (int): in the ``'sample'`` validation mode every ``sample_interval``-th
+                                   input is validated in addition to all inputs seen for the first time
+            max_seen (int): maximum number of content hashes remembered for the ``'sample'`` mode
+            cache_dir (PathLike): optional directory to store the parsed schema dictionaries in
+                                  for later processes. The entries are pickled, so the directory
+                                  must only be writable by trusted users
+        """
+        if sample_interval < 1:
+            raise ValueError(f"sample_interval has to be positive: Got {sample_interval}")
+        self.sample_interval = sample_interval
+        self.max_seen = max_seen
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._schemas: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._version_locks: Dict[str, threading.Lock] = {}
+        self._seen: "OrderedDict[bytes, None]" = OrderedDict()
+        self._sampled = 0
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """
+        Reset the counters of the registry
+        """
+        with self._lock:
+            self.lookups = 0
+            self.loads = 0
+            self.load_time = 0.0
+            self.validations = 0
+            self.validations_skipped = 0
+            self.validation_time = 0.0
+
+    def get(self, version: str) -> Any:
+        """
+        Get the schema dictionary for the given input version, loading it if necessary
+
+        Concurrent requests for a version that is not yet loaded wait for a single load
+
+        Args:
+            version (str): input version, e.g. ``'0.34'``
+
+        returns: :py:class:`~masci_tools.io.parsers.fleur_schema.InputSchemaDict` for the version
+        """
+        with self._lock:
+            self.lookups += 1
+            schema_dict = self._schemas.get(version)
+            if schema_dict is not None:
+                return schema_dict
+            version_lock = self._version_locks.setdefault(version, threading.Lock())
+
+        with version_lock:
+            schema_dict = self._schemas.get(version)
+            if schema_dict is not None:
+                return schema_dict
+            schema_dict = self._load(version)
+
+        with self._lock:
+            self._schemas[version] = schema_dict
+        return schema_dict
+
+    def _load(self, version: str) -> Any:
+        """
+        Load the schema dictionary for the given version
+        """
+        from masci_tools.io.parsers.fleur_schema import InputSchemaDict
+
+        start = time.perf_counter()
+        if self.cache_dir is None:
+            schema_dict = InputSchemaDict.fromVersion(version)
+        else:
+            schema_dict = self._load_cached(version)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.loads += 1
+            self.load_time += elapsed
+        return schema_dict
+
+    def _load_cached(self, version: str) -> Any:
+        """
+        Load the schema dictionary for the given version from the ``cache_dir``,
+        parsing the schema file and storing the result if there is no entry yet
+        """
+        from masci_tools import __version__ as masci_tools_version
+        from masci_tools.io.parsers.fleur_schema import InputSchemaDict
+        from masci_tools.io.parsers.fleur_schema.schema_dict import PACKAGE_DIRECTORY
+
+        schema_file = Path(PACKAGE_DIRECTORY) / version / "FleurInputSchema.xsd"
+        if not schema_file.is_file():
+            # Unknown versions fall back to the latest schema in masci-tools
+            return InputSchemaDict.fromVersion(version)
+
+        digest = hashlib.blake2b(schema_file.read_bytes(), digest_size=16)
+        digest.update(masci_tools_version.encode("utf-8"))
+        path = self.cache_dir / f"inpschema-{version}-{digest.hexdigest()}.pickle"
+
+        try:
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            data = None
+        if data is not None:
+            return InputSchemaDict(data, xmlschema=etree.XMLSchema(file=os.fspath(schema_file)))
+
+        schema_dict = InputSchemaDict.fromPath(schema_file)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Written to a temporary file first, so that concurrent processes never read partial entries
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump(schema_dict.data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+        return schema_dict
+
+    def preload(self, versions: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Load the schema dictionaries for the given versions, e.g. at the startup of a worker
+
+        Args:
+            versions: input versions to load. By default all versions available
+                      in masci-tools are loaded
+
+        returns: list of the loaded versions
+        """
+        if versions is None:
+            from masci_tools.io.parsers.fleur_schema import list_available_versions
+
+            versions = list_available_versions(output_schema=False)
+        versions = sorted(versions)
+
+        for version in versions:
+            self.get(version)
+        return versions
+
+    def validate(
+        self,
+        xmltree: etree._ElementTree,
+        schema_dict: Any,
+        mode: str = "full",
+        data: Optional[Union[str, bytes]] = None,
+    ) -> bool:
+        """
+        Validate the XML tree of a inp.xml file against its schema according to the given mode
+
+        ============ ================================================================
+        Mode         Behaviour
+        ============ ================================================================
+        ``'full'``   every tree is validated
+        ``'sample'`` trees are validated if their content is seen for the first time
+                     (only possible if ``data`` is given) and otherwise
+                     every ``sample_interval``-th tree
+        ``'off'``    no validation
+        ============ ================================================================
+
+        Args:
+            xmltree: XML tree of the inp.xml file
+            schema_dict: :py:class:`~masci_tools.io.parsers.fleur_schema.InputSchemaDict` for the tree
+            mode (str): validation mode
+            data (str or bytes): raw content the tree was parsed from. Used for recognizing
+                                 already seen inputs in the ``'sample'`` mode
+
+        Raises:
+            ValueError: if the tree is validated and does not conform to the schema
+
+        returns: bool, whether the tree was validated
+        """
+        if mode not in VALIDATION_MODES:
+            raise ValueError(f"Unknown validation mode {mode!r}. Expected one of {VALIDATION_MODES}")
+        if mode == "off":
+            return False
+
+        if mode == "sample" and not self._should_sample(data):
+            with self._lock:
+                self.validations_skipped += 1
+            return False
+
+        start = time.perf_counter()
+        try:
+            schema_dict.validate(xmltree)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.validations += 1
+                self.validation_time += elapsed
+        return True
+
+    def _should_sample(self, data: Optional[Union[str, bytes]]) -> bool:
+        """
+        Decide whether an input is validated in the ``'sample'`` mode
+        """
+        digest = None
+        if data is not None:
+            if isinstance(data, str):
+                data = data.encode("utf-8")
+            digest = hashlib.sha256(data).digest()
+
+        with self._lock:
+            self._sampled += 1
+            if digest is not None:
+                if digest not in self._seen:
+                    self._seen[digest] = None
+                    if len(self._seen) > self.max_seen:
+                        self._seen.popitem(last=False)
+                    return True
+                self._seen.move_to_end(digest)
+            return self._sampled % self.sample_interval == 0
+
+    def clear(self) -> None:
+        """
+        Remove all loaded schema dictionaries and seen inputs from the registry
+        """
+        with self._lock:
+            self._schemas.clear()
+            self._version_locks.clear()
+            self._seen.clear()
+            self._sampled = 0
+
+    @property
+    def versions(self) -> List[str]:
+        """
+        Input versions that are currently loaded
+        """
+        with self._lock:
+            return sorted(self._schemas)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the counters of the registry and the loaded versions
+        """
+        with self._lock:
+            return {
+                "lookups": self.lookups,
+                "loads": self.loads,
+                "load_time": self.load_time,
+                "validations": self.validations,
+                "validations_skipped": self.validations_skipped,
+                "validation_time": self.validation_time,
+                "versions": sorted(self._schemas),
+            }
+
+
+_SCHEMA_REGISTRY = SchemaRegistry(cache_dir=os.environ.get(SCHEMA_CACHE_ENV) or None)
+
+
+def get_schema_registry() -> SchemaRegistry:
+    """
+    Return the schema registry used for parsing inp.xml files in this process
+    """
+    return _SCHEMA_REGISTRY
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+# Copyright (c)
+# Distributed under the terms of the MIT License
+"""
+This module provides the detection of the compression and the format (inp.xml or inpgen input)
+of fleur input files from their first bytes.
+
+The content decides how a file is read, so that compressed files and files without the
+usual names (e.g. an inp.xml stored as ``inp`` or a gzipped file without ``.gz``) are handled.
+The file extension is only used for empty files. The decompression modules are only imported
+for files that need them.
+"""
+import codecs
+import io
+from pathlib import Path
+from typing import IO, Any, Optional, Tuple, Union
+
+from pymatgen.util.typing import PathLike
+
+__all__ = ("decompress", "detect_compression", "detect_format", "open_input", "open_stream")
+
+#: Number of bytes read for detecting the compression and format
+SNIFF_SIZE = 512
+
+#: Magic numbers at the start of the supported compressed files
+COMPRESSION_MAGIC = {
+    "gz": b"\x1f\x8b",
+    "bz2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+}
+
+
+def detect_compression(head: bytes) -> Optional[str]:
+    """
+    Detect the compression of a file from its first bytes
+
+    Args:
+        head (bytes): first bytes of the file
+
+    returns: ``'gz'``, ``'bz2'``, ``'xz'`` or None for uncompressed content
+    """
+    for compression, magic in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def detect_format(head: bytes) -> Optional[str]:
+    """
+    Detect whether the (decompressed) first bytes of a file belong to a inp.xml or a inpgen input
+
+    XML files start with ``<`` (the declaration, a comment or the ``fleurInput`` tag)
+    after an optional byte order mark and whitespace. Inpgen input starts with the title line
+
+    Args:
+        head (bytes): first bytes of the content
+
+    returns: ``'xml'``, ``'inpgen'`` or None if the content is empty
+    """
+    if head.startswith(codecs.BOM_UTF8):
+        head = head[len(codecs.BOM_UTF8) :]
+    head = head.lstrip()
+    if not head:
+        return None
+    return "xml" if head.startswith(b"<") else "inpgen"
+
+
+def open_input(filename: PathLike) -> Tuple[IO[bytes], str]:
+    """
+    Open a fleur input file for reading and detect its format from the content
+
+    Args:
+        filename (PathLike): file to open. Compressed files are detected from their content.
+                             For empty files the format is decided by the extension
+                             (inp.xml if ``.xml`` is in the extensions)
+
+    returns: file handle in bytes mode at the start of the (decompressed) content
+             and the format (``'xml'`` or ``'inpgen'``)
+    """
+    f: IO[bytes] = open(filename, "rb")  # pylint: disable=consider-using-with
+    try:
+        head = f.read(SNIFF_SIZE)
+        compression = detect_compression(head)
+        if compression is not None:
+            f.close()
+            f = _open_compressed(filename, compression)
+            head = f.read(SNIFF_SIZE)
+        f.seek(0)
+    except BaseException:
+        f.close()
+        raise
+
+    file_format = detect_format(head)
+    if file_format is None:
+        file_format = "xml" if ".xml" in Path(filename).suffixes else "inpgen"
+    return f, file_format
+
+
+def open_stream(fileobj: IO[bytes]) -> Tuple[IO[bytes], bytes]:
+    """
+    Wrap a binary file handle, which does not have to be seekable (e.g. a pipe),
+    so that compressed content is decompressed while it is read
+
+    Args:
+        fileobj: binary file handle positioned at the start of the content
+
+    returns: file handle of the (decompressed) content and its first :py:data:`SNIFF_SIZE` bytes,
+             which are still returned when reading from the handle
+    """
+    head = _read_head(fileobj)
+    stream: IO[bytes] = io.BufferedReader(_Prepended(head, fileobj))
+    compression = detect_compression(head)
+    if compression is not None:
+        decompressed = _open_compressed(stream, compression)
+        head = _read_head(decompressed)
+        stream = io.BufferedReader(_Prepended(head, decompressed))
+    return stream, head
+
+
+def decompress(data: bytes) -> bytes:
+    """
+    Decompress data if it starts with the magic number of one of the supported compressions
+
+    Args:
+        data (bytes): possibly compressed content
+
+    returns: the decompressed content or ``data`` itself if it is not compressed
+    """
+    compression = detect_compression(data)
+    if compression == "gz":
+        import gzip
+
+        return gzip.decompress(data)
+    if compression == "bz2":
+        import bz2
+
+        return bz2.decompress(data)
+    if compression == "xz":
+        import lzma
+
+        return lzma.decompress(data)
+    return data
+
+
+def _read_head(fileobj: IO[bytes]) -> bytes:
+    """
+    Read up to :py:data:`SNIFF_SIZE` bytes, also from handles returning short reads
+    """
+    chunks = []
+    size = 0
+    while size < SNIFF_SIZE:
+        chunk = fileobj.read(SNIFF_SIZE - size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+    return b"".join(chunks)
+
+
+class _Prepended(io.RawIOBase):
+    """
+    Raw stream returning the already read first bytes before the rest of the file handle
+    """
+
+    def __init__(self, head: bytes, fileobj: IO[bytes]):
+        super().__init__()
+        self._head = memoryview(head)
+        self._fileobj = fileobj
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        if self._head:
+            size = min(len(buffer), len(self._head))
+            buffer[:size] = self._head[:size]
+            self._head = self._head[size:]
+            return size
+        data = self._fileobj.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _open_compressed(filename: Union[PathLike, IO[bytes]], compression: str) -> IO[bytes]:
+    """
+    Open a compressed file (name or binary file handle) with the module for the given compression
+    """
+    if compression == "gz":
+        import gzip
+
+        return gzip.open(filename, "rb")
+    if compression == "bz2":
+        import bz2
+
+        return bz2.open(filename, "rb")
+    import lzma
+
+    return lzma.open(filename, "rb")
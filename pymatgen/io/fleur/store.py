@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+# Copyright (c)
+# Distributed under the terms of the MIT License
+"""
+This module provides a columnar on-disk store for large collections of
+:py:class:`~pymatgen.io.fleur.FleurInput` objects.
+
+A store is a directory containing one raw little-endian file per column
+(using the same representation as :py:mod:`pymatgen.io.fleur.binary`)
+
+================= ============================================================
+File              Content
+================= ============================================================
+``metadata.json`` format version, number of records and parameter encoding
+``index.i8``      Nx4 int64 array of the first site, number of sites,
+                  offset and length of the parameter blob of each record
+``lattices.f8``   Nx3x3 float64 lattice matrices
+``pbc.u1``        Nx3 uint8 periodic boundary conditions
+``coords.f8``     Mx3 float64 fractional coordinates of all sites
+``numbers.u1``    M uint8 atomic numbers of all sites
+``blobs.bin``     concatenated title and ``lapw_parameters`` of all records
+================= ============================================================
+
+The columns are opened as memory maps, so single records or vectorized
+queries over all records only read the data they need.
+
+.. code-block:: python
+
+    from pymatgen.io.fleur.store import FleurInputStore, write_store
+
+    write_store(fleur_inputs, 'collection')
+
+    store = FleurInputStore('collection')
+    volumes = store.volumes()         # computed from the lattices of all records
+    fleur_inp = store[42]             # only this record is deserialized
+
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Union
+
+import numpy as np
+
+from pymatgen.util.typing import PathLike
+
+from pymatgen.io.fleur.binary import (
+    FleurInputArrays,
+    _atomic_numbers,
+    _decode_parameters,
+    _encode_parameters,
+    _from_arrays,
+)
+
+__all__ = ("FleurInputStore", "FleurInputStoreWriter", "write_store")
+
+#: Version of the store layout written by :py:class:`FleurInputStoreWriter`
+STORE_VERSION = 1
+
+_COLUMNS = {
+    "index": ("index.i8", "<i8", (4,)),
+    "lattices": ("lattices.f8", "<f8", (3, 3)),
+    "pbc": ("pbc.u1", "u1", (3,)),
+    "coords": ("coords.f8", "<f8", (3,)),
+    "numbers": ("numbers.u1", "u1", ()),
+    "blobs": ("blobs.bin", "u1", ()),
+}
+
+
+class FleurInputStoreWriter:
+    """
+    Writer appending :py:class:`~pymatgen.io.fleur.FleurInput` objects to a store directory
+
+    The columns are written incrementally, so the collection does not have to fit
+    into memory. The store can only be read after the writer is closed.
+
+    .. code-block:: python
+
+        with FleurInputStoreWriter('collection') as writer:
+            for fleur_inp in fleur_inputs:
+                writer.append(fleur_inp)
+
+    """
+
+    def __init__(self, path: PathLike, overwrite: bool = False):
+        """
+        Args:
+            path (PathLike): directory of the store
+            overwrite (bool): if True an existing store in the directory is replaced
+        """
+        self.path = Path(path)
+        if (self.path / "metadata.json").exists() and not overwrite:
+            raise FileExistsError(f"A store already exists in {self.path}")
+        self.path.mkdir(parents=True, exist_ok=True)
+        if overwrite:
+            (self.path / "metadata.json").unlink(missing_ok=True)
+
+        self._files = {name: open(self.path / filename, "wb") for name, (filename, _, _) in _COLUMNS.items()}
+        self._count = 0
+        self._nsites = 0
+        self._blob_size = 0
+        self._encoding: Optional[int] = None
+
+    def append(self, fleur_input: Any) -> int:
+        """
+        Append a :py:class:`~pymatgen.io.fleur.FleurInput` to the store
+
+        Args:
+            fleur_input (FleurInput): input to append
+
+        returns: int of the index of the record in the store
+        """
+        structure = fleur_input.structure
+        numbers = _atomic_numbers(structure)
+        encoding, blob = _encode_parameters(
+            {"title": fleur_input.title, "lapw_parameters": fleur_input.lapw_parameters}
+        )
+        if self._encoding is None:
+            self._encoding = encoding
+
+        nsites = len(structure)
+        index = np.array([self._nsites, nsites, self._blob_size, len(blob)], dtype="<i8")
+
+        self._files["index"].write(index.tobytes())
+        self._files["lattices"].write(np.ascontiguousarray(structure.lattice.matrix, dtype="<f8").tobytes())
+        self._files["pbc"].write(np.array(structure.lattice.pbc, dtype=np.uint8).tobytes())
+        self._files["coords"].write(np.ascontiguousarray(structure.frac_coords, dtype="<f8").tobytes())
+        self._files["numbers"].write(numbers.tobytes())
+        self._files["blobs"].write(blob)
+
+        self._nsites += nsites
+        self._blob_size += len(blob)
+        self._count += 1
+        return self._count - 1
+
+    def close(self) -> None:
+        """
+        Close the column files and write the metadata of the store
+        """
+        if not self._files:
+            return
+        self._close_files()
+
+        metadata = {"version": STORE_VERSION, "count": self._count, "nsites": self._nsites, "encoding": self._encoding}
+        with open(self.path / "metadata.json", "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+
+    def _close_files(self) -> None:
+        """
+        Close the column files without writing the metadata
+        """
+        for file in self._files.values():
+            file.close()
+        self._files = {}
+
+    def __enter__(self) -> "FleurInputStoreWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        if exc_type is not None:
+            # Without metadata the incomplete store cannot be opened
+            self._close_files()
+            return
+        self.close()
+
+
+def write_store(fleur_inputs: Iterable[Any], path: PathLike, overwrite: bool = False) -> "FleurInputStore":
+    """
+    Write a collection of :py:class:`~pymatgen.io.fleur.FleurInput` objects to a store directory
+
+    Args:
+        fleur_inputs: iterable of inputs to write
+        path (PathLike): directory of the store
+        overwrite (bool): if True an existing store in the directory is replaced
+
+    returns: :py:class:`FleurInputStore` for reading the written store
+    """
+    with FleurInputStoreWriter(path, overwrite=overwrite) as writer:
+        for fleur_input in fleur_inputs:
+            writer.append(fleur_input)
+    return FleurInputStore(path)
+
+
+class FleurInputStore:
+    """
+    Read-only access to a store of :py:class:`~pymatgen.io.fleur.FleurInput` objects
+
+    Indexing the store returns :py:class:`~pymatgen.io.fleur.FleurInput` objects, which
+    are constructed on demand. The columns over all records are available as
+    read-only memory-mapped arrays for bulk analytics.
+
+    .. attribute:: index
+
+        Nx4 array of the first site, number of sites, offset and length of the parameter blob of each record.
+
+    .. attribute:: lattices
+
+        Nx3x3 array of the lattice matrices.
+
+    .. attribute:: pbc
+
+        Nx3 array of the periodic boundary conditions.
+
+    .. attribute:: frac_coords
+
+        Mx3 array of the fractional coordinates of all sites.
+
+    .. attribute:: numbers
+
+        Array of the atomic numbers of all sites.
+
+    """
+
+    def __init__(self, path: PathLike):
+        """
+        Args:
+            path (PathLike): directory of the store
+        """
+        self.path = Path(path)
+        try:
+            with open(self.path / "metadata.json", "r", encoding="utf-8") as f:
+                self.metadata = json.load(f)
+        except FileNotFoundError as exc:
+            raise FileNotFoundError(f"No complete store found in {self.path}") from exc
+        if self.metadata["version"] > STORE_VERSION:
+            raise ValueError(
+                f"Unsupported store version {self.metadata['version']}. "
+                f"Only versions up to {STORE_VERSION} are supported"
+            )
+
+        self.index = self._column("index")
+        self.lattices = self._column("lattices")
+        self.pbc = self._column("pbc").view(bool)
+        self.frac_coords = self._column("coords")
+        self.numbers = self._column("numbers")
+        self._blobs = self._column("blobs")
+
+    def _column(self, name: str) -> np.ndarray:
+        """
+        Open the file of a column as read-only memory map
+        """
+        filename, dtype, shape = _COLUMNS[name]
+        file = self.path / filename
+        if os.path.getsize(file) == 0:
+            return np.empty((0, *shape), dtype=dtype)
+        return np.memmap(file, dtype=dtype, mode="r").reshape(-1, *shape)
+
+    def __len__(self) -> int:
+        return self.metadata["count"]
+
+    @property
+    def nsites(self) -> np.ndarray:
+        """
+        Number of sites of each record
+        """
+        return self.index[:, 1]
+
+    def site_slice(self, i: int) -> slice:
+        """
+        Return the slice of the site columns belonging to the given record
+
+        Args:
+            i (int): index of the record
+        """
+        start, nsites = self.index[i, :2]
+        return slice(int(start), int(start + nsites))
+
+    def get_arrays(self, i: int) -> FleurInputArrays:
+        """
+        Return the arrays of a single record as views into the memory-mapped columns
+
+        Args:
+            i (int): index of the record
+
+        returns: :py:class:`~pymatgen.io.fleur.binary.FleurInputArrays` of the record
+        """
+        if not -len(self) <= i < len(self):
+            raise IndexError(f"Record index {i} out of range for store with {len(self)} records")
+        i %= len(self)
+        sites = self.site_slice(i)
+        blob_start, blob_len = (int(val) for val in self.index[i, 2:])
+        blob = _decode_parameters(self.metadata["encoding"], self._blobs[blob_start : blob_start + blob_len].tobytes())
+
+        return FleurInputArrays(
+            self.lattices[i],
+            self.pbc[i],
+            self.frac_coords[sites],
+            self.numbers[sites],
+            blob["title"],
+            blob["lapw_parameters"],
+        )
+
+    def __getitem__(self, i: int) -> Any:
+        return _from_arrays(self.get_arrays(i))
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def volumes(self) -> np.ndarray:
+        """
+        Return the cell volumes of all records
+        """
+        return np.abs(np.linalg.det(self.lattices))
+
+    def element_counts(self, element: Union[str, int]) -> np.ndarray:
+        """
+        Return the number of sites of the given element in each record
+
+        Args:
+            element (str or int): symbol or atomic number of the element
+        """
+        from pymatgen.core.periodic_table import Element
+
+        number = Element(element).Z if isinstance(element, str) else int(element)
+        counts = np.concatenate(([0], np.cumsum(self.numbers == number)))
+        return counts[self.index[:, 0] + self.nsites] - counts[self.index[:, 0]]
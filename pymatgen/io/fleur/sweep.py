@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+# Copyright (c)
+# Distributed under the terms of the MIT License
+"""
+This module provides functionality for generating many inpgen input files
+for the same structure with different LAPW parameters, e.g. for convergence
+or high-throughput parameter sweeps.
+
+The atom block is formatted once and only the parts of the file depending on
+the parameters (title, ``&input`` namelist, lattice and the namelists after the atoms)
+are rendered for each variant
+
+.. code-block:: python
+
+    param_grid = {'kpt.div1': [4, 6, 8], 'comp.kmax': [3.5, 4.0, 4.5]}
+
+    for values, content in fleur_inp.generate_inpgen_variants(param_grid):
+        ...
+
+    fleur_inp.write_inpgen_variants(param_grid, 'sweep', workers=4)
+
+"""
+import itertools
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from pymatgen.util.typing import PathLike
+
+from pymatgen.io.fleur.inpgen import SUPPORTED_KWARGS, format_atom_block, render_without_atoms
+
+__all__ = ("expand_param_grid", "generate_inpgen_variants", "write_inpgen_variants")
+
+ParamGrid = Union[Mapping[str, Sequence[Any]], Sequence[Mapping[str, Sequence[Any]]]]
+
+
+def expand_param_grid(param_grid: ParamGrid) -> List[Dict[str, Any]]:
+    """
+    Expand a parameter grid into the list of all its points
+
+    Args:
+        param_grid: dict mapping parameter names to the sequence of values to use or
+                    list of such dicts, whose points are concatenated. The names are either
+                    ``'namelist.parameter'`` (e.g. ``'kpt.div1'``) setting a single parameter,
+                    or the name of a complete namelist (e.g. ``'kpt'``) or ``'title'``
+
+    returns: list of dicts with the values for each point of the grid
+    """
+    if isinstance(param_grid, Mapping):
+        param_grid = [param_grid]
+
+    points = []
+    for grid in param_grid:
+        for name, values in grid.items():
+            if isinstance(values, (str, bytes, Mapping)) or not isinstance(values, Sequence):
+                raise TypeError(f"The values of the parameter grid have to be a sequence: Got {values!r} for {name}")
+        names = list(grid)
+        points.extend(dict(zip(names, combination)) for combination in itertools.product(*grid.values()))
+    return points
+
+
+def _apply_values(parameters: Dict[str, Any], values: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Return a copy of the parameters with the values of a grid point set
+    """
+    parameters = dict(parameters)
+    for name, value in values.items():
+        namelist, _, key = name.partition(".")
+        if key:
+            parameters[namelist] = {**parameters.get(namelist, {}), key: value}
+        else:
+            parameters[namelist] = value
+    return parameters
+
+
+def generate_inpgen_variants(
+    fleur_input: Any, param_grid: ParamGrid, ignore_set_parameters: bool = False, **kwargs: Any
+) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """
+    Generate the inpgen input files for all points of a parameter grid
+
+    The ``lapw_parameters`` of the input (unless ``ignore_set_parameters`` is True)
+    are updated with the values of each grid point (see :py:func:`expand_param_grid`)
+
+    Args:
+        fleur_input (FleurInput): input providing the structure and the default parameters
+        param_grid: parameter grid to generate the files for
+        ignore_set_parameters (bool): if True only the values of the grid points are used and the
+                                      ``lapw_parameters`` stored on the input are ignored
+
+    Kwargs are passed on to :py:func:`~pymatgen.io.fleur.inpgen.write_inpgen_file_vectorized()`
+
+    returns: generator of tuples of the values of the grid point and the content of the inpgen file
+    """
+    return _iter_variants(fleur_input, expand_param_grid(param_grid), ignore_set_parameters, **kwargs)
+
+
+def _iter_variants(
+    fleur_input: Any, points: Iterable[Mapping[str, Any]], ignore_set_parameters: bool, **kwargs: Any
+) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """
+    Generate the inpgen input files for the given grid points, formatting the atom block only once
+    """
+    unsupported = set(kwargs) - SUPPORTED_KWARGS
+    if unsupported:
+        raise ValueError(f"Unsupported arguments for generating inpgen variants: {', '.join(sorted(unsupported))}")
+    significant_figures_positions = kwargs.pop("significant_figures_positions", 10)
+    convert_from_angstroem = kwargs.pop("convert_from_angstroem", True)
+
+    structure = fleur_input.structure
+    cell = structure.lattice.matrix
+    pbc = structure.lattice.pbc
+    atom_block = format_atom_block(
+        cell,
+        [specie.symbol for specie in structure.species],
+        structure.cart_coords,
+        pbc=pbc,
+        significant_figures_positions=significant_figures_positions,
+        convert_from_angstroem=convert_from_angstroem,
+    )
+
+    base_parameters = {} if ignore_set_parameters else fleur_input.lapw_parameters
+    for values in points:
+        parameters = _apply_values(base_parameters, values)
+        parameters.setdefault("title", fleur_input.title)
+        if "input" in parameters:
+            # write_inpgen_file modifies this namelist in place
+            parameters["input"] = dict(parameters["input"])
+        head, tail = render_without_atoms(
+            cell, pbc=pbc, input_params=parameters, convert_from_angstroem=convert_from_angstroem, **kwargs
+        )
+        yield values, "".join((head, atom_block, tail))
+
+
+def write_inpgen_variants(
+    fleur_input: Any,
+    param_grid: ParamGrid,
+    directory: PathLike,
+    filename: str = "inp",
+    workers: Optional[int] = None,
+    ignore_set_parameters: bool = False,
+    **kwargs: Any,
+) -> List[Path]:
+    """
+    Write the inpgen input files for all points of a parameter grid into a directory tree
+
+    The file for the i-th grid point is written to ``directory/<i>/filename`` (with zero-padded
+    indices) and the values of all grid points are written to ``directory/variants.json``
+
+    Args:
+        fleur_input (FleurInput): input providing the structure and the default parameters
+        param_grid: parameter grid to generate the files for (see :py:func:`expand_param_grid`)
+        directory (PathLike): root directory of the written files
+        filename (str): name of the written inpgen files
+        workers (int): number of threads writing the files. By default the files are written sequentially
+        ignore_set_parameters (bool): if True only the values of the grid points are used and the
+                                      ``lapw_parameters`` stored on the input are ignored
+
+    Kwargs are passed on to :py:func:`~pymatgen.io.fleur.inpgen.write_inpgen_file_vectorized()`
+
+    returns: list of the paths of the written files
+    """
+    from pymatgen.io.fleur.batch import _reraise, _run_batch
+
+    directory = Path(directory)
+    points = expand_param_grid(param_grid)
+    width = len(str(max(len(points) - 1, 0)))
+    manifest = []
+
+    def tasks() -> Iterator[Tuple[Path, str]]:
+        for index, (values, content) in enumerate(_iter_variants(fleur_input, points, ignore_set_parameters, **kwargs)):
+            path = directory / f"{index:0{width}d}" / filename
+            manifest.append({"path": os.fspath(path.relative_to(directory)), "parameters": values})
+            yield path, content
+
+    if workers is None or workers <= 1:
+        paths = [_write_variant(path, content) for path, content in tasks()]
+    else:
+        # The contents are generated while the files are written and only
+        # a limited number of them is kept in memory
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            paths = list(
+                _run_batch(_write_variant, tasks(), executor, max_pending=4 * workers, ordered=True, on_error=_reraise)
+            )
+
+    with open(directory / "variants.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, default=str)
+    return paths
+
+
+def _write_variant(path: Path, content: str) -> Path:
+    """
+    Write the content of a single inpgen file, creating its directory
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    return path
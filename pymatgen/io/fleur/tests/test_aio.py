@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the asynchronous reading and writing of fleur inputs
+"""
+import asyncio
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from pymatgen.util.testing import PymatgenTest
+from pymatgen.io.fleur import FleurInput
+
+TEST_FILES_DIR = Path(__file__).absolute().parent / ".." / ".." / ".." / ".." / "test-files"
+
+
+class AsyncIOTest(PymatgenTest):
+    """
+    Tests of the coroutines for reading and writing fleur inputs
+    """
+
+    def test_afrom_file(self):
+        """
+        Test that reading a file asynchronously gives the same result as from_file
+        """
+        for name in ("inp_test", "inp_test_film", "inp.xml", "inp_film.xml"):
+            f = FleurInput.from_file(TEST_FILES_DIR / name)
+            f_async = asyncio.run(FleurInput.afrom_file(TEST_FILES_DIR / name))
+            self.assertEqual(f.as_dict(), f_async.as_dict())
+
+    def test_awrite_file(self):
+        """
+        Test that writing a file asynchronously gives the same content as write_file
+        """
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp_test")
+
+        with TemporaryDirectory() as td:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                asyncio.run(f.awrite_file(Path(td) / "inp_new.gz", executor=executor))
+            f_written = FleurInput.from_file(Path(td) / "inp_new.gz")
+
+            with self.assertRaises(ValueError):
+                asyncio.run(f.awrite_file(Path(td) / "inp.xml"))
+
+        self.assertEqual(f.as_dict(), f_written.as_dict())
+
+    def test_afrom_files(self):
+        """
+        Test reading many files with bounded concurrency in a temporary directory
+        """
+
+        async def read_all(paths, **kwargs):
+            return [result async for result in FleurInput.afrom_files(paths, **kwargs)]
+
+        with TemporaryDirectory() as td:
+            paths = []
+            for i in range(6):
+                name = "inp.xml" if i % 2 else "inp_test"
+                (Path(td) / str(i)).mkdir()
+                paths.append(Path(shutil.copy(TEST_FILES_DIR / name, Path(td) / str(i) / name)))
+            paths.insert(3, Path(td) / "does_not_exist.xml")
+
+            results = asyncio.run(read_all(paths, max_concurrency=2))
+            self.assertEqual([res.path for res in results], paths)
+            self.assertEqual([res.ok for res in results], [True, True, True, False, True, True, True])
+            self.assertIsInstance(results[3].error, FileNotFoundError)
+
+            results = asyncio.run(read_all(paths, max_concurrency=3, ordered=False, streaming=True))
+            self.assertEqual(sorted(map(str, paths)), sorted(str(res.path) for res in results))
+            self.assertEqual(sum(res.ok for res in results), 6)
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the batch reading of fleur inputs
+"""
+import gzip
+import io
+import lzma
+import shutil
+import tarfile
+import zipfile
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from pymatgen.util.testing import PymatgenTest
+from pymatgen.io.fleur import FleurInput
+from pymatgen.io.fleur.batch import iter_from_files, iter_from_stream
+
+TEST_FILES_DIR = Path(__file__).absolute().parent / ".." / ".." / ".." / ".." / "test-files"
+
+
+class BatchReadTest(PymatgenTest):
+    """
+    Tests of reading many fleur inputs at once
+    """
+
+    def test_from_files_ordered(self):
+        """
+        Test that the results are returned in input order and errors are captured
+        """
+        paths = [
+            TEST_FILES_DIR / "inp_test",
+            TEST_FILES_DIR / "does_not_exist",
+            TEST_FILES_DIR / "inp.xml",
+            TEST_FILES_DIR / "inp_test_film",
+            TEST_FILES_DIR / "inp_film.xml",
+        ]
+
+        for workers in (1, 2):
+            results = list(FleurInput.from_files(paths, workers=workers))
+
+            self.assertEqual([res.path for res in results], paths)
+            self.assertEqual([res.ok for res in results], [True, False, True, True, True])
+            self.assertIsInstance(results[1].error, FileNotFoundError)
+            self.assertIsNone(results[1].fleur_input)
+            self.assertEqual(
+                [res.fleur_input.title for res in results if res.ok],
+                [
+                    "A Fleur input generator calculation with aiida",
+                    "Si bulk",
+                    "A Fleur input generator calculation with aiida",
+                    "Fe/Pt",
+                ],
+            )
+
+    def test_from_files_completion_order(self):
+        """
+        Test that all results are returned for unordered processing
+        """
+        paths = [TEST_FILES_DIR / "inp_test", TEST_FILES_DIR / "inp.xml"] * 5
+
+        results = list(iter_from_files(paths, workers=2, ordered=False, streaming=True))
+
+        self.assertEqual(len(results), len(paths))
+        self.assertTrue(all(res.ok for res in results))
+        self.assertEqual(sorted(map(str, paths)), sorted(str(res.path) for res in results))
+
+    def test_iter_from_directory(self):
+        """
+        Test reading all files matching a pattern in a directory tree
+        """
+        with TemporaryDirectory() as td:
+            for index in range(3):
+                calc_dir = Path(td) / f"calc_{index}"
+                calc_dir.mkdir()
+                shutil.copy(TEST_FILES_DIR / "inp.xml", calc_dir / "inp.xml")
+                shutil.copy(TEST_FILES_DIR / "inp_test", calc_dir / "inp_test")
+
+            results = list(FleurInput.iter_from_directory(td, pattern="inp.xml", workers=2))
+
+        self.assertEqual([res.path.parent.name for res in results], ["calc_0", "calc_1", "calc_2"])
+        self.assertTrue(all(res.ok and res.fleur_input.title == "Si bulk" for res in results))
+
+
+class StreamReadTest(PymatgenTest):
+    """
+    Tests of reading fleur inputs from archives and concatenated streams
+    """
+
+    def setUp(self):
+        self.names = ["inp_test", "inp.xml", "inp_test_film", "inp_film.xml"]
+        self.contents = [(TEST_FILES_DIR / name).read_bytes() for name in self.names]
+        self.inputs = [FleurInput.from_file(TEST_FILES_DIR / name) for name in self.names]
+
+    def test_concatenated_stream(self):
+        """
+        Test splitting concatenated inpgen and XML inputs, also compressed and in non-seekable streams
+        """
+        written = [fleur_inp.get_inpgen_file_content().encode("utf-8") for fleur_inp in self.inputs]
+        data = b"\n".join(self.contents + written)
+        for compress in (lambda data: data, lzma.compress):
+            for workers in (1, 2):
+                stream = io.BufferedReader(io.BytesIO(compress(data)))
+                results = list(FleurInput.iter_from_stream(stream, workers=workers))
+
+                self.assertEqual([res.path for res in results], [f"<stream>#{index}" for index in range(8)])
+                self.assertTrue(all(res.ok for res in results))
+                for res, fleur_inp in zip(results, self.inputs * 2):
+                    self.assertEqual(res.fleur_input.structure, fleur_inp.structure)
+
+    def test_archives(self):
+        """
+        Test reading the members of tar and zip archives with filtering and compressed members
+        """
+        with TemporaryDirectory() as td:
+            paths = FleurInput.write_files(self.inputs, td, layout="flat", archive=Path(td) / "inputs.tar.xz")
+            results = list(iter_from_stream(Path(td) / "inputs.tar.xz", workers=1))
+            self.assertEqual([res.path for res in results], [path.as_posix() for path in paths])
+            for res, fleur_inp in zip(results, self.inputs):
+                self.assertEqual(res.fleur_input.structure, fleur_inp.structure)
+
+            archive = Path(td) / "inputs.zip"
+            with zipfile.ZipFile(archive, "w") as zf:
+                for name, content in zip(self.names, self.contents):
+                    zf.writestr(f"calc/{name}.gz", gzip.compress(content))
+                zf.writestr("calc/inp_broken", b"broken\n&input /\n")
+
+            results = list(FleurInput.iter_from_stream(archive, pattern="inp_[!f]*", workers=2))
+
+        self.assertEqual(
+            [res.path for res in results], ["calc/inp_test.gz", "calc/inp_test_film.gz", "calc/inp_broken"]
+        )
+        self.assertEqual([res.ok for res in results], [True, True, False])
+        self.assertEqual(results[1].fleur_input.structure, self.inputs[2].structure)
+
+
+class BatchWriteTest(PymatgenTest):
+    """
+    Tests of writing many fleur inputs at once
+    """
+
+    def setUp(self):
+        self.inputs = [
+            FleurInput.from_file(TEST_FILES_DIR / name) for name in ("inp_test", "inp.xml", "inp_test_film")
+        ] * 3
+
+    def test_write_files_sharded(self):
+        """
+        Test the sharded layout with threads and processes
+        """
+        for workers, processes in ((1, False), (2, False), (2, True)):
+            with TemporaryDirectory() as td:
+                paths = FleurInput.write_files(
+                    self.inputs, td, workers=workers, processes=processes, shard_size=4, compress="gz"
+                )
+                self.assertEqual(
+                    [path.relative_to(td).as_posix() for path in paths[:5]],
+                    ["0/0/inp.gz", "0/1/inp.gz", "0/2/inp.gz", "0/3/inp.gz", "1/4/inp.gz"],
+                )
+                self.assertEqual(len(list(Path(td).iterdir())), 3)
+                for fleur_inp, path in zip(self.inputs, paths):
+                    with gzip.open(path, "rt") as f:
+                        self.assertEqual(f.read(), fleur_inp.get_inpgen_file_content())
+
+    def test_write_files_layouts(self):
+        """
+        Test the flat and custom layouts and invalid arguments
+        """
+        with TemporaryDirectory() as td:
+            paths = FleurInput.write_files(iter(self.inputs[:2]), td, layout="flat", workers=1)
+            self.assertEqual([path.relative_to(td).as_posix() for path in paths], ["00000000/inp", "00000001/inp"])
+
+            paths = FleurInput.write_files(
+                self.inputs[:2],
+                td,
+                layout=lambda index, fleur_inp: f"{fleur_inp.structure.formula}/{index}.in",
+                workers=2,
+            )
+            self.assertEqual([path.relative_to(td).as_posix() for path in paths], ["Si2/0.in", "Si2/1.in"])
+
+            with self.assertRaises(ValueError):
+                FleurInput.write_files(self.inputs, td, layout="nested")
+            with self.assertRaises(ValueError):
+                FleurInput.write_files(self.inputs, td, compress="zip")
+
+    def test_write_files_archive(self):
+        """
+        Test packing the files into tar and zip archives
+        """
+        for name in ("inputs.tar.gz", "inputs.zip"):
+            with TemporaryDirectory() as td:
+                archive = Path(td) / name
+                paths = FleurInput.write_files(self.inputs, td, layout="flat", workers=2, archive=archive)
+                self.assertEqual(paths[0], Path("0/inp"))
+
+                if name.endswith(".zip"):
+                    with zipfile.ZipFile(archive) as zf:
+                        names = zf.namelist()
+                        content = zf.read("1/inp").decode("utf-8")
+                else:
+                    with tarfile.open(archive) as tf:
+                        names = tf.getnames()
+                        content = tf.extractfile("1/inp").read().decode("utf-8")
+
+                self.assertEqual(names, [path.as_posix() for path in paths])
+                self.assertEqual(content, self.inputs[1].get_inpgen_file_content())
+                self.assertEqual(len(list(Path(td).iterdir())), 1)
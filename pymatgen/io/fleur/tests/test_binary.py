@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the binary representation of FleurInput
+"""
+import json
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from pymatgen.util.testing import PymatgenTest
+from pymatgen.core import Lattice, Structure
+from pymatgen.io.fleur import FleurInput
+from pymatgen.io.fleur import binary
+from pymatgen.io.fleur.binary import unpack_arrays
+
+TEST_FILES_DIR = Path(__file__).absolute().parent / ".." / ".." / ".." / ".." / "test-files"
+
+
+class BinaryFormatTest(PymatgenTest):
+    """
+    Tests of the to_bytes/from_bytes methods
+    """
+
+    def test_roundtrip(self):
+        """
+        Test that the binary representation round trips losslessly for all test files
+        """
+        for path in sorted(TEST_FILES_DIR.iterdir()):
+            f = FleurInput.from_file(path)
+            data = f.to_bytes()
+            f_bytes = FleurInput.from_bytes(data)
+
+            self.assertEqual(f.as_dict(), f_bytes.as_dict())
+
+    def test_roundtrip_json_parameters(self):
+        """
+        Test the round trip if msgpack is not available
+        """
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp_film.xml")
+        with mock.patch.object(binary, "msgpack", None):
+            data = f.to_bytes()
+            self.assertEqual(f.as_dict(), FleurInput.from_bytes(data).as_dict())
+        self.assertIn(json.dumps(f.lapw_parameters).encode("utf-8"), data)
+
+    def test_unpack_arrays(self):
+        """
+        Test that the arrays are views into the buffer
+        """
+        struc = Structure(Lattice.hexagonal(3.0, 5.0, pbc=(True, True, False)), ["Fe", "Pt", "O"], np.eye(3) * 0.3)
+        data = FleurInput(struc, "test").to_bytes()
+        arrays = unpack_arrays(data)
+
+        self.assertArrayAlmostEqual(arrays.lattice, struc.lattice.matrix)
+        self.assertArrayAlmostEqual(arrays.frac_coords, struc.frac_coords)
+        self.assertEqual(arrays.numbers.tolist(), [26, 78, 8])
+        self.assertEqual(arrays.pbc.tolist(), [True, True, False])
+        self.assertEqual(arrays.title, "test")
+        self.assertFalse(arrays.frac_coords.flags.writeable)
+        self.assertFalse(arrays.frac_coords.flags.owndata)
+
+    def test_errors(self):
+        """
+        Test that unsupported structures and invalid records raise errors
+        """
+        struc = Structure(Lattice.cubic(3.0), ["Fe2+", "O2-"], [[0, 0, 0], [0.5, 0.5, 0.5]])
+        with self.assertRaises(ValueError):
+            FleurInput(struc).to_bytes()
+
+        struc = Structure(Lattice.cubic(3.0), ["Fe"], [[0, 0, 0]], site_properties={"magmom": [2.0]})
+        with self.assertRaises(ValueError):
+            FleurInput(struc).to_bytes()
+
+        data = FleurInput.from_file(TEST_FILES_DIR / "inp_test").to_bytes()
+        with self.assertRaises(ValueError):
+            FleurInput.from_bytes(b"NOTFLEUR" + data[8:])
+        with self.assertRaises(ValueError):
+            FleurInput.from_bytes(data[:-2])
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the parse cache for fleur inputs
+"""
+import logging
+import subprocess
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+from pymatgen.util.testing import PymatgenTest
+from pymatgen.io.fleur import FleurInput
+from pymatgen.io.fleur.cache import ParseCache, get_parse_cache, set_parse_cache
+
+TEST_FILES_DIR = Path(__file__).absolute().parent / ".." / ".." / ".." / ".." / "test-files"
+
+
+class ParseCacheTest(PymatgenTest):
+    """
+    Tests of the ParseCache class
+    """
+
+    def setUp(self):
+        self.tmp_dir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.cache_path = Path(self.tmp_dir.name) / "cache.sqlite"
+
+    def tearDown(self):
+        set_parse_cache(None)
+        self.tmp_dir.cleanup()
+
+    def test_disabled_by_default(self):
+        """
+        Test that no cache is used unless one is set
+        """
+        self.assertIsNone(get_parse_cache())
+
+    def test_sqlite_not_imported(self):
+        """
+        Test that parsing without a cache does not need sqlite3
+        """
+        # pymatgen.core imports sqlite3 itself, so it is only blocked afterwards
+        script = (
+            "import sys, pymatgen.core; sys.modules['sqlite3'] = None; "
+            "from pymatgen.io.fleur import FleurInput; "
+            f"FleurInput.from_file({str(TEST_FILES_DIR / 'inp_test')!r}); "
+            f"FleurInput.from_file({str(TEST_FILES_DIR / 'inp.xml')!r})"
+        )
+        subprocess.run([sys.executable, "-W", "ignore", "-c", script], check=True)
+
+    def test_from_file_hit_and_miss(self):
+        """
+        Test that the second read of the same content is served from the cache
+        """
+        cache = set_parse_cache(ParseCache(self.cache_path))
+
+        for name in ("inp.xml", "inp_test"):
+            f = FleurInput.from_file(TEST_FILES_DIR / name, read_kpoints=True)
+            f_cached = FleurInput.from_file(TEST_FILES_DIR / name, read_kpoints=True)
+
+            self.assertEqual(f.as_dict(), f_cached.as_dict())
+            self.assertEqual(f.kpoints is None, f_cached.kpoints is None)
+            if f.kpoints is not None:
+                self.assertArrayAlmostEqual(f.kpoints["default"].coords, f_cached.kpoints["default"].coords)
+                self.assertArrayEqual(f.symops.rotations, f_cached.symops.rotations)
+
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 2, "entries": 2, "size": cache.stats()["size"]})
+
+        # A new cache object (e.g. a new process) finds the persisted entries
+        cache = set_parse_cache(ParseCache(self.cache_path))
+        FleurInput.from_file(TEST_FILES_DIR / "inp.xml", streaming=True, read_kpoints=True)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_logger_not_in_key(self):
+        """
+        Test that passing the logger of masci_tools does not change the cache entry
+        """
+        cache = set_parse_cache(ParseCache(self.cache_path))
+
+        with open(TEST_FILES_DIR / "inp.xml", "rb") as f:
+            content = f.read()
+        f = FleurInput.from_string(content, inpgen_input=False)
+        f_logged = FleurInput.from_string(content, inpgen_input=False, logger=logging.getLogger(__name__))
+
+        self.assertEqual(f.as_dict(), f_logged.as_dict())
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_decoded_payload(self):
+        """
+        Test that NumPy and MSONable parameters are decoded on a cache hit
+        """
+        cache = ParseCache(self.cache_path)
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp.xml", read_kpoints=True)
+        f.lapw_parameters["kpt"] = {"div": np.array([4, 4, 4])}
+        f.lapw_parameters["lattice"] = f.structure.lattice
+
+        cache.put("key", {**f.as_dict(), **f._arrays_as_dict()})
+        f_cached = cache.get("key")
+
+        self.assertIsInstance(f_cached, FleurInput)
+        self.assertIsInstance(f_cached.lapw_parameters["kpt"]["div"], np.ndarray)
+        self.assertArrayEqual(f_cached.lapw_parameters["kpt"]["div"], [4, 4, 4])
+        self.assertEqual(f_cached.lapw_parameters["lattice"], f.structure.lattice)
+        self.assertEqual(f_cached.structure, f.structure)
+        self.assertArrayAlmostEqual(f_cached.kpoints["default"].coords, f.kpoints["default"].coords)
+
+    def test_key(self):
+        """
+        Test that the key depends on the content and the parsing options
+        """
+        key = ParseCache.key("content", inpgen_input=True)
+
+        self.assertEqual(key, ParseCache.key(b"content", inpgen_input=True))
+        self.assertNotEqual(key, ParseCache.key("content2", inpgen_input=True))
+        self.assertNotEqual(key, ParseCache.key("content", inpgen_input=False))
+
+    def test_lru_eviction(self):
+        """
+        Test that the least recently used entries are evicted
+        """
+        cache = ParseCache(self.cache_path, max_entries=2)
+
+        cache.put("a", {"value": 1})
+        cache.put("b", {"value": 2})
+        self.assertEqual(cache.get("a"), {"value": 1})
+        cache.put("c", {"value": 3})
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), {"value": 3})
+
+        cache = ParseCache(self.cache_path, max_entries=None, max_size=1)
+        cache.put("d", {"value": 4})
+        self.assertEqual(len(cache), 0)
+
+    def test_clear(self):
+        """
+        Test clearing the cache
+        """
+        cache = ParseCache(self.cache_path)
+        cache.put("a", {"value": 1})
+        cache.get("a")
+
+        cache.clear()
+
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 0, "entries": 0, "size": 0})
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the compact array-backed representation of FleurInput
+"""
+import gc
+import gzip
+import json
+import pickle
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from monty.json import MontyDecoder, MontyEncoder
+
+from pymatgen.util.testing import PymatgenTest
+from pymatgen.io.fleur import FleurInput
+from pymatgen.io.fleur.compact import CompactFleurInput, ParameterPool
+
+TEST_FILES_DIR = Path(__file__).absolute().parent / ".." / ".." / ".." / ".." / "test-files"
+
+
+class CompactFleurInputTest(PymatgenTest):
+    """
+    Tests of CompactFleurInput
+    """
+
+    def setUp(self):
+        self.inputs = [FleurInput.from_file(path) for path in sorted(TEST_FILES_DIR.iterdir())]
+
+    def test_roundtrip(self):
+        """
+        Test the conversion from and to FleurInput and the serializations
+        """
+        for f in self.inputs:
+            compact = f.to_compact()
+
+            self.assertFalse(hasattr(compact, "__dict__"))
+            self.assertFalse(compact.frac_coords.flags.writeable)
+            self.assertEqual(compact.title, f.title)
+            self.assertEqual(compact.formula, f.structure.formula)
+            self.assertEqual(compact.structure, f.structure)
+            self.assertEqual(compact.to_fleur_input().as_dict(), f.as_dict())
+
+            self.assertEqual(CompactFleurInput.from_dict(compact.as_dict()).as_dict(), compact.as_dict())
+            decoded = json.loads(json.dumps(compact, cls=MontyEncoder), cls=MontyDecoder)
+            self.assertEqual(decoded.as_dict(), compact.as_dict())
+            self.assertEqual(CompactFleurInput.from_bytes(f.to_bytes()).as_dict(), compact.as_dict())
+            self.assertIs(pickle.loads(pickle.dumps(compact))._lapw_parameters, compact._lapw_parameters)
+
+    def test_inpgen_file_content(self):
+        """
+        Test that the inpgen files rendered from the arrays are the same as for FleurInput
+        """
+        for f in self.inputs:
+            compact = f.to_compact()
+            self.assertEqual(compact.get_inpgen_file_content(), f.get_inpgen_file_content())
+            for kwargs in (
+                {"parameters": {"comp": {"kmax": 4.0}}, "significant_figures_positions": 6},
+                {"parameters": {"input": {"film": False}}, "ignore_set_parameters": True},
+                {"significant_figures_magnetic_moments": 2},
+            ):
+                self.assertEqual(compact.get_inpgen_file_content(**kwargs), f.get_inpgen_file_content(**kwargs))
+
+            with TemporaryDirectory() as td:
+                compact.write_file(Path(td) / "inp.gz")
+                with gzip.open(Path(td) / "inp.gz", "rt") as handle:
+                    self.assertEqual(handle.read(), f.get_inpgen_file_content())
+
+    def test_shared_parameters(self):
+        """
+        Test that equal parameters are stored once and not affected by changes of the original
+        """
+        pool = ParameterPool()
+        f = self.inputs[0]
+        compacts = [CompactFleurInput.from_fleur_input(f, pool=pool) for _ in range(3)]
+
+        self.assertEqual(len(pool), 1)
+        self.assertTrue(all(compact._lapw_parameters is compacts[0]._lapw_parameters for compact in compacts))
+
+        f.lapw_parameters["comp"]["kmax"] = 10.0
+        self.assertNotEqual(compacts[0].lapw_parameters["comp"]["kmax"], 10.0)
+        self.assertEqual(len(pool), 1)
+        compacts.append(CompactFleurInput.from_fleur_input(f, pool=pool))
+        self.assertEqual(len(pool), 2)
+
+        full = compacts[0].to_fleur_input()
+        full.lapw_parameters["comp"]["kmax"] = 12.0
+        self.assertNotEqual(compacts[0].lapw_parameters["comp"]["kmax"], 12.0)
+
+    def test_parameters_not_shared_on_edit(self):
+        """
+        Test that editing the parameters of one input does not change the others
+        """
+        pool = ParameterPool()
+        compacts = [self.inputs[0].to_compact(pool=pool) for _ in range(2)]
+        kmax = compacts[1].lapw_parameters["comp"]["kmax"]
+
+        compacts[0].lapw_parameters["comp"]["kmax"] = 5.0
+        self.assertEqual(compacts[0].lapw_parameters["comp"]["kmax"], kmax)
+        self.assertEqual(compacts[1].lapw_parameters["comp"]["kmax"], kmax)
+        self.assertEqual(compacts[1].get_inpgen_file_content(), self.inputs[0].get_inpgen_file_content())
+        self.assertIsNot(compacts[0].lapw_parameters, compacts[1].lapw_parameters)
+
+    def test_pool_released(self):
+        """
+        Test that the pool does not keep parameter sets of inputs that no longer exist
+        """
+        pool = ParameterPool()
+        compacts = [f.to_compact(pool=pool) for f in self.inputs]
+        self.assertEqual(len(pool), len({json.dumps(f.lapw_parameters, sort_keys=True) for f in self.inputs}))
+
+        del compacts
+        gc.collect()
+        self.assertEqual(len(pool), 0)
+
+    def test_invalid(self):
+        """
+        Test the errors for inconsistent arrays
+        """
+        with self.assertRaises(ValueError):
+            CompactFleurInput([[1, 0, 0], [0, 1, 0], [0, 0, 1]], [14, 14], [[0, 0, 0]])
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the fingerprints and the deduplication index of fleur inputs
+"""
+from pathlib import Path
+
+import numpy as np
+
+from pymatgen.util.testing import PymatgenTest
+from pymatgen.core import Lattice, Structure
+from pymatgen.io.fleur import FleurInput
+from pymatgen.io.fleur.fingerprint import FleurInputIndex, canonical_form
+
+TEST_FILES_DIR = Path(__file__).absolute().parent / ".." / ".." / ".." / ".." / "test-files"
+
+
+class FingerprintTest(PymatgenTest):
+    """
+    Tests of the fingerprint of FleurInput
+    """
+
+    def test_equivalent_inputs(self):
+        """
+        Test that equivalent representations of the same input have the same fingerprint
+        """
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp.xml")
+        self.assertEqual(
+            f.fingerprint(), FleurInput.from_file(TEST_FILES_DIR / "inp.xml", streaming=True).fingerprint()
+        )
+        self.assertEqual(f.fingerprint(), FleurInput.from_dict(f.as_dict()).fingerprint())
+
+        # Different order of the sites, periodic images, small noise, integer parameters and title
+        struc = f.structure
+        coords = struc.frac_coords[::-1] + [[1.0, 0.0, -1.0], [0.0, 0.0, 0.0]] + 1e-7
+        parameters = {**f.lapw_parameters, "comp": {**f.lapw_parameters["comp"], "gmaxxc": np.float64(9.2)}}
+        f_other = FleurInput(Structure(struc.lattice, struc.species[::-1], coords), "other", parameters)
+        self.assertEqual(f.fingerprint(), f_other.fingerprint())
+        f_other.lapw_parameters["comp"]["kmax"] = 4
+        f.lapw_parameters["comp"]["kmax"] = 4.0
+        self.assertEqual(f.fingerprint(), f_other.fingerprint())
+
+    def test_different_inputs(self):
+        """
+        Test that changes of the structure or parameters change the fingerprint
+        """
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp.xml")
+        struc = f.structure
+
+        f_other = FleurInput(struc, lapw_parameters={**f.lapw_parameters, "kpt": {"div1": 4}})
+        self.assertNotEqual(f.fingerprint(), f_other.fingerprint())
+
+        f_other = FleurInput(struc.copy(), lapw_parameters=f.lapw_parameters)
+        f_other.structure.translate_sites([0], [1e-3, 0, 0])
+        self.assertNotEqual(f.fingerprint(), f_other.fingerprint())
+        self.assertEqual(f.fingerprint(decimals=1), f_other.fingerprint(decimals=1))
+
+        f_other = FleurInput(struc.copy(), lapw_parameters=f.lapw_parameters)
+        f_other.structure.replace(0, "Ge")
+        self.assertNotEqual(f.fingerprint(), f_other.fingerprint())
+
+        lattice = Lattice(struc.lattice.matrix, pbc=(True, True, False))
+        f_other = FleurInput(Structure(lattice, struc.species, struc.frac_coords), lapw_parameters=f.lapw_parameters)
+        self.assertNotEqual(f.fingerprint(), f_other.fingerprint())
+
+        self.assertEqual(len(f.fingerprint(digest_size=8)), 16)
+
+
+class FleurInputIndexTest(PymatgenTest):
+    """
+    Tests of the FleurInputIndex
+    """
+
+    def test_index(self):
+        """
+        Test adding and finding inputs with and without exact comparison
+        """
+        inputs = [FleurInput.from_file(TEST_FILES_DIR / name) for name in ("inp.xml", "inp_film.xml")]
+        duplicate = FleurInput.from_dict(inputs[0].as_dict())
+        duplicate.title = "Copy"
+
+        for exact in (False, True):
+            index = FleurInputIndex(exact=exact)
+            self.assertTrue(index.add(inputs[0], key="bulk"))
+            self.assertTrue(index.add(inputs[1]))
+            self.assertFalse(index.add(duplicate, key="copy"))
+
+            self.assertEqual(len(index), 2)
+            self.assertEqual(sorted(map(str, index.keys())), ["1", "bulk"])
+            self.assertEqual(index.find(duplicate), "bulk")
+            self.assertIn(duplicate, index)
+            self.assertNotIn(FleurInput(inputs[0].structure), index)
+
+    def test_exact_collisions(self):
+        """
+        Test that different inputs with the same digest are kept apart in the exact mode
+        """
+        structures = [Structure(Lattice.cubic(3.0 + 0.1 * i), ["Fe"], [[0.0, 0.0, 0.0]]) for i in range(64)]
+        inputs = [FleurInput(struc) for struc in structures]
+
+        # With one byte digests collisions are unavoidable
+        index = FleurInputIndex(exact=True, digest_size=1)
+        self.assertTrue(all(index.add(fleur_inp) for fleur_inp in inputs))
+        self.assertEqual([index.find(fleur_inp) for fleur_inp in inputs], list(range(64)))
+
+        index = FleurInputIndex(digest_size=1)
+        self.assertLess(sum(index.add(fleur_inp) for fleur_inp in inputs), 64)
+        self.assertNotEqual(canonical_form(inputs[0]), canonical_form(inputs[1]))
@@ -4,6 +4,9 @@ Tests of the FleurInput class
 """
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from unittest import mock
+
+import numpy as np
 
 from pymatgen.util.testing import PymatgenTest
 from pymatgen.io.fleur import FleurInput
@@ -180,6 +183,183 @@ class FleurInputTest(PymatgenTest):
         self.assertEqual(parameters, f.lapw_parameters)
         self.assertEqual(title, f.title)
 
+    def test_from_file_xml_streaming(self):
+        """
+        Test that the streaming parser of the inp.xml gives the same result as the full parse
+        """
+        for name in ("inp.xml", "inp_film.xml"):
+            f = FleurInput.from_file(TEST_FILES_DIR / name)
+            f_streaming = FleurInput.from_file(TEST_FILES_DIR / name, streaming=True)
+
+            self.assertArrayAlmostEqual(f.structure.lattice.matrix, f_streaming.structure.lattice.matrix)
+            self.assertEqual(f.structure.lattice.pbc, f_streaming.structure.lattice.pbc)
+            self.assertArrayAlmostEqual(f.structure.frac_coords, f_streaming.structure.frac_coords)
+            self.assertEqual(f.lapw_parameters, f_streaming.lapw_parameters)
+            self.assertEqual(f.title, f_streaming.title)
+
+            with open(TEST_FILES_DIR / name, "rb") as file:
+                content = file.read()
+            f_string = FleurInput.from_string(content, inpgen_input=False, streaming=True)
+            self.assertEqual(f.lapw_parameters, f_string.lapw_parameters)
+
+    def test_kpoints_and_symops(self):
+        """
+        Test the k-point and symmetry arrays read together with the inp.xml
+        """
+        for streaming in (False, True):
+            f = FleurInput.from_file(TEST_FILES_DIR / "inp.xml", streaming=streaming, read_kpoints=True)
+            self.assertEqual(list(f.kpoints), ["default"])
+            self.assertArrayAlmostEqual(f.kpoints["default"].coords, [[0.25, 0.25, 0.25], [0.25, 0.5, 0.5]])
+            self.assertArrayAlmostEqual(f.kpoints["default"].weights, [2.0, 6.0])
+            self.assertEqual(f.symops.rotations.shape, (48, 3, 3))
+            self.assertEqual(f.symops.translations.shape, (48, 3))
+
+            f_film = FleurInput.from_file(
+                TEST_FILES_DIR / "inp_film.xml", streaming=streaming, lazy=True, read_kpoints=True
+            )
+            self.assertEqual(
+                {name: len(kpts.weights) for name, kpts in f_film.kpoints.items()}, {"default-1": 96, "path-2": 240}
+            )
+            self.assertArrayEqual(f_film.symops.rotations, [np.eye(3, dtype=np.int8)])
+
+        f_inpgen = FleurInput.from_file(TEST_FILES_DIR / "inp_test", read_kpoints=True)
+        self.assertIsNone(f_inpgen.kpoints)
+        self.assertIsNone(f_inpgen.symops)
+
+    def test_kpoints_not_read_by_default(self):
+        """
+        Test that the k-point lists are skipped unless they are requested
+        """
+        from pymatgen.io.fleur import inpxml
+
+        with open(TEST_FILES_DIR / "inp_film.xml", "rb") as file:
+            content = file.read()
+
+        with mock.patch.object(inpxml, "load_inpxml_sections", wraps=inpxml.load_inpxml_sections) as load:
+            f = FleurInput.from_file(TEST_FILES_DIR / "inp_film.xml", streaming=True)
+            f_string = FleurInput.from_string(content, inpgen_input=False, streaming=True)
+            f.refresh(TEST_FILES_DIR / "inp_film.xml")
+
+        self.assertEqual(load.call_count, 3)
+        for call in load.call_args_list:
+            self.assertIsNone(call.kwargs["kpoints"])
+        for fleur_inp in (f, f_string, FleurInput.from_file(TEST_FILES_DIR / "inp_film.xml")):
+            self.assertIsNone(fleur_inp.kpoints)
+            self.assertArrayEqual(fleur_inp.symops.rotations, [np.eye(3, dtype=np.int8)])
+
+    def test_from_file_lazy(self):
+        """
+        Test that lazily loaded inputs are only materialized on access and agree with the eager ones
+        """
+        import pickle
+
+        for name in ("inp_test", "inp_test_film", "inp.xml", "inp_film.xml"):
+            f = FleurInput.from_file(TEST_FILES_DIR / name)
+            f_lazy = FleurInput.from_file(TEST_FILES_DIR / name, lazy=True, streaming=name.endswith(".xml"))
+
+            self.assertEqual(f.title, f_lazy.title)
+            self.assertIsNone(f_lazy._structure)
+            self.assertEqual(f.lapw_parameters, f_lazy.lapw_parameters)
+            self.assertIsNone(f_lazy._structure)
+            self.assertEqual(f.as_dict(), f_lazy.as_dict())
+            self.assertEqual(str(f), str(f_lazy))
+
+            f_lazy = FleurInput.from_file(TEST_FILES_DIR / name, lazy=True)
+            self.assertEqual(f.as_dict(), pickle.loads(pickle.dumps(f_lazy)).as_dict())
+
+    def test_lazy_assignment(self):
+        """
+        Test that attributes assigned before they are materialized are not overwritten
+        """
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp.xml", lazy=True)
+        f.title = "New title"
+        f.lapw_parameters = {"comp": {"kmax": 4.0}}
+
+        self.assertEqual(f.title, "New title")
+        self.assertEqual(f.lapw_parameters, {"comp": {"kmax": 4.0}})
+        self.assertEqual(f.structure.formula, "Si2")
+
+    def test_refresh(self):
+        """
+        Test that refresh only reconstructs the parts depending on changed sections
+        """
+        content = (TEST_FILES_DIR / "inp.xml").read_text(encoding="utf-8")
+
+        with TemporaryDirectory() as td:
+            path = Path(td) / "inp.xml"
+            path.write_text(content, encoding="utf-8")
+            f = FleurInput.from_file(path)
+            self.assertEqual(f.refresh(path), ["atomGroups", "atomSpecies", "calculationSetup", "cell", "comment"])
+            self.assertEqual(f.as_dict(), FleurInput.from_file(path).as_dict())
+
+            structure, parameters = f.structure, f.lapw_parameters
+            self.assertEqual(f.refresh(path), [])
+            self.assertIs(f.structure, structure)
+            self.assertIs(f.lapw_parameters, parameters)
+
+            content = content.replace('Kmax="3.50000000"', 'Kmax="4.00000000"')
+            path.write_text(content, encoding="utf-8")
+            self.assertEqual(f.refresh(path), ["calculationSetup"])
+            self.assertIs(f.structure, structure)
+            self.assertAlmostEqual(f.lapw_parameters["comp"]["kmax"], 4.0)
+            self.assertEqual(f.as_dict(), FleurInput.from_file(path).as_dict())
+
+            content = content.replace(">1.000/8.000 1.000/8.000 1.000/8.000<", ">1.000/4.000 1.000/8.000 1.000/8.000<")
+            path.write_text(content, encoding="utf-8")
+            self.assertEqual(f.refresh(path), ["atomGroups"])
+            self.assertIsNot(f.structure, structure)
+            self.assertIs(f.structure.lattice, structure.lattice)
+            self.assertArrayAlmostEqual(f.structure[0].frac_coords, [0.25, 0.125, 0.125])
+            self.assertEqual(f.as_dict(), FleurInput.from_file(path).as_dict())
+
+        with self.assertRaises(ValueError):
+            f.refresh(TEST_FILES_DIR / "inp_test")
+
+    def test_repr(self):
+        """
+        Test the summary returned by repr and that lazy instances are not loaded by it
+        """
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp.xml")
+        self.assertEqual(
+            repr(f),
+            "FleurInput(formula='Si2', nsites=2, pbc=(True, True, True), lapw_parameters=['atom0', 'comp', 'exco'])",
+        )
+        f.structure = f.structure * (2, 1, 1)
+        self.assertIn("formula='Si4', nsites=4", repr(f))
+        # In-place changes of the structure are shown as well
+        f.structure.replace(0, "Ge")
+        f.structure.append("Ge", [0.5, 0.5, 0.5])
+        self.assertIn("formula='Si3 Ge2', nsites=5", repr(f))
+
+        f_lazy = FleurInput.from_file(TEST_FILES_DIR / "inp_film.xml", lazy=True)
+        self.assertEqual(repr(f_lazy), "FleurInput(structure=<not loaded>)")
+        self.assertIsNone(f_lazy._structure)
+
+    def test_str_memoized(self):
+        """
+        Test that the rendered inpgen file is reused until the input is changed
+        """
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp.xml")
+        content = str(f)
+        self.assertIs(str(f), content)
+        self.assertIs(f.get_inpgen_file_content(), content)
+        self.assertNotEqual(f.get_inpgen_file_content(significant_figures_positions=6), content)
+
+        f.title = "New title"
+        self.assertTrue(str(f).startswith("New title\n"))
+
+        # Changes made in place are detected
+        f.structure.translate_sites([0], [0.125, 0, 0])
+        self.assertIn("0.2500000000       0.1250000000       0.1250000000", str(f))
+        f.lapw_parameters["comp"]["kmax"] = 4.2
+        self.assertIn("kmax=4.2", str(f))
+        self.assertEqual(str(f), f._render_inpgen_file_content({**f.lapw_parameters, "title": f.title}))
+
+        f.lapw_parameters["input"] = {"film": False}
+        content = str(f)
+        self.assertEqual(f.lapw_parameters["input"], {"film": False})
+        self.assertIs(str(f), content)
+
     def test_get_inpgen_file_content(self):
         """
         Test of the get_inpgen_file_content method
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the vectorized inpgen writer
+"""
+from pathlib import Path
+
+import numpy as np
+
+from pymatgen.util.testing import PymatgenTest
+from pymatgen.core import Lattice, Structure
+from pymatgen.io.fleur import FleurInput
+from pymatgen.io.fleur.rendering import get_render_cache_stats
+
+TEST_FILES_DIR = Path(__file__).absolute().parent / ".." / ".." / ".." / ".." / "test-files"
+
+
+def render(f, **kwargs):
+    """
+    Render the inpgen file without returning a file cached by an earlier call
+    (the cache key does not include ``vectorized``, since the output is the same)
+    """
+    f._render_cache.invalidate()
+    return f.get_inpgen_file_content(**kwargs)
+
+
+class VectorizedInpgenWriterTest(PymatgenTest):
+    """
+    Tests that the vectorized inpgen writer reproduces the output of masci_tools
+    """
+
+    def test_test_files(self):
+        """
+        Test that the output is identical for all files in test-files
+        """
+        for path in sorted(TEST_FILES_DIR.iterdir()):
+            f = FleurInput.from_file(path)
+            self.assertEqual(render(f), render(f, vectorized=True))
+            self.assertEqual(
+                render(f, significant_figures_positions=6, significant_figures_cell=5),
+                render(f, vectorized=True, significant_figures_positions=6, significant_figures_cell=5),
+            )
+
+    def test_supercell(self):
+        """
+        Test that the output is identical for a large structure
+        """
+        rng = np.random.default_rng(42)
+        species = rng.choice(["Si", "Ge", "O", "Fe"], size=500)
+        struc = Structure(Lattice.cubic(20.0), species, rng.random((500, 3)) - 0.5)
+        f = FleurInput(struc, lapw_parameters={"comp": {"kmax": 4.0}})
+
+        misses = get_render_cache_stats().stats()["misses"]
+        self.assertEqual(render(f), render(f, vectorized=True))
+        # Both files were rendered
+        self.assertEqual(get_render_cache_stats().stats()["misses"], misses + 2)
+
+    def test_film(self):
+        """
+        Test that the output is identical for a film structure
+        """
+        lattice = Lattice([[2.8, 0.0, 0.0], [0.3, 3.9, 0.0], [0.0, 0.0, 6.5]], pbc=(True, True, False))
+        struc = Structure(lattice, ["Fe", "Pt", "Pt"], [[0.0, 0.0, -0.16], [0.5, 0.5, 0.0], [0.0, 0.0, 0.21]])
+        f = FleurInput(struc)
+
+        self.assertEqual(render(f), render(f, vectorized=True))
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the inp.xml helper functions
+"""
+import gzip
+import logging
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+from masci_tools.util.xml.xml_getters import get_kpointsdata, get_symmetry_information
+
+from pymatgen.util.testing import PymatgenTest
+from pymatgen.io.fleur.inpxml import load_inpxml, load_inpxml_sections, read_kpoints, read_symmetry_operations
+
+TEST_FILES_DIR = Path(__file__).absolute().parent / ".." / ".." / ".." / ".." / "test-files"
+
+
+def _inpxml_with_kpoints(nkpts: int) -> bytes:
+    """
+    Return the content of test-files/inp.xml with a kPointList of the given length
+    """
+    with open(TEST_FILES_DIR / "inp.xml", "r", encoding="utf-8") as f:
+        content = f.read()
+
+    kpoint = '               <kPoint weight="    1.000000">    0.250000     0.250000     0.250000</kPoint>\n'
+    start = content.index('<kPointList name="default" count="2">')
+    end = content.index("</kPointList>", start)
+    content = content[:start] + f'<kPointList name="default" count="{nkpts}">\n' + kpoint * nkpts + content[end:]
+    return content.encode("utf-8")
+
+
+class LoadInpxmlSectionsTest(PymatgenTest):
+    """
+    Tests of the load_inpxml_sections function
+    """
+
+    def test_retained_sections(self):
+        """
+        Test that only the needed sections are kept
+        """
+        xmltree, schema_dict = load_inpxml_sections(TEST_FILES_DIR / "inp.xml")
+
+        root = xmltree.getroot()
+        self.assertEqual(root.tag, "fleurInput")
+        self.assertEqual(
+            [child.tag for child in root],
+            ["comment", "calculationSetup", "cell", "atomSpecies", "atomGroups"],
+        )
+        self.assertEqual(schema_dict["inp_version"], "0.34")
+
+    def test_kpoints_discarded(self):
+        """
+        Test that large kpoint lists are reduced to the first entries
+        """
+        content = _inpxml_with_kpoints(5000)
+
+        xmltree, _ = load_inpxml_sections(content)
+        self.assertEqual(len(xmltree.xpath("//kPoint")), 2)
+        self.assertEqual(xmltree.xpath("//kPointList/@count"), ["5000"])
+
+        xmltree, _ = load_inpxml_sections(TEST_FILES_DIR / "inp_film.xml")
+        self.assertEqual([len(kpoints) for kpoints in xmltree.iter("kPointList")], [2, 2])
+
+    def test_discarded_sections(self):
+        """
+        Test that the content of sections outside of RETAINED_SECTIONS is dropped,
+        while k-points in them are still collected
+        """
+        with open(TEST_FILES_DIR / "inp.xml", "r", encoding="utf-8") as f:
+            content = f.read()
+        entries = "".join(f'<plot index="{i}"><value>{i}</value></plot>\n' for i in range(1000))
+        kpoints_section = (
+            '<kPointLists><kPointList name="extra" count="3">\n'
+            + "<kPoint weight='1.0'>0.0 0.0 0.0</kPoint>\n" * 3
+            + "</kPointList></kPointLists>\n"
+        )
+        end = content.index("</fleurInput>")
+        content = content[:end] + f"<plotting>\n{entries}</plotting>\n" + kpoints_section + content[end:]
+
+        kpoints = {}
+        xmltree, _ = load_inpxml_sections(content.encode("utf-8"), kpoints=kpoints)
+
+        self.assertEqual(
+            [child.tag for child in xmltree.getroot()],
+            ["comment", "calculationSetup", "cell", "atomSpecies", "atomGroups"],
+        )
+        self.assertEqual(sorted(kpoints), ["default", "extra"])
+        self.assertEqual(kpoints["extra"].coords.shape, (3, 3))
+
+    def test_compressed_file_handle(self):
+        """
+        Test that the function works with opened (compressed) file handles
+        """
+        with TemporaryDirectory() as td:
+            path = Path(td) / "inp.xml.gz"
+            with gzip.open(path, "wb") as f:
+                f.write(_inpxml_with_kpoints(100))
+
+            with gzip.open(path, "rb") as f:
+                xmltree, _ = load_inpxml_sections(f, base_url=path)
+
+        self.assertEqual(len(xmltree.xpath("//kPoint")), 2)
+        self.assertEqual(xmltree.docinfo.URL, str(path))
+
+    def test_invalid_xml(self):
+        """
+        Test that broken XML raises a ValueError
+        """
+        with self.assertRaises(ValueError):
+            load_inpxml_sections(b"<fleurInput fleurInputVersion='0.34'><cell></fleurInput>")
+
+    def test_logger(self):
+        """
+        Test that the logger argument of masci_tools is accepted and reported to
+        """
+        logger = logging.getLogger("pymatgen.io.fleur.tests")
+        for load in (load_inpxml, load_inpxml_sections):
+            with self.assertLogs(logger, level="INFO") as logs:
+                load(TEST_FILES_DIR / "inp.xml", logger=logger)
+            self.assertEqual(logs.output, ["INFO:pymatgen.io.fleur.tests:Got Fleur input file with file version 0.34"])
+
+            with self.assertLogs(logger, level="ERROR") as logs:
+                with self.assertRaises(ValueError):
+                    load(b"<fleurInput fleurInputVersion='0.34'><cell></fleurInput>", logger=logger)
+            self.assertIn("Failed to parse input file", logs.output[0])
+
+
+class ReadArraysTest(PymatgenTest):
+    """
+    Tests of reading the k-points and symmetry operations into arrays
+    """
+
+    def test_matches_masci_tools(self):
+        """
+        Test that the arrays agree with the masci_tools getters
+        """
+        for name in ("inp.xml", "inp_film.xml"):
+            xmltree, schema_dict = load_inpxml(TEST_FILES_DIR / name)
+
+            kpoints, weights, _, _ = get_kpointsdata(xmltree, schema_dict, only_used=False)
+            if not isinstance(kpoints, dict):
+                kpoints, weights = {"default": kpoints}, {"default": weights}
+            kpoints_arrays = read_kpoints(xmltree)
+            self.assertEqual(sorted(kpoints_arrays), sorted(kpoints))
+            for list_name, kpts in kpoints_arrays.items():
+                self.assertArrayAlmostEqual(kpts.coords, kpoints[list_name])
+                self.assertArrayAlmostEqual(kpts.weights, weights[list_name])
+
+            rotations, translations = get_symmetry_information(xmltree, schema_dict)
+            symops = read_symmetry_operations(xmltree)
+            self.assertEqual(symops.rotations.dtype, np.int8)
+            self.assertArrayEqual(symops.rotations, rotations)
+            self.assertArrayAlmostEqual(symops.translations, translations)
+
+    def test_streaming_collects_kpoints(self):
+        """
+        Test that load_inpxml_sections collects the complete lists before discarding the entries
+        """
+        kpoints = {}
+        xmltree, _ = load_inpxml_sections(_inpxml_with_kpoints(5000), kpoints=kpoints)
+        self.assertEqual(len(xmltree.xpath("//kPoint")), 2)
+        self.assertEqual(kpoints["default"].coords.shape, (5000, 3))
+        self.assertArrayAlmostEqual(kpoints["default"].weights, np.ones(5000))
+
+        kpoints_film = {}
+        xmltree, _ = load_inpxml_sections(TEST_FILES_DIR / "inp_film.xml", kpoints=kpoints_film)
+        xmltree_full, _ = load_inpxml(TEST_FILES_DIR / "inp_film.xml")
+        for list_name, kpts in read_kpoints(xmltree_full).items():
+            self.assertArrayAlmostEqual(kpoints_film[list_name].coords, kpts.coords)
+            self.assertArrayAlmostEqual(kpoints_film[list_name].weights, kpts.weights)
+
+    def test_fractions_and_errors(self):
+        """
+        Test mixed fractions and malformed entries
+        """
+        content = _inpxml_with_kpoints(1).replace(b"0.250000     0.250000     0.250000", b"1/4 0.5 -1.00/3.00")
+        xmltree, _ = load_inpxml(content)
+        self.assertArrayAlmostEqual(read_kpoints(xmltree)["default"].coords, [[0.25, 0.5, -1 / 3]])
+
+        xmltree, _ = load_inpxml(content.replace(b"1/4 0.5", b"1/4"))
+        with self.assertRaises(ValueError):
+            read_kpoints(xmltree)
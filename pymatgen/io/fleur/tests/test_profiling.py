@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the timing instrumentation of the FleurInput I/O paths
+"""
+import asyncio
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from pymatgen.util.testing import PymatgenTest
+from pymatgen.io.fleur import FleurInput
+from pymatgen.io.fleur.profiling import OUTSIDE, Profiler, get_profiler, profile
+
+TEST_FILES_DIR = Path(__file__).absolute().parent / ".." / ".." / ".." / ".." / "test-files"
+
+
+class ProfilerTest(PymatgenTest):
+    """
+    Tests of the Profiler and the instrumented calls
+    """
+
+    def test_stages(self):
+        """
+        Test the recorded stages, bytes and atoms of reading and writing files
+        """
+        records = []
+        with TemporaryDirectory() as td:
+            with profile(Profiler(callbacks=[records.append])) as profiler:
+                f_xml = FleurInput.from_file(TEST_FILES_DIR / "inp.xml", validate="full")
+                f_inpgen = FleurInput.from_file(TEST_FILES_DIR / "inp_test")
+                f_inpgen.write_file(Path(td) / "inp")
+                f_xml.write_file(Path(td) / "inp.xml", template=TEST_FILES_DIR / "inp.xml")
+                written = len((Path(td) / "inp").read_bytes()) + len((Path(td) / "inp.xml").read_bytes())
+            self.assertIsNone(get_profiler())
+
+        summary = profiler.summary()
+        self.assertEqual(sorted(summary), ["from_file", "write_file"])
+
+        from_file = summary["from_file"]
+        self.assertEqual(from_file["count"], 2)
+        self.assertEqual(from_file["failed"], 0)
+        self.assertEqual(
+            from_file["bytes_read"],
+            len((TEST_FILES_DIR / "inp.xml").read_bytes()) + len((TEST_FILES_DIR / "inp_test").read_bytes()),
+        )
+        self.assertEqual(from_file["atoms"], len(f_xml.structure) + len(f_inpgen.structure))
+        self.assertTrue({"read", "parse", "validate", "extract", "structure"}.issubset(from_file["stages"]))
+        self.assertEqual(from_file["stages"]["parse"]["count"], 2)
+        self.assertEqual(from_file["stages"]["validate"]["count"], 1)
+        self.assertAlmostEqual(sum(stats["time"] for stats in from_file["stages"].values()), from_file["time"])
+
+        write_file = summary["write_file"]
+        self.assertEqual(write_file["count"], 2)
+        self.assertEqual(write_file["bytes_written"], written)
+        self.assertTrue({"render", "fill", "validate", "write"}.issubset(write_file["stages"]))
+
+        self.assertEqual([record["call"] for record in records], ["from_file", "from_file", "write_file", "write_file"])
+        self.assertEqual(json.loads(profiler.to_json()), json.loads(json.dumps(summary)))
+        table = profiler.table()
+        self.assertIn("from_file", table)
+        self.assertIn("validate", table)
+
+    def test_bytes(self):
+        """
+        Test that bytes are counted for the encoded content and only when files are written
+        """
+        content = (TEST_FILES_DIR / "inp_test").read_text(encoding="utf-8")
+        content = content.replace("calculation with aiida", "calculation with aiida \u00e9")
+
+        with TemporaryDirectory() as td:
+            with profile() as profiler:
+                f = FleurInput.from_string(content)
+                str(f)
+                f.get_inpgen_file_content(vectorized=True)
+                asyncio.run(f.awrite_file(Path(td) / "inp"))
+            written = (Path(td) / "inp").read_bytes()
+
+        summary = profiler.summary()
+        self.assertEqual(summary["from_string"]["bytes_read"], len(content.encode("utf-8")))
+        self.assertEqual(summary["get_inpgen_file_content"]["count"], 3)
+        self.assertEqual(summary["get_inpgen_file_content"]["bytes_written"], 0)
+        self.assertEqual(summary["write_file"]["count"], 1)
+        self.assertEqual(summary["write_file"]["bytes_written"], len(written))
+        self.assertIn("\u00e9", written.decode("utf-8"))
+
+    def test_lazy_and_failed(self):
+        """
+        Test that lazy loads outside of calls and failed calls are recorded
+        """
+        with profile() as profiler:
+            f = FleurInput.from_file(TEST_FILES_DIR / "inp.xml", lazy=True)
+            with self.assertRaises(ValueError):
+                FleurInput.from_string("<fleurInput>", inpgen_input=False)
+            len(f.structure)
+
+        summary = profiler.summary()
+        self.assertEqual(summary["from_string"]["failed"], 1)
+        self.assertEqual(sorted(summary[OUTSIDE]["stages"]), ["extract", "structure"])
+
+        profiler.reset()
+        self.assertEqual(profiler.summary(), {})
+
+    def test_disabled(self):
+        """
+        Test that nothing is recorded outside of profile()
+        """
+        profiler = Profiler()
+        with profile(profiler):
+            pass
+        FleurInput.from_file(TEST_FILES_DIR / "inp_test").get_inpgen_file_content()
+        self.assertEqual(profiler.summary(), {})
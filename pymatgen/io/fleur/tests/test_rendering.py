@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the cache of rendered inpgen files
+"""
+import pickle
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from pymatgen.util.testing import PymatgenTest
+from pymatgen.io.fleur import FleurInput
+from pymatgen.io.fleur.rendering import MAX_ENTRIES, get_render_cache_stats
+
+TEST_FILES_DIR = Path(__file__).absolute().parent / ".." / ".." / ".." / ".." / "test-files"
+
+
+class RenderCacheTest(PymatgenTest):
+    """
+    Tests of the render cache of FleurInput
+    """
+
+    def setUp(self):
+        self.stats = get_render_cache_stats()
+        self.stats.reset()
+
+    def test_hits(self):
+        """
+        Test that writing, str and logging the same input renders the file once
+        """
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp.xml")
+
+        with TemporaryDirectory() as td:
+            f.write_file(str(Path(td) / "inp"))
+            content = (Path(td) / "inp").read_text()
+        self.assertEqual(str(f), content)
+        self.assertEqual(f.get_inpgen_file_content(vectorized=True), content)
+        # The effective parameters are the same
+        self.assertEqual(f.get_inpgen_file_content(parameters={"comp": f.lapw_parameters["comp"]}), content)
+
+        self.assertEqual(self.stats.stats(), {"hits": 3, "misses": 1, "invalidations": 0, "hit_rate": 0.75})
+
+    def test_keys(self):
+        """
+        Test that different parameters and keyword arguments are cached separately
+        """
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp.xml")
+        default = f.get_inpgen_file_content()
+        kmax = f.get_inpgen_file_content(parameters={"comp": {"kmax": 4.5}})
+        figures = f.get_inpgen_file_content(significant_figures_positions=6)
+        only_kpt = f.get_inpgen_file_content(parameters={"kpt": {"div1": 4}}, ignore_set_parameters=True)
+        self.assertEqual(len({default, kmax, figures, only_kpt}), 4)
+        self.assertEqual(self.stats.misses, 4)
+
+        self.assertIs(f.get_inpgen_file_content(parameters={"comp": {"kmax": 4.5}}), kmax)
+        self.assertIs(f.get_inpgen_file_content(significant_figures_positions=6), figures)
+        self.assertEqual(self.stats.hits, 2)
+
+        for i in range(MAX_ENTRIES):
+            f.get_inpgen_file_content(parameters={"kpt": {"div1": i + 1}})
+        self.assertEqual(len(f._render_cache.entries), MAX_ENTRIES)
+
+    def test_invalidation(self):
+        """
+        Test that changes through assignment and in place invalidate the cached files
+        """
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp.xml")
+        content = str(f)
+
+        f.title = "Changed"
+        self.assertNotEqual(str(f), content)
+        f.structure.translate_sites([1], [0.1, 0.0, 0.0])
+        content = str(f)
+        self.assertIn("0.9750000000", content)
+        f.lapw_parameters["exco"]["xctyp"] = "pw91"
+        self.assertIn('xctyp="pw91"', str(f))
+        self.assertEqual(self.stats.invalidations, 2)
+        self.assertEqual(self.stats.hits, 0)
+
+        f.lapw_parameters = {}
+        self.assertNotIn("&comp", str(f))
+        self.assertEqual(self.stats.invalidations, 3)
+
+    def test_pickle(self):
+        """
+        Test that the rendered files are not pickled
+        """
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp.xml")
+        content = str(f)
+        f_loaded = pickle.loads(pickle.dumps(f))
+        self.assertEqual(f_loaded._render_cache.entries, {})
+        self.assertEqual(str(f_loaded), content)
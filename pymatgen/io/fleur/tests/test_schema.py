@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the schema registry used for parsing inp.xml files
+"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from pymatgen.util.testing import PymatgenTest
+from pymatgen.io.fleur import FleurInput
+from pymatgen.io.fleur.inpxml import load_inpxml
+from pymatgen.io.fleur.schema import SchemaRegistry, get_schema_registry
+
+TEST_FILES_DIR = Path(__file__).absolute().parent / ".." / ".." / ".." / ".." / "test-files"
+
+
+class SchemaRegistryTest(PymatgenTest):
+    """
+    Tests of the SchemaRegistry
+    """
+
+    def test_preload(self):
+        """
+        Test that preloaded versions are not loaded again
+        """
+        registry = SchemaRegistry()
+        self.assertEqual(registry.preload(["0.35", "0.34"]), ["0.34", "0.35"])
+        self.assertEqual(registry.versions, ["0.34", "0.35"])
+
+        schema_dict = registry.get("0.34")
+        self.assertIs(schema_dict, registry.get("0.34"))
+
+        stats = registry.stats()
+        self.assertEqual(stats["loads"], 2)
+        self.assertEqual(stats["lookups"], 4)
+        self.assertGreaterEqual(stats["load_time"], 0.0)
+
+        registry.reset_stats()
+        self.assertEqual(registry.stats()["lookups"], 0)
+        registry.clear()
+        self.assertEqual(registry.versions, [])
+
+    def test_cache_dir(self):
+        """
+        Test that schema dictionaries stored in the cache directory are used by other registries
+        """
+        with TemporaryDirectory() as td:
+            schema_dict = SchemaRegistry(cache_dir=td).get("0.34")
+            entries = list(Path(td).glob("inpschema-0.34-*.pickle"))
+            self.assertEqual(len(entries), 1)
+
+            schema_dict_cached = SchemaRegistry(cache_dir=td).get("0.34")
+            self.assertEqual(schema_dict_cached, schema_dict)
+            xmltree, _ = load_inpxml(TEST_FILES_DIR / "inp.xml")
+            schema_dict_cached.validate(xmltree)
+
+            # Broken entries are replaced
+            entries[0].write_bytes(b"broken")
+            self.assertEqual(SchemaRegistry(cache_dir=td).get("0.34"), schema_dict)
+            self.assertNotEqual(entries[0].read_bytes(), b"broken")
+
+    def test_concurrent_get(self):
+        """
+        Test that concurrent requests for the same version share a single load
+        """
+        registry = SchemaRegistry()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            schema_dicts = list(executor.map(registry.get, ["0.34"] * 32))
+
+        self.assertTrue(all(schema_dict is schema_dicts[0] for schema_dict in schema_dicts))
+        self.assertEqual(registry.loads, 1)
+        self.assertEqual(registry.lookups, 32)
+
+    def test_parsing_uses_registry(self):
+        """
+        Test that parsing inp.xml files takes the schema dictionary from the registry
+        """
+        registry = get_schema_registry()
+        xmltree, schema_dict = load_inpxml(TEST_FILES_DIR / "inp.xml")
+        self.assertIs(schema_dict, registry.get(xmltree.getroot().attrib["fleurInputVersion"]))
+
+        lookups = registry.lookups
+        FleurInput.from_file(TEST_FILES_DIR / "inp.xml")
+        FleurInput.from_file(TEST_FILES_DIR / "inp.xml", streaming=True)
+        self.assertEqual(registry.lookups, lookups + 2)
+
+        with self.assertRaises(ValueError):
+            load_inpxml(b"<fleurInput></fleurInput")
+
+    def test_validation_modes(self):
+        """
+        Test the full, sample and off validation modes
+        """
+        registry = SchemaRegistry(sample_interval=3)
+        content = (TEST_FILES_DIR / "inp.xml").read_bytes()
+        xmltree, _ = load_inpxml(content)
+        schema_dict = registry.get("0.34")
+
+        self.assertFalse(registry.validate(xmltree, schema_dict, mode="off"))
+        self.assertTrue(registry.validate(xmltree, schema_dict, mode="full"))
+        # Only the first occurrence of the content and every third input are validated
+        validated = [registry.validate(xmltree, schema_dict, mode="sample", data=content) for _ in range(6)]
+        self.assertEqual(validated, [True, False, True, False, False, True])
+        self.assertEqual(registry.validations, 4)
+        self.assertEqual(registry.validations_skipped, 3)
+
+        with self.assertRaises(ValueError):
+            registry.validate(xmltree, schema_dict, mode="partial")
+
+    def test_from_string_validate(self):
+        """
+        Test that invalid inp.xml files are only rejected if they are validated
+        """
+        content = (TEST_FILES_DIR / "inp.xml").read_text(encoding="utf-8")
+        invalid = content.replace("<cutoffs ", '<cutoffs foo="1" ', 1)
+
+        f = FleurInput.from_string(invalid, inpgen_input=False)
+        self.assertEqual(f.as_dict(), FleurInput.from_string(content, inpgen_input=False, validate="full").as_dict())
+        with self.assertRaises(ValueError):
+            FleurInput.from_string(invalid, inpgen_input=False, validate="full")
+        with self.assertRaises(ValueError):
+            FleurInput.from_file(TEST_FILES_DIR / "inp.xml", streaming=True, validate="full")
+        with self.assertRaises(ValueError):
+            FleurInput.from_file(TEST_FILES_DIR / "inp.xml", validate="always")
+        self.assertEqual(f.as_dict(), FleurInput.from_file(TEST_FILES_DIR / "inp.xml", validate="sample").as_dict())
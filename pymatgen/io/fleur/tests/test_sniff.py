@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the detection of the format and compression of input files
+"""
+import bz2
+import gzip
+import io
+import lzma
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from pymatgen.util.testing import PymatgenTest
+from pymatgen.io.fleur import FleurInput
+from pymatgen.io.fleur.sniff import decompress, detect_compression, detect_format, open_input, open_stream
+
+TEST_FILES_DIR = Path(__file__).absolute().parent / ".." / ".." / ".." / ".." / "test-files"
+
+
+class SniffTest(PymatgenTest):
+    """
+    Tests of the content based detection of the input format
+    """
+
+    def test_detect(self):
+        """
+        Test the detection from the first bytes
+        """
+        self.assertEqual(detect_format(b'\xef\xbb\xbf\n  <?xml version="1.0"?>'), "xml")
+        self.assertEqual(detect_format(b"<fleurInput fleurInputVersion='0.34'>"), "xml")
+        self.assertEqual(detect_format(b"Si bulk\n&lattice latsys='cP' a0=1.0 /"), "inpgen")
+        self.assertIsNone(detect_format(b" \n"))
+
+        self.assertEqual(detect_compression(gzip.compress(b"content")), "gz")
+        self.assertEqual(detect_compression(bz2.compress(b"content")), "bz2")
+        self.assertEqual(detect_compression(lzma.compress(b"content")), "xz")
+        self.assertIsNone(detect_compression(b"<?xml"))
+
+    def test_misnamed_files(self):
+        """
+        Test that files are read according to their content regardless of their names
+        """
+        compressors = {"": lambda data: data, ".gz": gzip.compress, ".bz2": bz2.compress, ".xz": lzma.compress}
+        with TemporaryDirectory() as td:
+            for name in ("inp.xml", "inp_test"):
+                content = (TEST_FILES_DIR / name).read_bytes()
+                f = FleurInput.from_file(TEST_FILES_DIR / name)
+                for suffix, compress in compressors.items():
+                    # Swapped names and compressed files without the extension
+                    for target in ("inp_test" if name == "inp.xml" else "inp.xml", f"inp{suffix}"):
+                        path = Path(td) / target
+                        path.write_bytes(compress(content))
+
+                        handle, file_format = open_input(path)
+                        with handle:
+                            self.assertEqual(handle.read(), content)
+                        self.assertEqual(file_format, "xml" if name == "inp.xml" else "inpgen")
+
+                        for streaming in (False, True):
+                            f_read = FleurInput.from_file(path, streaming=streaming)
+                            self.assertEqual(f_read.as_dict(), f.as_dict())
+
+    def test_empty_file(self):
+        """
+        Test that the extension decides for empty files
+        """
+        with TemporaryDirectory() as td:
+            for name, expected in (("inp.xml.gz", "xml"), ("inp", "inpgen")):
+                path = Path(td) / name
+                path.write_bytes(b"")
+                handle, file_format = open_input(path)
+                handle.close()
+                self.assertEqual(file_format, expected)
+
+    def test_open_stream(self):
+        """
+        Test decompressing non-seekable streams and in-memory data
+        """
+        content = (TEST_FILES_DIR / "inp.xml").read_bytes()
+        for compress in (lambda data: data, gzip.compress, bz2.compress, lzma.compress):
+            raw = io.BufferedReader(io.BytesIO(compress(content)), buffer_size=7)
+            stream, head = open_stream(raw)
+            self.assertEqual(head, content[:512])
+            self.assertEqual(stream.read(), content)
+            self.assertEqual(decompress(compress(content)), content)
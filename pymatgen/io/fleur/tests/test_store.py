@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the columnar store for FleurInput collections
+"""
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+from pymatgen.util.testing import PymatgenTest
+from pymatgen.io.fleur import FleurInput
+from pymatgen.io.fleur.store import FleurInputStore, FleurInputStoreWriter, write_store
+
+TEST_FILES_DIR = Path(__file__).absolute().parent / ".." / ".." / ".." / ".." / "test-files"
+
+
+class FleurInputStoreTest(PymatgenTest):
+    """
+    Tests of writing and reading FleurInput stores
+    """
+
+    def setUp(self):
+        self.inputs = [FleurInput.from_file(path) for path in sorted(TEST_FILES_DIR.iterdir())]
+
+    def test_roundtrip(self):
+        """
+        Test that all records are read back identically
+        """
+        with TemporaryDirectory() as td:
+            store = write_store(self.inputs, Path(td) / "store")
+
+            self.assertEqual(len(store), len(self.inputs))
+            for f, f_store in zip(self.inputs, store):
+                self.assertEqual(f.as_dict(), f_store.as_dict())
+            self.assertEqual(self.inputs[-1].as_dict(), store[-1].as_dict())
+            with self.assertRaises(IndexError):
+                store.get_arrays(len(self.inputs))
+
+    def test_vectorized_queries(self):
+        """
+        Test the column arrays and vectorized queries over all records
+        """
+        with TemporaryDirectory() as td:
+            store = write_store(self.inputs, Path(td) / "store")
+
+            self.assertArrayAlmostEqual(store.volumes(), [f.structure.volume for f in self.inputs])
+            self.assertEqual(store.nsites.tolist(), [len(f.structure) for f in self.inputs])
+            self.assertEqual(store.element_counts("Pt").tolist(), [f.structure.composition["Pt"] for f in self.inputs])
+            self.assertEqual(store.pbc.tolist(), [list(f.structure.lattice.pbc) for f in self.inputs])
+            self.assertIsInstance(store.frac_coords, np.memmap)
+            self.assertIsInstance(store.pbc, np.memmap)
+            self.assertEqual(store.pbc.dtype, bool)
+
+            arrays = store.get_arrays(1)
+            self.assertArrayAlmostEqual(arrays.frac_coords, self.inputs[1].structure.frac_coords)
+            self.assertEqual(arrays.title, self.inputs[1].title)
+
+    def test_writer(self):
+        """
+        Test that incomplete or existing stores are handled
+        """
+        with TemporaryDirectory() as td:
+            writer = FleurInputStoreWriter(Path(td) / "store")
+            self.assertEqual(writer.append(self.inputs[0]), 0)
+            with self.assertRaises(FileNotFoundError):
+                FleurInputStore(Path(td) / "store")
+            writer.close()
+            self.assertEqual(len(FleurInputStore(Path(td) / "store")), 1)
+
+            with self.assertRaises(FileExistsError):
+                write_store(self.inputs, Path(td) / "store")
+            store = write_store(self.inputs[1:], Path(td) / "store", overwrite=True)
+            self.assertEqual(len(store), len(self.inputs) - 1)
+
+            store = write_store([], Path(td) / "empty")
+            self.assertEqual(len(store), 0)
+            self.assertEqual(store.volumes().tolist(), [])
+
+    def test_writer_exception(self):
+        """
+        Test that a store is not finalized if writing it fails
+        """
+        with TemporaryDirectory() as td:
+            with self.assertRaises(RuntimeError):
+                with FleurInputStoreWriter(Path(td) / "store") as writer:
+                    writer.append(self.inputs[0])
+                    raise RuntimeError("Failed to write")
+
+            self.assertFalse((Path(td) / "store" / "metadata.json").exists())
+            with self.assertRaises(FileNotFoundError):
+                FleurInputStore(Path(td) / "store")
+            self.assertEqual(len(write_store(self.inputs, Path(td) / "store")), len(self.inputs))
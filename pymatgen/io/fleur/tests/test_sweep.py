@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the generation of inpgen inputs for parameter sweeps
+"""
+import copy
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from pymatgen.util.testing import PymatgenTest
+from pymatgen.io.fleur import FleurInput
+from pymatgen.io.fleur.sweep import expand_param_grid
+
+TEST_FILES_DIR = Path(__file__).absolute().parent / ".." / ".." / ".." / ".." / "test-files"
+
+
+class InpgenSweepTest(PymatgenTest):
+    """
+    Tests of the inpgen variants generated from parameter grids
+    """
+
+    def test_expand_param_grid(self):
+        """
+        Test the expansion of parameter grids into their points
+        """
+        points = expand_param_grid({"kpt.div1": [2, 4], "comp.kmax": [3.5, 4.0, 4.5]})
+        self.assertEqual(len(points), 6)
+        self.assertEqual(points[1], {"kpt.div1": 2, "comp.kmax": 4.0})
+
+        points = expand_param_grid([{"title": ["a"]}, {"kpt": [{"div1": 2}, {"div1": 4}]}])
+        self.assertEqual(points, [{"title": "a"}, {"kpt": {"div1": 2}}, {"kpt": {"div1": 4}}])
+
+        with self.assertRaises(TypeError):
+            expand_param_grid({"comp.kmax": 4.0})
+
+    def test_generate_inpgen_variants(self):
+        """
+        Test that the variants are identical to the files written with get_inpgen_file_content
+        """
+        for name in ("inp.xml", "inp_film.xml", "inp_test"):
+            f = FleurInput.from_file(TEST_FILES_DIR / name)
+            param_grid = {"comp.kmax": [3.5, 4.0], "kpt.div1": [2, 4], "title": ["sweep"]}
+
+            variants = list(f.generate_inpgen_variants(param_grid, significant_figures_positions=6))
+            self.assertEqual(len(variants), 4)
+            for values, content in variants:
+                parameters = {
+                    "comp": {**f.lapw_parameters.get("comp", {}), "kmax": values["comp.kmax"]},
+                    "kpt": {**f.lapw_parameters.get("kpt", {}), "div1": values["kpt.div1"]},
+                    "title": "sweep",
+                }
+                self.assertEqual(
+                    content, f.get_inpgen_file_content(parameters=parameters, significant_figures_positions=6)
+                )
+
+        _, content = next(f.generate_inpgen_variants({"kpt.div1": [2]}, ignore_set_parameters=True))
+        self.assertEqual(
+            content, f.get_inpgen_file_content(parameters={"kpt": {"div1": 2}}, ignore_set_parameters=True)
+        )
+
+        with self.assertRaises(ValueError):
+            next(f.generate_inpgen_variants({"kpt.div1": [2]}, significant_figures_magnetic_moments=4))
+
+    def test_parameters_unchanged(self):
+        """
+        Test that the parameters of the input and the grid are not modified by the sweep
+        """
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp_film.xml")
+        f.lapw_parameters["input"] = {"symor": True}
+        parameters = copy.deepcopy(f.lapw_parameters)
+        param_grid = {"comp.kmax": [3.5, 4.0], "input": [{"symor": False}]}
+        grid = copy.deepcopy(param_grid)
+
+        list(f.generate_inpgen_variants({"comp.kmax": [3.5, 4.0]}))
+        list(f.generate_inpgen_variants(param_grid))
+
+        self.assertEqual(f.lapw_parameters, parameters)
+        self.assertEqual(param_grid, grid)
+
+    def test_write_inpgen_variants(self):
+        """
+        Test writing the variants into a directory tree sequentially and in parallel
+        """
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp.xml")
+        param_grid = {"comp.kmax": [3.0, 3.5, 4.0, 4.5, 5.0], "kpt.div1": [2, 4]}
+
+        with TemporaryDirectory() as td:
+            paths = f.write_inpgen_variants(param_grid, Path(td) / "sequential")
+            paths_parallel = f.write_inpgen_variants(param_grid, Path(td) / "parallel", filename="inp_gen", workers=3)
+
+            self.assertEqual(len(paths), 10)
+            self.assertEqual(paths[3], Path(td) / "sequential" / "3" / "inp")
+            self.assertEqual(paths_parallel[9], Path(td) / "parallel" / "9" / "inp_gen")
+            for path, path_parallel in zip(paths, paths_parallel):
+                self.assertEqual(path.read_text(), path_parallel.read_text())
+
+            manifest = json.loads((Path(td) / "parallel" / "variants.json").read_text())
+            self.assertEqual(manifest[9], {"path": "9/inp_gen", "parameters": {"comp.kmax": 5.0, "kpt.div1": 4}})
+
+            f_read = FleurInput.from_file(paths[9])
+            self.assertAlmostEqual(f_read.lapw_parameters["comp"]["kmax"], 5.0)
+            self.assertEqual(f_read.lapw_parameters["kpt"]["div1"], 4)
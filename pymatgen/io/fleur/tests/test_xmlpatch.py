@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of patching existing inp.xml files
+"""
+import difflib
+import gzip
+import shutil
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from pymatgen.util.testing import PymatgenTest
+from pymatgen.io.fleur import FleurInput
+
+TEST_FILES_DIR = Path(__file__).absolute().parent / ".." / ".." / ".." / ".." / "test-files"
+
+
+class InpxmlPatchTest(PymatgenTest):
+    """
+    Tests of the minimal edits of inp.xml files
+    """
+
+    def test_unchanged(self):
+        """
+        Test that patching a file with its own content does not change it
+        """
+        for name in ("inp.xml", "inp_film.xml"):
+            f = FleurInput.from_file(TEST_FILES_DIR / name)
+            with TemporaryDirectory() as td:
+                self.assertEqual(f.patch_inpxml(TEST_FILES_DIR / name, output=Path(td) / "inp.xml"), [])
+                self.assertEqual((Path(td) / "inp.xml").read_bytes(), (TEST_FILES_DIR / name).read_bytes())
+
+    def test_minimal_edits(self):
+        """
+        Test that only the changed values are replaced
+        """
+        for name in ("inp.xml", "inp_film.xml"):
+            f = FleurInput.from_file(TEST_FILES_DIR / name)
+            f.structure.translate_sites([0], [0.0, 0.0, 0.01], to_unit_cell=False)
+            f.lapw_parameters["comp"]["kmax"] = 4.0
+            f.lapw_parameters["atom0"]["rmt"] = 2.0
+
+            with TemporaryDirectory() as td:
+                changes = f.patch_inpxml(TEST_FILES_DIR / name, output=Path(td) / "inp.xml")
+                content = (Path(td) / "inp.xml").read_text(encoding="utf-8")
+                f_patched = FleurInput.from_file(Path(td) / "inp.xml", validate="full")
+
+            self.assertEqual(len(changes), 3)
+            self.assertIn("cutoffs@Kmax", changes)
+            self.assertIn("species[0]/mtSphere@radius", changes)
+
+            original = (TEST_FILES_DIR / name).read_text(encoding="utf-8").splitlines()
+            diff = [
+                line
+                for line in difflib.unified_diff(original, content.splitlines(), lineterm="", n=0)
+                if line.startswith("+") and not line.startswith("+++")
+            ]
+            self.assertEqual(len(diff), 3)
+
+            self.assertEqual(f_patched.lapw_parameters, f.lapw_parameters)
+            self.assertArrayAlmostEqual(f_patched.structure.frac_coords, f.structure.frac_coords)
+
+    def test_gzip_in_place(self):
+        """
+        Test patching a compressed file in place
+        """
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp.xml")
+        f.title = "patched"
+        f.structure = f.structure.copy()
+        f.structure.scale_lattice(f.structure.volume * 1.1)
+
+        with TemporaryDirectory() as td:
+            path = Path(td) / "inp.xml.gz"
+            with open(TEST_FILES_DIR / "inp.xml", "rb") as src, gzip.open(path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+
+            changes = f.patch_inpxml(path)
+            self.assertEqual(changes, ["comment", "bravaisMatrix/row-1", "bravaisMatrix/row-2", "bravaisMatrix/row-3"])
+            f_patched = FleurInput.from_file(path)
+
+        self.assertEqual(f_patched.title, "patched")
+        self.assertAlmostEqual(f_patched.structure.volume, f.structure.volume)
+
+    def test_escaped_values(self):
+        """
+        Test that titles and string attributes with XML special characters are escaped
+        and compared with the unescaped text of the file
+        """
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp.xml")
+        f.title = "Si <bulk> & test"
+        f.lapw_parameters["exco"]["xctyp"] = "pbe \"&'"
+
+        with TemporaryDirectory() as td:
+            path = Path(td) / "inp.xml"
+            shutil.copy(TEST_FILES_DIR / "inp.xml", path)
+
+            self.assertEqual(f.patch_inpxml(path), ["comment", "xcFunctional@name"])
+            self.assertIn("Si &lt;bulk&gt; &amp; test", path.read_text(encoding="utf-8"))
+            f_patched = FleurInput.from_file(path)
+            self.assertEqual(f.patch_inpxml(path), [])
+
+        self.assertEqual(f_patched.title, "Si <bulk> & test")
+        self.assertEqual(f_patched.lapw_parameters["exco"]["xctyp"], "pbe \"&'")
+
+    def test_parameters_unchanged(self):
+        """
+        Test that the parameters passed in are not modified
+        """
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp.xml")
+        parameters = {"comp": {"kmax": 4.0}}
+
+        with TemporaryDirectory() as td:
+            path = Path(td) / "inp.xml"
+            shutil.copy(TEST_FILES_DIR / "inp.xml", path)
+
+            for ignore_set_parameters in (False, True):
+                f.patch_inpxml(path, parameters=parameters, ignore_set_parameters=ignore_set_parameters)
+                self.assertEqual(parameters, {"comp": {"kmax": 4.0}})
+
+    def test_mismatched_structure(self):
+        """
+        Test that structures not corresponding to the atom positions are rejected
+        """
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp.xml")
+        with TemporaryDirectory() as td:
+            with self.assertRaises(ValueError):
+                FleurInput(f.structure * (2, 1, 1)).patch_inpxml(
+                    TEST_FILES_DIR / "inp.xml", output=Path(td) / "inp.xml"
+                )
+
+            f.structure.replace_species({"Si": "Ge"})
+            with self.assertRaises(ValueError):
+                f.patch_inpxml(TEST_FILES_DIR / "inp.xml", output=Path(td) / "inp.xml")
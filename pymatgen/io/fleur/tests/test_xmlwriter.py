@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of writing inp.xml files from templates
+"""
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+from lxml import etree
+
+from pymatgen.core.structure import Structure
+from pymatgen.util.testing import PymatgenTest
+from pymatgen.io.fleur import FleurInput
+from pymatgen.io.fleur.xmlwriter import fill_inpxml_template
+
+TEST_FILES_DIR = Path(__file__).absolute().parent / ".." / ".." / ".." / ".." / "test-files"
+
+
+class InpxmlWriterTest(PymatgenTest):
+    """
+    Tests of the inp.xml files filled from templates
+    """
+
+    def test_roundtrip(self):
+        """
+        Test that writing the inputs into their own inp.xml as template gives the same input back
+        """
+        for name in ("inp.xml", "inp_film.xml"):
+            f = FleurInput.from_file(TEST_FILES_DIR / name)
+            with TemporaryDirectory() as td:
+                f.write_file(Path(td) / "inp.xml.gz", template=TEST_FILES_DIR / name)
+                f_written = FleurInput.from_file(Path(td) / "inp.xml.gz", validate="full")
+
+            self.assertArrayAlmostEqual(f.structure.lattice.matrix, f_written.structure.lattice.matrix)
+            self.assertArrayAlmostEqual(f.structure.frac_coords, f_written.structure.frac_coords)
+            self.assertEqual(f.structure.lattice.pbc, f_written.structure.lattice.pbc)
+            self.assertEqual(f.title, f_written.title)
+            self.assertEqual(f.lapw_parameters, f_written.lapw_parameters)
+
+    def test_modified_input(self):
+        """
+        Test that a changed structure and parameters end up in the inp.xml
+        """
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp.xml")
+        structure = f.structure * (2, 1, 1)
+        structure.translate_sites([0], [0.01, 0.0, 0.0])
+        f_mod = FleurInput(
+            structure,
+            title="displaced",
+            lapw_parameters={**f.lapw_parameters, "comp": {**f.lapw_parameters["comp"], "kmax": 4.2}},
+        )
+
+        xmltree, _ = fill_inpxml_template(
+            f_mod, TEST_FILES_DIR / "inp.xml", parameters={"kpt": {"div1": 4, "div2": 4, "div3": 4}}
+        )
+        root = xmltree.getroot()
+        # The displaced site is no longer equivalent to the other ones
+        groups = root.findall("atomGroups/atomGroup")
+        self.assertGreater(len(groups), 1)
+        self.assertEqual(sum(len(group.findall("relPos")) for group in groups), 4)
+        self.assertEqual(len(groups[0].findall("relPos")), 1)
+        self.assertLess(len(root.findall("cell/symmetryOperations/symOp")), 48)
+        self.assertEqual(root.find("cell/bzIntegration/kPointListSelection").get("listName"), "default-2")
+
+        with TemporaryDirectory() as td:
+            f_mod.write_file(Path(td) / "inp.xml", template=TEST_FILES_DIR / "inp.xml")
+            f_written = FleurInput.from_file(Path(td) / "inp.xml", validate="full")
+
+        self.assertEqual(f_written.title, "displaced")
+        self.assertEqual(f_written.lapw_parameters["comp"]["kmax"], 4.2)
+        # The sites are ordered by their atom groups
+        self.assertEqual(len(f_written.structure), 4)
+        self.assertTrue(f_written.structure.matches(structure))
+
+    def test_errors(self):
+        """
+        Test the errors for inputs not fitting the template
+        """
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp.xml")
+        with TemporaryDirectory() as td:
+            with self.assertRaises(ValueError):
+                f.write_file(Path(td) / "inp.xml")
+
+            # No species for iron in the template
+            structure = Structure(f.structure.lattice, ["Fe", "Si"], f.structure.frac_coords)
+            with self.assertRaises(ValueError):
+                FleurInput(structure).write_file(Path(td) / "inp.xml", template=TEST_FILES_DIR / "inp.xml")
+
+            # Bulk structure with a film template
+            with self.assertRaises(ValueError):
+                f.write_file(Path(td) / "inp.xml", template=TEST_FILES_DIR / "inp_film.xml")
+
+    def test_template_tree(self):
+        """
+        Test that a parsed template can be reused without being modified
+        """
+        f = FleurInput.from_file(TEST_FILES_DIR / "inp.xml")
+        template = etree.parse(str(TEST_FILES_DIR / "inp.xml"))
+        content = etree.tostring(template)
+
+        xmltree, _ = fill_inpxml_template(f, template, use_symmetry=False)
+        self.assertEqual(etree.tostring(template), content)
+        self.assertEqual(len(xmltree.getroot().findall("cell/symmetryOperations/symOp")), 1)
+        self.assertEqual(len(xmltree.getroot().findall("atomGroups/atomGroup")), 2)
+        self.assertTrue(np.isclose(float(xmltree.getroot().find("cell/bzIntegration").get("valenceElectrons")), 24))
+
+    def test_equivalence_classes(self):
+        """
+        Test the grouping of the sites of a supercell with a substitution into atom groups
+        """
+        from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
+        from pymatgen.io.fleur.xmlwriter import _equivalence_classes, _symmetry_operations
+
+        structure = FleurInput.from_file(TEST_FILES_DIR / "inp.xml").structure * (3, 3, 3)
+        structure.replace(0, "Ge")
+        rotations, translations = _symmetry_operations(structure, False, 1e-5, True)
+
+        classes = _equivalence_classes(structure, rotations, translations)
+        expected = SpacegroupAnalyzer(structure, symprec=1e-5).get_symmetrized_structure().equivalent_indices
+        self.assertEqual(sorted(map(sorted, classes)), sorted(map(sorted, expected)))
+        self.assertEqual([sites[0] for sites in classes], sorted(sites[0] for sites in classes))
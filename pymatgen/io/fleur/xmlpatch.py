@@ -0,0 +1,453 @@
+# -*- coding: utf-8 -*-
+# Copyright (c)
+# Distributed under the terms of the MIT License
+"""
+This module provides functionality for updating an existing, fully configured
+inp.xml file with the structure and LAPW parameters of a :py:class:`~pymatgen.io.fleur.FleurInput`.
+
+Instead of building and serializing a XML tree, the text of the file is edited
+directly. Only values which differ from the ones in the file are replaced, all other
+content (including formatting, comments and settings unknown to the
+:py:class:`~pymatgen.io.fleur.FleurInput`) is kept byte-for-byte. The following values are updated
+
+* the title (``comment``)
+* the lattice vectors (and ``dTilda`` for films)
+* the atom positions (``relPos``, ``absPos`` or ``filmPos``, keeping their kind)
+* the attributes with a counterpart in the ``comp``, ``exco`` and ``atom`` namelists
+  (see ``ATTRIBUTE_CHANGES`` and ``SPECIES_CHANGES``)
+
+The sites of the structure have to correspond to the atom positions in the file
+(same number, order and elements), i.e. the atom groups and symmetry operations are
+not changed. For changes of the composition or symmetry use
+:py:func:`~pymatgen.io.fleur.xmlwriter.write_inpxml` with the file as template
+
+.. code-block:: python
+
+    fleur_inp.structure.perturb(0.01)
+    changed = fleur_inp.patch_inpxml('inp.xml')
+
+"""
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape, unescape
+
+import numpy as np
+from monty.io import zopen
+
+from pymatgen.util.typing import PathLike
+
+__all__ = ("InpxmlPatcher", "patch_inpxml")
+
+#: Entities of quotes in attribute values (in addition to ``&amp;``, ``&lt;`` and ``&gt;``)
+_QUOTE_ENTITIES = {'"': "&quot;", "'": "&apos;"}
+
+#: Mapping of the parameters of the ``comp`` and ``exco`` namelists to
+#: the tag, attribute and type of the value in the inp.xml
+ATTRIBUTE_CHANGES = {
+    ("comp", "kmax"): ("cutoffs", "Kmax", float),
+    ("comp", "gmax"): ("cutoffs", "Gmax", float),
+    ("comp", "gmaxxc"): ("cutoffs", "GmaxXC", float),
+    ("comp", "jspins"): ("magnetism", "jspins", int),
+    ("comp", "ctail"): ("coreElectrons", "ctail", bool),
+    ("comp", "frcor"): ("coreElectrons", "frcor", bool),
+    ("comp", "kcrel"): ("coreElectrons", "kcrel", int),
+    ("exco", "xctyp"): ("xcFunctional", "name", str),
+}
+
+#: Mapping of the parameters of the ``atom`` namelists to
+#: the tag, attribute and type of the value in the species
+SPECIES_CHANGES = {
+    "rmt": ("mtSphere", "radius", float),
+    "jri": ("mtSphere", "gridPoints", int),
+    "dx": ("mtSphere", "logIncrement", float),
+    "lmax": ("atomicCutoffs", "lmax", int),
+    "lnonsph": ("atomicCutoffs", "lnonsphr", int),
+}
+
+#: Absolute tolerance below which numbers are considered unchanged
+TOLERANCE = 1e-8
+
+_POSITION_TAGS = ("relPos", "absPos", "filmPos")
+_COMMENT_RE = re.compile(r"<!--.*?-->|<!\[CDATA\[.*?\]\]>", re.DOTALL)
+
+Span = Tuple[int, int]
+
+
+class InpxmlPatcher:
+    """
+    Minimal text edits of the content of a inp.xml file
+
+    Elements are located with regular expressions on a copy of the text, in which comments
+    and CDATA sections are blanked out, so that the offsets of both agree. The edits are
+    collected and applied at once by :py:meth:`apply`
+
+    .. attribute:: text
+
+        Original content of the file.
+
+    .. attribute:: masked
+
+        Content of the file with blanked out comments, which is searched for elements.
+
+    .. attribute:: changes
+
+        Descriptions of the values that were changed.
+
+    """
+
+    def __init__(self, text: str):
+        """
+        Args:
+            text (str): content of the inp.xml file
+        """
+        self.text = text
+        self.masked = _COMMENT_RE.sub(lambda match: " " * len(match.group()), text)
+        self._edits: List[Tuple[int, int, str]] = []
+        self.changes: List[str] = []
+
+    def find(self, tag: str, start: int = 0, end: Optional[int] = None) -> Optional[Tuple[Span, Span]]:
+        """
+        Find the first element with the given tag in the range
+
+        returns: spans of the opening tag and the content of the element (empty for self-closing tags)
+                 or None if there is no such element
+        """
+        return next(self.iter(tag, start, end), None)
+
+    def iter(self, tag: str, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[Span, Span]]:
+        """
+        Iterate over the (not nested) elements with the given tag in the range
+
+        returns: generator of the spans of the opening tags and the contents of the elements
+        """
+        if end is None:
+            end = len(self.masked)
+        pattern = re.compile(rf"<{tag}(?=[\s/>])[^>]*?(/?)>")
+        pos = start
+        while True:
+            match = pattern.search(self.masked, pos, end)
+            if match is None:
+                return
+            if match.group(1):
+                content = (match.end(), match.end())
+            else:
+                close = self.masked.find(f"</{tag}>", match.end(), end)
+                if close == -1:
+                    raise ValueError(f"Unterminated element {tag} in inp.xml")
+                content = (match.end(), close)
+            yield match.span(), content
+            pos = content[1]
+
+    def attribute(self, opening: Span, name: str) -> Optional[Tuple[Span, str]]:
+        """
+        Find an attribute in the opening tag of an element
+
+        returns: span and text of the attribute value or None if the attribute is not set
+        """
+        match = re.compile(rf"\s{name}\s*=\s*([\"'])(.*?)\1").search(self.masked, *opening)
+        if match is None:
+            return None
+        return match.span(2), self.text[match.start(2) : match.end(2)]
+
+    def replace(self, span: Span, text: str, change: str) -> None:
+        """
+        Replace the text in the span
+        """
+        self._edits.append((span[0], span[1], text))
+        self.changes.append(change)
+
+    def set_attribute(self, opening: Span, name: str, value: Any, kind: type, change: str) -> None:
+        """
+        Set an attribute of an element if its value differs
+        """
+        current = self.attribute(opening, name)
+        if current is not None:
+            span, text = current
+            if _same_value(text, value, kind):
+                return
+            self.replace(span, _format_value(value, kind), change)
+        else:
+            # Inserted before the end of the opening tag
+            end = opening[1] - (2 if self.masked[opening[1] - 2] == "/" else 1)
+            self.replace((end, end), f' {name}="{_format_value(value, kind)}"', change)
+
+    def set_numbers(self, content: Span, values: np.ndarray, change: str) -> None:
+        """
+        Set the text of an element containing a list of numbers if any of them differs
+        """
+        text = self.text[content[0] : content[1]]
+        current = _parse_numbers(text)
+        if (
+            current is not None
+            and current.shape == values.shape
+            and np.allclose(current, values, rtol=0, atol=TOLERANCE)
+        ):
+            return
+        self.replace_numbers(content, values, change)
+
+    def replace_numbers(self, content: Span, values: np.ndarray, change: str) -> None:
+        """
+        Replace the text of an element with a list of numbers, keeping the surrounding whitespace
+        """
+        text = self.text[content[0] : content[1]]
+        leading = text[: len(text) - len(text.lstrip())]
+        trailing = text[len(text.rstrip()) :]
+        self.replace(content, leading + " ".join(f"{val:.10f}" for val in values) + trailing, change)
+
+    def apply(self) -> str:
+        """
+        Return the content with all edits applied
+        """
+        parts = []
+        pos = 0
+        for start, end, text in sorted(self._edits, key=lambda edit: edit[:2]):
+            parts.append(self.text[pos:start])
+            parts.append(text)
+            pos = end
+        parts.append(self.text[pos:])
+        return "".join(parts)
+
+
+def _parse_numbers(text: str) -> Optional[np.ndarray]:
+    """
+    Parse a whitespace separated list of numbers, which can be fractions like ``1.0/3.0``
+    """
+    values = []
+    for token in text.split():
+        numerator, _, denominator = token.partition("/")
+        try:
+            value = float(numerator)
+            if denominator:
+                value /= float(denominator)
+        except (ValueError, ZeroDivisionError):
+            return None
+        values.append(value)
+    return np.array(values)
+
+
+def _same_value(text: str, value: Any, kind: type) -> bool:
+    """
+    Compare the text of an attribute with a value
+    """
+    if kind is bool:
+        return text.strip().lower() in ("t", "true") if value else text.strip().lower() in ("f", "false")
+    if kind is str:
+        return unescape(text, {val: key for key, val in _QUOTE_ENTITIES.items()}).strip() == str(value)
+    try:
+        return abs(float(text) - float(value)) <= TOLERANCE
+    except ValueError:
+        return False
+
+
+def _format_value(value: Any, kind: type) -> str:
+    """
+    Format a value for an attribute
+    """
+    if kind is bool:
+        return "T" if value else "F"
+    if kind is float:
+        return f"{float(value):.10f}"
+    if kind is int:
+        return str(int(value))
+    return escape(str(value), _QUOTE_ENTITIES)
+
+
+def _patch_title(patcher: InpxmlPatcher, title: str) -> None:
+    element = patcher.find("comment")
+    if element is None or not title:
+        return
+    content = element[1]
+    text = patcher.text[content[0] : content[1]]
+    # Compared like the title is extracted by get_parameterdata
+    if unescape(text).replace("\n", "").strip() == title.strip():
+        return
+    leading = text[: len(text) - len(text.lstrip())]
+    trailing = text[len(text.rstrip()) :]
+    patcher.replace(content, leading + escape(title.strip()) + trailing, "comment")
+
+
+def _patch_cell(patcher: InpxmlPatcher, structure: Any) -> None:
+    from masci_tools.util.constants import BOHR_A
+
+    film = not structure.lattice.pbc[2]
+    lattice = patcher.find("filmLattice" if film else "bulkLattice")
+    if lattice is None:
+        raise ValueError(f"The inp.xml has no {'filmLattice' if film else 'bulkLattice'} for the structure")
+    opening, content = lattice
+    scale_attr = patcher.attribute(opening, "scale")
+    scale = float(scale_attr[1]) if scale_attr is not None else 1.0
+    cell = structure.lattice.matrix / BOHR_A / scale
+
+    matrix = patcher.find("bravaisMatrixFilm", *content) if film else None
+    if matrix is not None:
+        if not np.allclose(cell[:2, 2], 0) or not np.allclose(cell[2, :2], 0):
+            raise ValueError(
+                "For films the first two lattice vectors have to lie in the xy-plane and the third along z"
+            )
+        rows = cell[:2, :2]
+        patcher.set_attribute(opening, "dTilda", abs(cell[2, 2]), float, "filmLattice@dTilda")
+        tag = "bravaisMatrixFilm"
+    else:
+        matrix = patcher.find("bravaisMatrix", *content)
+        if matrix is None:
+            raise ValueError("Only inp.xml files with an explicit Bravais matrix can be patched")
+        rows = cell
+        tag = "bravaisMatrix"
+
+    for i, row in enumerate(rows):
+        element = patcher.find(f"row-{i+1}", *matrix[1])
+        patcher.set_numbers(element[1], row, f"{tag}/row-{i+1}")
+
+
+def _patch_positions(patcher: InpxmlPatcher, structure: Any, species: Dict[str, str]) -> None:
+    from masci_tools.util.constants import BOHR_A
+
+    groups = patcher.find("atomGroups")
+    if groups is None:
+        raise ValueError("The inp.xml has no atomGroups")
+
+    # Collect all atom positions first, so that they can be compared with the structure at once
+    pattern = re.compile(rf"<({'|'.join(_POSITION_TAGS)})(?=[\s/>])[^>]*>")
+    positions = []
+    for group_index, (opening, content) in enumerate(patcher.iter("atomGroup", *groups[1])):
+        species_attr = patcher.attribute(opening, "species")
+        element = species.get(species_attr[1]) if species_attr is not None else None
+        for match in pattern.finditer(patcher.masked, *content):
+            tag = match.group(1)
+            close = patcher.masked.find(f"</{tag}>", match.end(), content[1])
+            positions.append((group_index, tag, element, (match.end(), close)))
+
+    if len(positions) != len(structure):
+        raise ValueError(f"The structure has {len(structure)} sites, but the inp.xml {len(positions)} atom positions")
+    for index, (specie, (_, _, element, _)) in enumerate(zip(structure.species, positions)):
+        if element is not None and specie.symbol != element:
+            raise ValueError(
+                f"Site {index} of the structure is {specie.symbol}, but the atom position in the inp.xml is {element}"
+            )
+
+    tags = np.array([tag for _, tag, _, _ in positions])
+    cart_coords = structure.cart_coords / BOHR_A
+    values = np.array(structure.frac_coords)
+    values[tags == "absPos"] = cart_coords[tags == "absPos"]
+    values[tags == "filmPos", 2] = cart_coords[tags == "filmPos", 2]
+
+    texts = [patcher.text[start:end] for _, _, _, (start, end) in positions]
+    current = _parse_position_block(texts)
+    if current is None:
+        changed = np.ones(len(positions), dtype=bool)
+    else:
+        changed = ~np.isclose(current, values, rtol=0, atol=TOLERANCE).all(axis=1)
+
+    for index in np.flatnonzero(changed):
+        group_index, tag, _, content = positions[index]
+        patcher.replace_numbers(content, values[index], f"atomGroup[{group_index}]/{tag}[{index}]")
+
+
+def _parse_position_block(texts: List[str]) -> Optional[np.ndarray]:
+    """
+    Parse the texts of all atom positions into a Nx3 array (None if any cannot be parsed)
+    """
+    if not texts:
+        return np.empty((0, 3))
+    joined = " ".join(texts)
+    if "/" not in joined:
+        try:
+            values = np.array(joined.split(), dtype=float)
+        except ValueError:
+            return None
+        return values.reshape(-1, 3) if values.size == 3 * len(texts) else None
+
+    rows = [_parse_numbers(text) for text in texts]
+    if any(row is None or row.shape != (3,) for row in rows):
+        return None
+    return np.array(rows)
+
+
+def _patch_parameters(patcher: InpxmlPatcher, parameters: dict) -> None:
+    for (namelist, key), (tag, attribute, kind) in ATTRIBUTE_CHANGES.items():
+        value = parameters.get(namelist, {}).get(key)
+        if value is None:
+            continue
+        element = patcher.find(tag)
+        if element is None:
+            raise ValueError(f"The inp.xml has no {tag} for the parameter {namelist}.{key}")
+        patcher.set_attribute(element[0], attribute, value, kind, f"{tag}@{attribute}")
+
+    species_elements = list(patcher.iter("species"))
+    for namelist, values in parameters.items():
+        match = re.fullmatch(r"atom(\d+)", namelist)
+        if match is None or not isinstance(values, dict):
+            continue
+        # The atom namelists are numbered in the order of the species (like in get_parameterdata)
+        index = int(match.group(1))
+        if index >= len(species_elements):
+            raise ValueError(f"The inp.xml has no species for the namelist {namelist}")
+        opening, content = species_elements[index]
+        element_attr = patcher.attribute(opening, "element")
+        if "element" in values and element_attr is not None and element_attr[1] != values["element"]:
+            raise ValueError(
+                f"The namelist {namelist} is for {values['element']}, but species {index} is {element_attr[1]}"
+            )
+
+        for key, (tag, attribute, kind) in SPECIES_CHANGES.items():
+            if key not in values:
+                continue
+            element = patcher.find(tag, *content)
+            if element is None:
+                raise ValueError(f"Species {index} of the inp.xml has no {tag}")
+            patcher.set_attribute(element[0], attribute, values[key], kind, f"species[{index}]/{tag}@{attribute}")
+
+
+def patch_inpxml(
+    fleur_input: Any,
+    filename: PathLike,
+    output: Optional[PathLike] = None,
+    parameters: Optional[dict] = None,
+    ignore_set_parameters: bool = False,
+) -> List[str]:
+    """
+    Update an existing inp.xml file with the structure, title and LAPW parameters
+    of a :py:class:`~pymatgen.io.fleur.FleurInput` by minimal edits of its text
+
+    Args:
+        fleur_input (FleurInput): input to write
+        filename (PathLike): inp.xml file to update (can be compressed)
+        output (PathLike): file to write the result to. Defaults to ``filename``, which is only
+                           written if anything changed
+        parameters (dict): Additional LAPW parameters to use
+        ignore_set_parameters (bool): if True only the passed parameters are used and the
+                                      ``lapw_parameters`` stored on the input are ignored
+
+    Raises:
+        ValueError: if the structure does not correspond to the atom positions in the file
+
+    returns: list of the descriptions of the changed values
+    """
+    # The dict of the caller is not modified
+    parameters = dict(parameters or {})
+    if not ignore_set_parameters:
+        parameters = {**fleur_input.lapw_parameters, **parameters}
+    parameters.setdefault("title", fleur_input.title)
+
+    with zopen(filename, "rb") as f:
+        text = f.read().decode("utf-8", errors="surrogateescape")
+
+    patcher = InpxmlPatcher(text)
+    species = {}
+    for opening, _ in patcher.iter("species"):
+        name, element = patcher.attribute(opening, "name"), patcher.attribute(opening, "element")
+        if name is not None and element is not None:
+            species[name[1]] = element[1]
+
+    _patch_title(patcher, parameters["title"])
+    _patch_cell(patcher, fleur_input.structure)
+    _patch_positions(patcher, fleur_input.structure, species)
+    _patch_parameters(patcher, parameters)
+
+    if output is None:
+        if not patcher.changes:
+            return []
+        output = filename
+    with zopen(output, "wb") as f:
+        f.write(patcher.apply().encode("utf-8", errors="surrogateescape"))
+    return patcher.changes
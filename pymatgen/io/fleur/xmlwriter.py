@@ -0,0 +1,437 @@
+# -*- coding: utf-8 -*-
+# Copyright (c)
+# Distributed under the terms of the MIT License
+"""
+This module provides functionality for writing fleur inp.xml files directly
+from a :py:class:`~pymatgen.io.fleur.FleurInput` without running inpgen.
+
+The inp.xml is produced by filling a template inp.xml (e.g. one generated by inpgen
+for a similar system), which provides everything not contained in the
+:py:class:`~pymatgen.io.fleur.FleurInput` (species setups, mixing, output settings, ...).
+The following parts of the template are replaced
+
+* the title (``comment``), lattice and number of valence electrons
+* the symmetry operations, which are determined with spglib
+  (for films only operations keeping the film plane are used)
+* the atom groups, which are the sets of sites equivalent under these operations
+* the k-point list if the ``kpt`` namelist has ``div1``, ``div2`` and ``div3``. Like inpgen
+  a Monkhorst-Pack mesh is generated, which is gamma-centered if ``gamma`` is True
+* the values of the LAPW parameters that have a counterpart in the inp.xml
+  (``comp``, ``exco`` and the muffin-tin settings of the ``atom`` namelists)
+
+Every element of the structure needs a species in the template, since
+the species setups cannot be generated without inpgen
+
+.. code-block:: python
+
+    fleur_inp.write_file('inp.xml', template='template/inp.xml')
+
+"""
+import copy
+import re
+from typing import IO, Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from lxml import etree
+from monty.io import zopen
+
+from pymatgen.util.typing import PathLike
+
+from pymatgen.io.fleur.profiling import count, stage
+
+__all__ = ("fill_inpxml_template", "write_inpxml")
+
+#: Mapping of the parameters of the inpgen ``comp`` namelist to the names used by
+#: :py:func:`~masci_tools.util.xml.xml_setters_names.set_inpchanges()`
+COMP_CHANGES = {
+    "kmax": "kmax",
+    "gmax": "gmax",
+    "gmaxxc": "gmaxxc",
+    "jspins": "jspins",
+    "ctail": "ctail",
+    "frcor": "frcor",
+    "kcrel": "kcrel",
+}
+
+#: Mapping of the parameters of the inpgen ``atom`` namelists to the attributes of the species
+ATOM_CHANGES = {
+    "rmt": ("mtSphere", "radius"),
+    "jri": ("mtSphere", "gridPoints"),
+    "dx": ("mtSphere", "logIncrement"),
+    "lmax": ("atomicCutoffs", "lmax"),
+    "lnonsph": ("atomicCutoffs", "lnonsphr"),
+}
+
+#: Number of core electrons of the noble gas shorthands in electron configurations
+_NOBLE_GAS_CORES = {"[He]": 2, "[Ne]": 10, "[Ar]": 18, "[Kr]": 36, "[Xe]": 54, "[Rn]": 86}
+
+
+def fill_inpxml_template(
+    fleur_input: Any,
+    template: Union[PathLike, IO[bytes], etree._ElementTree],
+    parameters: Optional[dict] = None,
+    ignore_set_parameters: bool = False,
+    symprec: float = 0.01,
+    use_symmetry: bool = True,
+) -> Tuple[etree._ElementTree, Any]:
+    """
+    Fill a template inp.xml with the structure, title and LAPW parameters of a
+    :py:class:`~pymatgen.io.fleur.FleurInput`
+
+    Args:
+        fleur_input (FleurInput): input to write
+        template: path to the template inp.xml, an opened file handle (in bytes mode) or
+                  an already parsed XML tree, which is not modified
+        parameters (dict): Additional LAPW parameters to use
+        ignore_set_parameters (bool): if True only the passed parameters are used and the
+                                      ``lapw_parameters`` stored on the input are ignored
+        symprec (float): tolerance for determining the symmetry operations with spglib
+        use_symmetry (bool): if False only the identity is written as symmetry operation
+                             and every site is placed in its own atom group
+
+    returns: filled XML tree and the schema dictionary for its input version
+    """
+    from pymatgen.io.fleur.inpxml import _get_schema_dict, load_inpxml
+
+    if isinstance(template, etree._ElementTree):
+        xmltree = copy.deepcopy(template)
+        schema_dict = _get_schema_dict(xmltree.getroot())
+    else:
+        xmltree, schema_dict = load_inpxml(template)
+
+    if parameters is None:
+        parameters = {}
+    if not ignore_set_parameters:
+        parameters = {**fleur_input.lapw_parameters, **parameters}
+    parameters.setdefault("title", fleur_input.title)
+
+    structure = fleur_input.structure
+    root = xmltree.getroot()
+    species = _species_by_element(root, structure)
+
+    film = _set_lattice(root, structure)
+    rotations, translations = _symmetry_operations(structure, film, symprec, use_symmetry)
+    _set_symmetry_operations(root, rotations, translations)
+    _set_atom_groups(root, structure, species, _equivalence_classes(structure, rotations, translations), film)
+    _set_valence_electrons(root, structure, species)
+    _set_parameters(xmltree, schema_dict, parameters, species)
+
+    kpt = parameters.get("kpt", {})
+    if all(f"div{i}" in kpt for i in (1, 2, 3)):
+        mesh = [int(kpt[f"div{i}"]) for i in (1, 2, 3)]
+        _set_kpoint_mesh(xmltree, schema_dict, rotations, mesh, gamma=bool(kpt.get("gamma", False)))
+
+    etree.indent(xmltree, space="  ")
+    return xmltree, schema_dict
+
+
+def write_inpxml(
+    fleur_input: Any,
+    filename: PathLike,
+    template: Union[PathLike, IO[bytes], etree._ElementTree],
+    validate: bool = True,
+    **kwargs: Any,
+) -> None:
+    """
+    Write a inp.xml file for a :py:class:`~pymatgen.io.fleur.FleurInput` by filling a template inp.xml
+
+    The file is validated against the schema of the input version of the template
+    and written to disk directly from the XML tree (compressed if the extension asks for it)
+
+    Args:
+        fleur_input (FleurInput): input to write
+        filename (PathLike): path of the written inp.xml
+        template: template inp.xml (see :py:func:`fill_inpxml_template`)
+        validate (bool): if True the file is validated before it is written
+
+    Kwargs are passed on to :py:func:`fill_inpxml_template`
+
+    Raises:
+        ValueError: if the template cannot be filled with the input or the result does not conform to the schema
+    """
+    from pymatgen.io.fleur.schema import get_schema_registry
+
+    with stage("fill"):
+        xmltree, schema_dict = fill_inpxml_template(fleur_input, template, **kwargs)
+    if validate:
+        with stage("validate"):
+            get_schema_registry().validate(xmltree, schema_dict, mode="full")
+
+    with stage("write"):
+        with zopen(filename, "wb") as f:
+            xmltree.write(f, encoding="UTF-8", xml_declaration=True)
+            count(bytes_written=f.tell(), atoms=len(fleur_input.structure))
+
+
+def _species_by_element(root: etree._Element, structure: Any) -> Dict[str, etree._Element]:
+    """
+    Find the template species used for each element of the structure (the first species of the element)
+    """
+    species: Dict[str, etree._Element] = {}
+    for elem in root.iterfind("atomSpecies/species"):
+        species.setdefault(elem.attrib["element"], elem)
+
+    missing = sorted({specie.symbol for specie in structure.species} - set(species))
+    if missing:
+        raise ValueError(f"The template inp.xml has no species for the elements: {', '.join(missing)}")
+    return species
+
+
+def _format_row(values: Any) -> str:
+    return " ".join(f"{val:.10f}" for val in values)
+
+
+def _set_lattice(root: etree._Element, structure: Any) -> bool:
+    """
+    Write the lattice of the structure in bohr and return whether it is a film
+    """
+    from masci_tools.util.constants import BOHR_A
+
+    cell = structure.lattice.matrix / BOHR_A
+    film = not structure.lattice.pbc[2]
+
+    lattice = root.find("cell/filmLattice" if film else "cell/bulkLattice")
+    if lattice is None:
+        kind = "film" if film else "bulk"
+        raise ValueError(f"The template inp.xml has no {kind}Lattice, which is needed for a {kind} structure")
+    lattice.set("scale", "1.0000000000")
+
+    if not film:
+        matrix = lattice.find("bravaisMatrix")
+        for i, row in enumerate(cell):
+            matrix.find(f"row-{i+1}").text = _format_row(row)
+        return film
+
+    if not np.allclose(cell[:2, 2], 0) or not np.allclose(cell[2, :2], 0):
+        raise ValueError("For films the first two lattice vectors have to lie in the xy-plane and the third along z")
+    matrix = lattice.find("bravaisMatrixFilm")
+    for i, row in enumerate(cell[:2, :2]):
+        matrix.find(f"row-{i+1}").text = _format_row(row)
+
+    # The vacuum boundary keeps its distance to the boundary of the unit cell from the template
+    d_tilda = abs(cell[2, 2])
+    margin = float(lattice.get("dTilda")) - float(lattice.get("dVac"))
+    lattice.set("dTilda", f"{d_tilda:.10f}")
+    lattice.set("dVac", f"{max(d_tilda - margin, 0.0):.10f}")
+    return film
+
+
+def _symmetry_operations(
+    structure: Any, film: bool, symprec: float, use_symmetry: bool
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Determine the symmetry operations (in fractional coordinates) to write for the structure
+    """
+    if not use_symmetry:
+        return np.eye(3, dtype=int)[np.newaxis], np.zeros((1, 3))
+
+    from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
+
+    symmops = SpacegroupAnalyzer(structure, symprec=symprec).get_symmetry_operations(cartesian=False)
+    rotations = np.rint([op.rotation_matrix for op in symmops]).astype(int)
+    translations = np.array([op.translation_vector for op in symmops], dtype=float)
+    if film:
+        # Operations of films may not mix z with x/y and may not translate along z
+        keep = (
+            (rotations[:, 2, :2] == 0).all(axis=1)
+            & (rotations[:, :2, 2] == 0).all(axis=1)
+            & np.isclose(translations[:, 2], 0.0, atol=symprec)
+        )
+        rotations, translations = rotations[keep], translations[keep]
+        translations[:, 2] = 0.0
+
+    translations = np.round(translations, 10) % 1.0
+    return rotations, translations
+
+
+def _set_symmetry_operations(root: etree._Element, rotations: np.ndarray, translations: np.ndarray) -> None:
+    """
+    Replace the symmetry operations of the template
+    """
+    symmetry = root.find("cell/symmetryOperations")
+    if symmetry is None:
+        raise ValueError("The template inp.xml has no symmetryOperations")
+    for child in list(symmetry):
+        symmetry.remove(child)
+
+    for rotation, translation in zip(rotations, translations):
+        symop = etree.SubElement(symmetry, "symOp")
+        for i in range(3):
+            row = etree.SubElement(symop, f"row-{i+1}")
+            row.text = f"{rotation[i, 0]} {rotation[i, 1]} {rotation[i, 2]} {translation[i]:.10f}"
+
+
+def _equivalence_classes(structure: Any, rotations: np.ndarray, translations: np.ndarray) -> List[List[int]]:
+    """
+    Group the sites of the structure into the sets of sites mapped onto each other
+    by the symmetry operations (in the order of their first site)
+
+    The image of each site is matched to the nearest site of the same element with a
+    periodic KD-tree on the fractional coordinates, so the memory stays linear in the number of sites
+    """
+    from scipy.spatial import cKDTree
+
+    pbc = np.array(structure.lattice.pbc, dtype=bool)
+    # Periodic directions are wrapped into [0, 1), the others are not periodic (box size 0)
+    boxsize = np.where(pbc, 1.0, 0.0)
+
+    def wrap(coords: np.ndarray) -> np.ndarray:
+        coords = np.array(coords, dtype=float)
+        coords[:, pbc] %= 1.0
+        # Tiny negative values are wrapped to 1.0, which is outside of the box
+        coords[:, pbc] = np.where(coords[:, pbc] >= 1.0, 0.0, coords[:, pbc])
+        return coords
+
+    frac_coords = np.array(structure.frac_coords, dtype=float)
+    numbers = np.array([specie.Z for specie in structure.species])
+    sites_of = {number: np.flatnonzero(numbers == number) for number in np.unique(numbers)}
+    trees = {number: cKDTree(wrap(frac_coords[sites]), boxsize=boxsize) for number, sites in sites_of.items()}
+
+    # Since the operations form a group, the orbit of a site consists of its images and
+    # one pass over the operations labels every site with the smallest site of its orbit
+    labels = np.arange(len(structure))
+    for rotation, translation in zip(rotations, translations):
+        images = wrap(frac_coords @ rotation.T + translation)
+        for number, sites in sites_of.items():
+            _, nearest = trees[number].query(images[sites])
+            labels[sites] = np.minimum(labels[sites], labels[sites[nearest]])
+
+    classes: Dict[int, List[int]] = {}
+    for i, label in enumerate(labels.tolist()):
+        classes.setdefault(label, []).append(i)
+    return list(classes.values())
+
+
+def _set_atom_groups(
+    root: etree._Element,
+    structure: Any,
+    species: Dict[str, etree._Element],
+    classes: List[List[int]],
+    film: bool,
+) -> None:
+    """
+    Replace the atom groups of the template. The first atom group of each species
+    in the template is used as scaffold for the new groups (keeping e.g. force and noco settings)
+    """
+    from masci_tools.util.constants import BOHR_A
+
+    atom_groups = root.find("atomGroups")
+    scaffolds: Dict[str, etree._Element] = {}
+    for group in atom_groups:
+        if isinstance(group.tag, str):
+            scaffolds.setdefault(group.get("species"), group)
+    for child in list(atom_groups):
+        atom_groups.remove(child)
+
+    positions = np.array(structure.frac_coords)
+    if film:
+        positions[:, 2] = structure.cart_coords[:, 2] / BOHR_A
+    position_tag = "filmPos" if film else "relPos"
+
+    for sites in classes:
+        species_name = species[structure[sites[0]].specie.symbol].get("name")
+        scaffold = scaffolds.get(species_name)
+        if scaffold is not None:
+            group = etree.fromstring(etree.tostring(scaffold, with_tail=False))
+            for child in list(group):
+                if child.tag in ("relPos", "absPos", "filmPos"):
+                    group.remove(child)
+        else:
+            group = etree.Element("atomGroup", species=species_name)
+            etree.SubElement(group, "force", calculate="T", relaxXYZ="TTT")
+
+        for index, i in enumerate(sites):
+            pos = etree.Element(position_tag, label=f"{i+1:>20}")
+            pos.text = _format_row(positions[i])
+            group.insert(index, pos)
+        atom_groups.append(group)
+
+
+def _set_kpoint_mesh(
+    xmltree: etree._ElementTree, schema_dict: Any, rotations: np.ndarray, mesh: List[int], gamma: bool
+) -> None:
+    """
+    Add the k-point mesh reduced by the symmetry operations and select it
+    """
+    from masci_tools.util.xml.xml_setters_names import set_kpointlist
+    from spglib import get_stabilized_reciprocal_mesh
+
+    if xmltree.getroot().find("cell/filmLattice") is not None and mesh[2] != 1:
+        raise ValueError(f"For films only one layer of k-points along z is possible: Got div3={mesh[2]}")
+
+    # Even divisions are shifted by half a grid spacing, so that the mesh is symmetric around gamma
+    shift = np.zeros(3, dtype=int) if gamma else np.array([1 - n % 2 for n in mesh])
+    mapping, addresses = get_stabilized_reciprocal_mesh(
+        mesh, np.ascontiguousarray(rotations, dtype="intc"), is_shift=shift
+    )
+    indices, weights = np.unique(mapping, return_counts=True)
+    kpoints = (addresses[indices] + shift / 2) / mesh
+
+    set_kpointlist(
+        xmltree,
+        schema_dict,
+        kpoints,
+        weights,
+        kpoint_type="mesh",
+        switch=True,
+        additional_attributes=dict(zip(("nx", "ny", "nz"), mesh)),
+    )
+
+
+def _core_electrons(core_config: str) -> int:
+    """
+    Count the electrons in a core configuration like ``[Ne] (3s1/2) (3p1/2)``
+    """
+    count = sum(_NOBLE_GAS_CORES.get(token, 0) for token in re.findall(r"\[\w+\]", core_config))
+    # Each state (nl j) holds 2j+1 electrons
+    return count + sum(int(twice_j) + 1 for twice_j in re.findall(r"\(\d+[spdf](\d+)/2\)", core_config))
+
+
+def _set_valence_electrons(root: etree._Element, structure: Any, species: Dict[str, etree._Element]) -> None:
+    """
+    Set the number of valence electrons from the atomic numbers and core configurations of the species
+    """
+    bz_integration = root.find("cell/bzIntegration")
+    if bz_integration is None or "valenceElectrons" not in bz_integration.attrib:
+        return
+
+    valence = {}
+    for element, elem in species.items():
+        core_config = elem.find("electronConfig/coreConfig")
+        core = _core_electrons(core_config.text or "") if core_config is not None else 0
+        valence[element] = int(elem.get("atomicNumber")) - core
+
+    total = sum(valence[specie.symbol] for specie in structure.species)
+    bz_integration.set("valenceElectrons", f"{total:.8f}")
+
+
+def _set_parameters(
+    xmltree: etree._ElementTree, schema_dict: Any, parameters: dict, species: Dict[str, etree._Element]
+) -> None:
+    """
+    Apply the LAPW parameters with a counterpart in the inp.xml
+    """
+    from masci_tools.util.xml.xml_setters_names import set_inpchanges, set_species, set_xcfunctional
+
+    changes = {COMP_CHANGES[key]: val for key, val in parameters.get("comp", {}).items() if key in COMP_CHANGES}
+    if parameters.get("title"):
+        changes["comment"] = parameters["title"]
+    if changes:
+        set_inpchanges(xmltree, schema_dict, changes)
+
+    xctyp = parameters.get("exco", {}).get("xctyp")
+    if xctyp is not None:
+        set_xcfunctional(xmltree, schema_dict, xctyp)
+
+    for namelist, values in parameters.items():
+        if not namelist.startswith("atom") or not isinstance(values, dict):
+            continue
+        elem = species.get(values.get("element"))
+        if elem is None:
+            continue
+        species_changes: Dict[str, Dict[str, Any]] = {}
+        for key, (tag, attribute) in ATOM_CHANGES.items():
+            if key in values:
+                species_changes.setdefault(tag, {})[attribute] = values[key]
+        if species_changes:
+            set_species(xmltree, schema_dict, elem.get("name"), species_changes)